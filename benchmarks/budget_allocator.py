@@ -0,0 +1,74 @@
+"""
+Compare `allocate_lots` against `evenly_distribute` on 1 ~ 500 buy options.
+
+    python -m benchmarks.budget_allocator
+"""
+import timeit
+import numpy as np
+
+from tradepy.core.budget_allocator import allocate_lots, evenly_distribute
+
+
+BUDGET = 1e6
+MIN_TRADE_AMOUNT = 8000
+MAX_POSITION_VALUE = 2e5
+TRADE_LOT_VOL = 100
+
+
+def make_options(n_stocks: int, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    prices = rng.uniform(2, 200, n_stocks).round(2)
+    weights = rng.uniform(0.1, 3, n_stocks)
+    return prices, weights
+
+
+def spent_ratio(amounts: np.ndarray) -> float:
+    return amounts.sum() / BUDGET
+
+
+def main(repeat: int = 20):
+    print(
+        f"{'n_stocks':>8} | {'evenly_distribute':>18} {'spent':>6} "
+        f"| {'allocate_lots':>14} {'spent':>6} {'deterministic':>14}"
+    )
+    for n_stocks in (1, 5, 10, 50, 100, 200, 500):
+        prices, weights = make_options(n_stocks)
+        stocks = np.column_stack([np.arange(n_stocks), prices])
+
+        evenly = lambda: evenly_distribute(
+            stocks, BUDGET, MIN_TRADE_AMOUNT, TRADE_LOT_VOL
+        )
+        weighted = lambda deterministic: allocate_lots(
+            prices,
+            weights,
+            BUDGET,
+            MIN_TRADE_AMOUNT,
+            MAX_POSITION_VALUE,
+            TRADE_LOT_VOL,
+            deterministic,
+        )
+        # Compile first
+        evenly(), weighted(False), weighted(True)
+
+        evenly_secs = min(timeit.repeat(evenly, number=1, repeat=repeat))
+        weighted_secs = min(
+            timeit.repeat(lambda: weighted(False), number=1, repeat=repeat)
+        )
+        determ_secs = min(
+            timeit.repeat(lambda: weighted(True), number=1, repeat=repeat)
+        )
+
+        allocations = evenly()
+        kept = allocations[:, 0].astype(int)
+        evenly_spent = spent_ratio(allocations[:, 1] * prices[kept] * TRADE_LOT_VOL)
+        weighted_spent = spent_ratio(weighted(False) * prices * TRADE_LOT_VOL)
+
+        print(
+            f"{n_stocks:>8} | {evenly_secs * 1e6:>15.1f} us {evenly_spent:>6.1%} "
+            f"| {weighted_secs * 1e6:>11.1f} us {weighted_spent:>6.1%} "
+            f"{determ_secs * 1e6:>11.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
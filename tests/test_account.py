@@ -1,5 +1,7 @@
 import pytest
-from unittest.mock import MagicMock
+from pytest import approx
+import numpy as np
+from unittest.mock import MagicMock, patch
 from tradepy.core.position import Position
 from tradepy.core.account import BacktestAccount
 from tradepy.core.holdings import Holdings
@@ -36,7 +38,7 @@ def empty_holdings():
 
 @pytest.fixture
 def sample_holdings(empty_holdings: Holdings, sample_position: Position):
-    empty_holdings.positions[sample_position.code] = sample_position
+    empty_holdings.buy([sample_position])
     return empty_holdings
 
 
@@ -101,3 +103,60 @@ def test_clear_positions(sample_account: BacktestAccount, sample_position: Posit
     sample_account.holdings.buy([sample_position, kopy1, kopy2])
     sample_account.clear()
     assert len(sample_account.holdings.positions) == 0
+
+
+def test_backtest_only(sample_account: BacktestAccount):
+    from tradepy.core.exceptions import OperationForbidden
+
+    with patch("tradepy.config.common.mode", "paper-trading"):
+        with pytest.raises(OperationForbidden):
+            Holdings()
+
+        # Checked once on creation, not on every trade
+        sample_account.clear()
+
+
+def test_holdings_bookkeeping(empty_holdings: Holdings, sample_position: Position):
+    other = sample_position.model_copy(update={"code": "000001", "vol": 200})
+    empty_holdings.buy([sample_position, other])
+    codes = empty_holdings.position_codes
+    assert codes == {"000333", "000001"}
+    assert empty_holdings.get_total_market_value() == 100 * 100 + 100 * 200
+
+    # Vectorized mark-to-market, ignoring codes not in holdings
+    empty_holdings.update_prices(
+        np.array(["600000", "000001", "000333"]), np.array([1.0, 90.5, 120.0])
+    )
+    assert sample_position.latest_price == 120.0
+    assert other.latest_price == 90.5
+    assert empty_holdings.get_total_market_value() == 120 * 100 + 90.5 * 200
+
+    # Positions missing from the day's codes keep their prices
+    empty_holdings.update_prices(np.array(["000001"]), np.array([91.0]))
+    assert empty_holdings.get_total_market_value() == 120 * 100 + 91 * 200
+
+    for code in codes:  # the code set can be iterated while selling
+        empty_holdings.sell([empty_holdings[code]])
+    assert codes == {"000333", "000001"}
+    assert not empty_holdings.position_codes
+    assert empty_holdings.get_total_market_value() == 0
+
+
+def test_buy_batch(sample_account: BacktestAccount):
+    from tradepy.core.models import BuyOrderBatch
+
+    batch = BuyOrderBatch(
+        "2023-09-16",
+        codes=np.array(["000001", "000002"], dtype=object),
+        prices=np.array([10.0, 12.34]),
+        vols=np.array([100, 2000]),
+    )
+    free_cash = sample_account.free_cash_amount
+    positions = sample_account.buy_batch(batch)
+
+    # One commission on the batch's total cost
+    fee = max(5.0, round(25680 * 0.05e-2, 2))
+    assert [pos.code for pos in positions] == ["000001", "000002"]
+    assert sample_account.holdings.position_codes == {"000001", "000002"}
+    assert sample_account.free_cash_amount == approx(free_cash - 25680 - fee)
+    assert sample_account.market_value == 25680
@@ -93,3 +93,23 @@ def test_adjust_factors_backward_adjust_stocks_latest_prices(
         pytest.approx(bars_df.loc[stock_code, "close"] * latest_hfq_factor)
         == adjusted_bars.loc[stock_code, "close"]
     )
+
+
+def test_adjust_factors_bulk_conversions(adjust_factors: AdjustFactors):
+    codes = ["600519", "000333", "600519"]
+    prices = [170.0, 22.0, 340.0]
+
+    real_prices = adjust_factors.to_real_prices(codes, prices)
+    assert real_prices.tolist() == [100.0, 10.0, 200.0]
+    assert real_prices.tolist() == [
+        adjust_factors.to_real_price(code, price) for code, price in zip(codes, prices)
+    ]
+    assert adjust_factors.to_adjusted_prices(codes, real_prices) == pytest.approx(prices)
+
+    assert adjust_factors.latest_factors["hfq_factor"].to_dict() == {
+        "000333": 2.2,
+        "600519": 1.7,
+    }
+
+    with pytest.raises(KeyError):
+        adjust_factors.to_real_prices(["000333", "300750"], [1.0, 1.0])
@@ -1,11 +1,16 @@
 import io
 import pytest
+import numpy as np
 import pandas as pd
+from random import seed
 from unittest import mock
 
 from tradepy.trade_book.trade_book import TradeBook
+from tradepy.core.account import BacktestAccount
+from tradepy.core.models import BacktestPosition
 from tradepy.core.conf import BacktestConf, StrategyConf, SlippageConf, SL_TP_Order
 from tradepy.backtest.backtester import Backtester
+from tradepy.blacklist import Blacklist, BlacklistStock
 from .conftest import SampleBacktestStrategy
 
 
@@ -100,6 +105,25 @@ def test_get_buy_options(
         assert option["order_price"] == sample_stock_data.loc[code, "close"]
 
 
+def test_get_buy_options_checks_blacklist_on_simulated_date(
+    sample_backtester: Backtester,
+    sample_strategy: SampleBacktestStrategy,
+    sample_stock_data: pd.DataFrame,
+):
+    stocks = {BlacklistStock("000001", "2020-06-30")}
+    with mock.patch("tradepy.blacklist.Blacklist.cached", stocks):
+        buy_options = sample_backtester.get_buy_options(
+            sample_stock_data, sample_strategy, date="2020-06-30"
+        )
+        assert set(buy_options.index) == {"000002"}
+
+        buy_options = sample_backtester.get_buy_options(
+            sample_stock_data, sample_strategy, date="2020-07-01"
+        )
+        assert set(buy_options.index) == {"000001", "000002"}
+    Blacklist.purge_cache()
+
+
 def test_get_close_signals(
     sample_backtester: Backtester,
     sample_strategy: SampleBacktestStrategy,
@@ -136,3 +160,68 @@ def test_day_k_trading(
     trade_book = backtester.trade(sample_computed_day_k_df, sample_strategy)
 
     assert isinstance(trade_book, TradeBook)
+
+
+def test_batch_buys_match_baseline(
+    sample_computed_day_k_df: pd.DataFrame,
+    sample_strategy: SampleBacktestStrategy,
+    backtest_conf: BacktestConf,
+):
+    # How the account bought and sold before the batches
+    def buy_orders(self: BacktestAccount, batch):
+        positions = [BacktestPosition.from_order(o) for o in batch.to_orders()]
+        if cost_total := self.holdings.buy(positions):
+            self.free_cash_amount -= self.add_buy_commissions(cost_total)
+        return positions
+
+    def sell(self: BacktestAccount, positions):
+        if close_total := self.holdings.sell(positions):
+            self.free_cash_amount += self.take_sell_commissions(close_total)
+
+    def run():
+        # The slippages and allocations are random, so seed both runs alike
+        np.random.seed(0)
+        with mock.patch("random.seed", lambda: seed(0)):
+            trade_book = Backtester(backtest_conf).trade(
+                sample_computed_day_k_df.copy(), sample_strategy
+            )
+        trades_df = trade_book.trade_logs_df.reset_index()
+        return trades_df.drop(columns="id"), trade_book.cap_logs_df
+
+    backtest_conf.min_broker_commission_fee = 5
+    trades_df, caps_df = run()
+    with mock.patch.multiple(BacktestAccount, buy_batch=buy_orders, sell=sell):
+        baseline_trades_df, baseline_caps_df = run()
+
+    assert not trades_df.empty
+    pd.testing.assert_frame_equal(trades_df, baseline_trades_df)
+    pd.testing.assert_frame_equal(caps_df, baseline_caps_df)
+
+
+def test_trade_splits_days_missing_from_calendar(
+    sample_backtester: Backtester, sample_strategy: SampleBacktestStrategy
+):
+    # Before the calendar starts, a weekend and its next trading day, and after the
+    # calendar ends: each pair shares a trading-day ordinal
+    dates = [
+        "1999-12-30",
+        "1999-12-31",
+        "2023-09-16",
+        "2023-09-18",
+        "2030-01-02",
+        "2030-01-03",
+    ]
+    df = pd.DataFrame(
+        [(date, code, 10.0) for date in dates for code in ["000001", "000002"]],
+        columns=["timestamp", "code", "close"],
+    )
+
+    days = []
+    with mock.patch.object(
+        Backtester,
+        "_trade_using_day_k",
+        lambda self, date, bars_df, *args: days.append((date, bars_df.index.tolist())),
+    ):
+        sample_backtester.trade(df, sample_strategy)
+
+    assert days == [(date, ["000001", "000002"]) for date in dates]
@@ -74,3 +74,26 @@ def test_read_from_empty_file():
 def test_read_from_nonexistent_file():
     with pytest.raises(FileNotFoundError):
         tradepy.config.common.blacklist_path = Path("/nonexistent/file/path.csv")
+
+
+def test_mask():
+    codes = pd.Index(["000001", "000002", "000003", "600000"])
+    assert Blacklist.mask(codes, "2020-12-31").tolist() == [True, True, True, False]
+    assert Blacklist.mask(codes, "2021-12-31").tolist() == [False, True, True, False]
+
+    # One date per code
+    dates = ["2021-12-31", "2030-01-03", "2030-01-03", "2020-01-01"]
+    assert Blacklist.mask(codes, dates).tolist() == [False, False, True, False]
+
+    # Same as checking one by one
+    for date in ("2020-12-31", "2021-01-01", "2029-12-31", "2030-01-02", "2031-01-01"):
+        expected = [Blacklist.contains(code, date) for code in codes]
+        assert Blacklist.mask(codes, date).tolist() == expected
+
+    with pytest.raises(ValueError):
+        Blacklist.mask(codes, "invalid-date-format")
+
+
+def test_mask_when_blacklist_is_empty():
+    with mock.patch("tradepy.config.common.blacklist_path", None):
+        assert not Blacklist.mask(["000002"], "2020-01-01").any()
@@ -1,6 +1,6 @@
 import numpy as np
 import pytest
-from tradepy.core.budget_allocator import evenly_distribute
+from tradepy.core.budget_allocator import allocate_lots, evenly_distribute
 
 
 @pytest.fixture
@@ -61,3 +61,53 @@ def test_evenly_distribute_remove_option(stocks: np.ndarray):
 
     # Check if the shape of the result is less than the input stocks (one option removed)
     assert len(result) == len(stocks) - 1
+
+
+def test_allocate_lots_by_weights():
+    prices = np.array([10.0, 10.0, 10.0])
+    lots = allocate_lots(prices, np.array([1.0, 2.0, 1.0]), 1e5, 0, np.inf, 100)
+    assert lots.tolist() == [25, 50, 25]
+
+    # Non-positive weights get nothing
+    lots = allocate_lots(prices, np.array([1.0, 0.0, 1.0]), 1e5, 0, np.inf, 100)
+    assert lots.tolist() == [50, 0, 50]
+
+    assert len(allocate_lots(prices[:0], prices[:0], 1e5, 0, np.inf, 100)) == 0
+
+
+@pytest.mark.parametrize("n_stocks", [1, 7, 50, 300])
+def test_allocate_lots_constraints(n_stocks: int):
+    rng = np.random.default_rng(n_stocks)
+    prices = rng.uniform(2, 200, n_stocks).round(2)
+    weights = rng.uniform(0.1, 3, n_stocks)
+    budget, min_trade_amount, max_position_value, trade_lot_vol = 1e6, 8000, 1.5e5, 100
+
+    lots = allocate_lots(
+        prices, weights, budget, min_trade_amount, max_position_value, trade_lot_vol
+    )
+    amounts = lots * prices * trade_lot_vol
+
+    assert lots.dtype == np.int64
+    assert amounts.sum() <= budget
+    assert amounts.max() <= max_position_value
+    assert (amounts[lots > 0] >= min_trade_amount).all()
+    # Whatever is left can't buy another lot of any position
+    bought = lots > 0
+    left = budget - amounts.sum()
+    room = max_position_value - amounts[bought]
+    lot_costs = prices[bought] * trade_lot_vol
+    assert not ((lot_costs <= left) & (lot_costs <= room)).any()
+
+
+def test_allocate_lots_deterministic(stocks: np.ndarray):
+    prices = stocks[:, 1].astype(float)
+    weights = np.ones(len(prices))
+    min_trade_amount = int(0.9 * 1e6 // (len(prices) - 1))
+
+    runs = {
+        tuple(allocate_lots(prices, weights, 1e6, min_trade_amount, np.inf, 100, True))
+        for _ in range(10)
+    }
+    assert len(runs) == 1
+    # Drops the most expensive one among the same weights
+    assert runs.pop()[-1] == 0
@@ -6,7 +6,7 @@ from unittest import mock
 from pandas.testing import assert_frame_equal
 
 from tradepy.stocks import StocksPool
-from tradepy.trade_cal import trade_cal
+from tradepy.trade_cal import trade_calendar
 from tradepy.collectors.market_index import (
     EastMoneySectorIndexCollector,
     BroadBasedIndexCollector,
@@ -52,10 +52,8 @@ def test_update_existing_stocks_day_k(local_stocks_day_k_df: pd.DataFrame):
     stocks_max_ts = local_stocks_day_k_df["timestamp"].max()
     n_bars_per_stock = local_stocks_day_k_df["timestamp"].nunique()
 
-    end_date_idx = (
-        trade_cal.index(stocks_max_ts) - 10
-    )  # set the ending date up to which we want the day bars to be updated
-    end_date = trade_cal[end_date_idx]
+    # set the ending date up to which we want the day bars to be updated
+    end_date = trade_calendar.offset(stocks_max_ts, 10)
 
     fetched_day_k_df = StockDayBarsCollector(
         since_date=stocks_max_ts, end_date=end_date
@@ -0,0 +1,334 @@
+import os
+import zlib
+import json
+import pytest
+import numpy as np
+import tempfile
+import pandas as pd
+from pathlib import Path
+from pandas.testing import assert_frame_equal
+from unittest import mock
+
+from tradepy.depot.base import GenericBarsDepot, GenericListingDepot
+from tradepy.depot.fingerprint import file_fingerprint
+from tradepy.depot.manifest import DepotManifest
+from tradepy.depot.schema import (
+    DAY_BARS_SCHEMA,
+    LABEL,
+    MINUTE_BARS_SCHEMA,
+    PRICE,
+    STOCK_DAY_BARS_SCHEMA,
+    TEXT,
+)
+from tradepy.depot.sidecar import sidecar_path
+from tradepy.depot.stocks import StockMinuteBarsDepot
+
+
+class SampleBarsDepot(GenericBarsDepot):
+    folder_name = "sample-bars"
+
+
+class SampleListingDepot(GenericListingDepot):
+    file_name = "sample-listing.csv"
+    schema = {"code": TEXT, "name": TEXT, "sector": LABEL, "mkt_cap": PRICE}
+
+
+@pytest.fixture
+def sample_depot():
+    with tempfile.TemporaryDirectory() as tempdir:
+        with mock.patch("tradepy.config.common.database_dir", Path(tempdir)):
+            yield SampleBarsDepot()
+
+
+@pytest.fixture
+def sample_bars_df() -> pd.DataFrame:
+    return pd.DataFrame(
+        [
+            ["2023-01-03", 10.0, 100],
+            ["2023-01-04", 10.5, 120],
+            ["2023-01-05", 10.2, 90],
+        ],
+        columns=["timestamp", "close", "vol"],
+    )
+
+
+def test_manifest_updated_on_save(
+    sample_depot: SampleBarsDepot, sample_bars_df: pd.DataFrame
+):
+    sample_depot.save(sample_bars_df, "000001.csv")
+
+    entry = sample_depot.manifest.get("000001")
+    assert entry is not None
+    assert entry["min_timestamp"] == "2023-01-03"
+    assert entry["max_timestamp"] == "2023-01-05"
+    assert entry["n_rows"] == 3
+    assert entry["file_size"] == (sample_depot.folder / "000001.csv").stat().st_size
+
+    # Persisted to disk
+    with (sample_depot.folder / DepotManifest.file_name).open() as f:
+        assert json.load(f)["000001"] == entry
+
+
+def test_manifest_updated_on_append(
+    sample_depot: SampleBarsDepot, sample_bars_df: pd.DataFrame
+):
+    sample_depot.append(sample_bars_df.iloc[:2], "000001.csv")
+    hash_before = sample_depot.manifest.get("000001")["hash"]  # type: ignore
+
+    sample_depot.append(sample_bars_df.iloc[1:], "000001.csv")
+    entry = sample_depot.manifest.get("000001")
+    assert entry is not None
+    assert entry["n_rows"] == 3
+    assert entry["max_timestamp"] == "2023-01-05"
+    assert entry["hash"] != hash_before
+
+
+def test_manifest_batch_writes_once(
+    sample_depot: SampleBarsDepot, sample_bars_df: pd.DataFrame
+):
+    manifest_path = sample_depot.folder / DepotManifest.file_name
+    with mock.patch(
+        "tradepy.depot.manifest.os.replace", side_effect=os.replace
+    ) as replace:
+        with sample_depot.batch():
+            for code in ["000001", "000002", "000003"]:
+                sample_depot.save(sample_bars_df, f"{code}.csv")
+            assert not manifest_path.exists()
+        assert replace.call_count == 1
+
+    with manifest_path.open() as f:
+        entries = json.load(f)
+    assert set(entries) == {"000001", "000002", "000003"}
+
+    # Hashed from the written bytes, the same as re-reading the file
+    path = sample_depot.folder / "000001.csv"
+    assert entries["000001"]["hash"] == file_fingerprint(path)
+
+
+def test_manifest_picks_up_external_changes(
+    sample_depot: SampleBarsDepot, sample_bars_df: pd.DataFrame
+):
+    sample_depot.save(sample_bars_df, "000001.csv")
+
+    # Files written or removed behind the depot's back
+    sample_bars_df.iloc[:1].to_csv(sample_depot.folder / "000002.csv", index=False)
+    (sample_depot.folder / "000001.csv").unlink()
+
+    repo = SampleBarsDepot()
+    assert set(repo.manifest.entries.keys()) == {"000002"}
+    assert repo.size() == 1
+
+    coverage_df = repo.coverage()
+    assert coverage_df.loc["000002", "max_timestamp"] == "2023-01-03"
+    assert coverage_df.loc["000002", "n_rows"] == 1
+
+
+def test_expire_only_touches_stale_files(
+    sample_depot: SampleBarsDepot, sample_bars_df: pd.DataFrame
+):
+    sample_depot.save(sample_bars_df, "000001.csv")
+    sample_depot.save(sample_bars_df.iloc[2:], "000002.csv")
+    sample_depot.save(sample_bars_df.iloc[:1], "000003.csv")
+    mtimes = {p.stem: p.stat().st_mtime_ns for p in sample_depot.folder.glob("*.csv")}
+
+    assert sample_depot.expire("2023-01-04") == 1
+
+    df = pd.read_csv(sample_depot.folder / "000001.csv", dtype=str)
+    assert df["timestamp"].tolist() == ["2023-01-04", "2023-01-05"]
+    assert df["close"].tolist() == ["10.5", "10.2"]
+    entry = sample_depot.manifest.get("000001")
+    assert entry and entry["min_timestamp"] == "2023-01-04"
+
+    # Nothing to drop / nothing left to keep, respectively
+    for name in ["000002", "000003"]:
+        assert (sample_depot.folder / f"{name}.csv").stat().st_mtime_ns == mtimes[name]
+
+    assert sample_depot.expire("2023-01-04") == 0
+
+
+def test_scan_filters_and_projects(
+    sample_depot: SampleBarsDepot, sample_bars_df: pd.DataFrame
+):
+    sample_depot.save(sample_bars_df, "000001.csv")
+    sample_depot.save(sample_bars_df.assign(close=20.0), "000002.csv")
+    sample_depot.save(sample_bars_df.iloc[:1], "000003.csv")
+
+    scan = sample_depot.scan().between("2023-01-04")
+    df = scan.select("timestamp,code,close").collect()
+    assert set(df["code"]) == {"000001", "000002"}
+    assert df.columns.tolist() == ["timestamp", "code", "close"]
+    assert df["timestamp"].min() == "2023-01-04"
+
+    df = (
+        scan.codes(["000002"])
+        .filter(lambda df: df["vol"] > 100, columns=["vol"])
+        .index_by("timestamp")
+        .collect()
+    )
+    assert df.index.tolist() == ["2023-01-04"]
+    assert df["close"].tolist() == [20.0]
+
+    # The base query is left untouched
+    assert len(scan.collect()) == 4
+
+    # Pruned down to no files, none is read
+    with mock.patch("tradepy.depot.base.dtype_schema.read_csv") as read_csv:
+        assert sample_depot.scan().between("2024-01-01").collect().empty
+        assert sample_depot.scan().codes([]).collect().empty
+        with mock.patch.object(sample_depot, "_should_scan", return_value=False):
+            assert sample_depot.scan().codes(["999999"]).collect().empty
+        read_csv.assert_not_called()
+
+
+def test_schema_applied_at_read_time(sample_bars_df: pd.DataFrame):
+    class TypedBarsDepot(GenericBarsDepot):
+        folder_name = "typed-bars"
+        schema = DAY_BARS_SCHEMA | {"market": "category"}
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        with mock.patch("tradepy.config.common.database_dir", Path(tempdir)):
+            repo = TypedBarsDepot()
+            repo.save(sample_bars_df.assign(market="创业板"), "000001.csv")
+            repo.save(
+                sample_bars_df.assign(market="科创板", vol=3_000_000_000), "000002.csv"
+            )
+
+            df = repo.scan().collect()
+            assert df["close"].dtype == np.float32
+            assert df["market"].dtype == "category"
+            # Would overflow int32, so kept as int64
+            assert df["vol"].dtype == np.int64
+
+            df = repo.scan().codes(["000001"]).collect()
+            assert df["vol"].dtype == np.int32
+
+
+def test_large_values_survive_rewrites(sample_bars_df: pd.DataFrame):
+    class TypedBarsDepot(GenericBarsDepot):
+        folder_name = "typed-bars"
+        schema = STOCK_DAY_BARS_SCHEMA
+
+    mkt_cap = 12345678901.0
+    with tempfile.TemporaryDirectory() as tempdir:
+        with mock.patch("tradepy.config.common.database_dir", Path(tempdir)):
+            repo = TypedBarsDepot()
+            repo.save(sample_bars_df.assign(mkt_cap=mkt_cap), "000001.csv")
+
+            df = repo.scan().collect()
+            assert df["mkt_cap"].dtype == np.float64
+            assert (df["mkt_cap"] == mkt_cap).all()
+
+            # Raw scans keep the parsed dtypes, for writing the bars back
+            raw_df = repo.scan().raw().collect()
+            assert raw_df["close"].dtype == np.float64
+            repo.save(raw_df.drop(columns="code"), "000001.csv")
+            assert_frame_equal(
+                pd.read_csv(repo.folder / "000001.csv"),
+                sample_bars_df.assign(mkt_cap=mkt_cap),
+            )
+
+
+def test_fingerprints_track_content_changes(
+    sample_depot: SampleBarsDepot, sample_bars_df: pd.DataFrame
+):
+    sample_depot.save(sample_bars_df, "000001.csv")
+    sample_depot.save(sample_bars_df, "000002.csv")
+    version = sample_depot.fingerprint()
+    assert SampleBarsDepot().fingerprint() == version
+
+    path = sample_depot.folder / "000002.csv"
+    file_version = file_fingerprint(path)
+    sample_depot.append(sample_bars_df.assign(timestamp="2023-01-06"), "000002.csv")
+
+    assert file_fingerprint(path) != file_version
+    assert sample_depot.fingerprint() != version
+
+    # Only the latest version of the file is memoized
+    from tradepy.depot.fingerprint import _file_hashes
+
+    assert _file_hashes[str(path.absolute())][2] == file_fingerprint(path)
+
+    sample_depot.delete("000002")
+    assert sample_depot.fingerprint() != version
+
+
+def test_minute_bars_day_file_roundtrip():
+    times = ["0931", "0932", "0933"]
+    df = pd.DataFrame(
+        {
+            "code": np.repeat(["600000", "000001", "300750"], len(times)),
+            "time": times * 3,
+            "open": np.arange(9, dtype=np.float64) + 10.01,
+            "high": np.arange(9, dtype=np.float64) + 10.5,
+            "low": np.arange(9, dtype=np.float64) + 9.5,
+            "close": np.arange(9, dtype=np.float64) + 10.2,
+            "vol": np.arange(9) * 100,
+        }
+    ).sample(frac=1, random_state=0)
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        with mock.patch("tradepy.config.common.database_dir", Path(tempdir)):
+            depot = StockMinuteBarsDepot()
+            path = depot.save_day(df, "2023-11-15")
+            assert path == depot.folder / "2023-11" / "2023-11-15.mb"
+
+            full_df = depot.load_day("2023-11-15")
+            assert full_df.index.tolist() == ["000001"] * 3 + ["300750"] * 3 + ["600000"] * 3
+            assert full_df["time"].astype(str).tolist() == times * 3
+            assert full_df["open"].dtype == np.float32
+            assert full_df["vol"].dtype == np.int32
+
+            expected = df.set_index("code").sort_index().loc["300750"].sort_values("time")
+            sub_df = depot.load_day("2023-11-15", codes=["300750", "688001"])
+            assert (sub_df.index == "300750").all()
+            assert np.allclose(sub_df["close"], expected["close"])
+            assert (sub_df["vol"].values == expected["vol"].values).all()
+
+            # Only the blocks of the asked stocks are decompressed
+            with mock.patch(
+                "tradepy.depot.minute_bars.zlib.decompress", wraps=zlib.decompress
+            ) as decompress:
+                sub_df = depot.load_day("2023-11-15", codes=["600000", "000001"])
+            assert decompress.call_count == 2 * (1 + len(MINUTE_BARS_SCHEMA))
+            assert_frame_equal(sub_df, full_df.loc[["000001", "600000"]])
+            assert depot.load_day("2023-11-15", codes=["688001"]).empty
+
+            month_df = depot._load("2023-11")
+            assert month_df.index.names == ["date", "code"]
+            assert len(month_df.loc[("2023-11-15",)]) == len(df)
+
+
+def test_listing_loaded_through_sidecar():
+    listing_df = pd.DataFrame(
+        {
+            "code": ["600000", "000001", "300750"],
+            "name": ["浦发银行", "平安银行", "宁德时代"],
+            "sector": ["银行", "银行", "电池"],
+            "mkt_cap": [2000.5, 2100.0, 9000.25],
+        }
+    ).set_index("code")
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        with mock.patch("tradepy.config.common.database_dir", Path(tempdir)):
+            SampleListingDepot.save(listing_df)
+            parsed_df = SampleListingDepot.load()
+            assert (sidecar_path(SampleListingDepot.file_path()) / "layout.json").exists()
+
+            with mock.patch("pandas.read_csv") as read_csv:
+                cached_df = SampleListingDepot.load()
+                read_csv.assert_not_called()
+
+            pd.testing.assert_frame_equal(cached_df, parsed_df)
+            assert not cached_df["mkt_cap"].values.flags.owndata  # mapped, not parsed
+            assert cached_df["sector"].dtype == "category"
+
+            # Copy-on-write, the sidecar itself is left untouched
+            cached_df.loc["600000", "mkt_cap"] = 0
+            assert SampleListingDepot.load().loc["600000", "mkt_cap"] == np.float32(2000.5)
+
+            # Changing the CSV invalidates the sidecar
+            listing_df.loc["000001", "name"] = "平安银行A"
+            SampleListingDepot.save(listing_df.iloc[:2])
+            reloaded_df = SampleListingDepot.load()
+            assert reloaded_df.index.tolist() == ["600000", "000001"]
+            assert reloaded_df.loc["000001", "name"] == "平安银行A"
@@ -29,9 +29,11 @@ def patch_trade_date(dt: date | datetime):
 
 @pytest.fixture(autouse=True)
 def mock_trade_cal(monkeypatch):
-    # Monkeypatch the trade_cal module to use the custom trade_cal
+    # Monkeypatch the trade_cal module to use the custom trade calendar
     monkeypatch.setattr(
-        trade_cal, "trade_cal", ["2023-09-15", "2023-09-16", "2023-09-17"]
+        trade_cal,
+        "trade_calendar",
+        trade_cal.TradingCalendar(["2023-09-15", "2023-09-16", "2023-09-17"]),
     )
 
 
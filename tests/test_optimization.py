@@ -1,13 +1,23 @@
 import math
 import itertools
+import tempfile
+from pathlib import Path
 import pytest
 import pandas as pd
 from tradepy.core.conf import BacktestConf, OptimizationConf, SlippageConf, StrategyConf
+from tradepy.columnar import save_columnar_dataset
+from tradepy.optimization.dataset import (
+    SharedDataset,
+    attach_shared_dataset,
+    load_dataset,
+)
+from tradepy.optimization.worker import DatasetCache
 from tradepy.optimization.schedulers import OptimizationScheduler, _make_parameter
 from tradepy.strategy.base import BacktestStrategy, BuyOption
 from tradepy.strategy.factors import FactorsMixin
 from tradepy.decorators import tag
 from tradepy.optimization.parameter import Parameter, ParameterGroup
+from tradepy.optimization.result import BacktestRunsResult
 from tradepy.optimization.optimizers.grid_search import GridSearch
 
 
@@ -125,3 +135,143 @@ def test_optimization_scheduler(
     # Check the metrics result
     metrics_df = result.get_total_metrics()
     assert sorted(param_names) == sorted(metrics_df.index.names)
+
+
+def test_shared_dataset_roundtrip(local_stocks_day_k_df: pd.DataFrame):
+    df = local_stocks_day_k_df.set_index("timestamp", append=True)
+    shared = SharedDataset.publish(df)
+    try:
+        attached_df = attach_shared_dataset(shared.name)
+        pd.testing.assert_frame_equal(attached_df[df.columns], df)
+
+        # Numeric columns are read-only views on the shared memory
+        assert not attached_df["close"].values.flags.writeable
+    finally:
+        shared.unlink()
+
+
+def test_scheduler_tasks_carry_no_shared_memory(
+    optimization_conf: OptimizationConf, local_stocks_day_k_df: pd.DataFrame
+):
+    import cloudpickle
+
+    scheduler = OptimizationScheduler(optimization_conf, [])
+    scheduler.shared_dataset = SharedDataset.publish(local_stocks_day_k_df)
+    try:
+        with pytest.raises(TypeError):
+            cloudpickle.dumps(scheduler.shared_dataset)
+        executor = cloudpickle.dumps(scheduler._make_executor())
+    finally:
+        scheduler._unpublish_dataset()
+
+    # Still loadable after the dataset is unpublished
+    assert cloudpickle.loads(executor).keywords["workspace_dir"] == scheduler.workspace_dir
+
+
+def test_worker_dataset_cache(local_stocks_day_k_df: pd.DataFrame):
+    with tempfile.TemporaryDirectory() as tempdir:
+        path = Path(tempdir) / "dataset.pkl"
+        local_stocks_day_k_df.to_pickle(path)
+        request = {"dataset_path": str(path), "dataset_version": "", "dataset_shm": ""}
+
+        cache = DatasetCache()
+        df = cache.get(request)  # type: ignore
+        assert cache.get(request) is df  # type: ignore
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+        # Reloaded once the content changed
+        local_stocks_day_k_df.iloc[:10].to_pickle(path)
+        assert len(cache.get(request)) == 10  # type: ignore
+        assert cache.stats()["misses"] == 2
+        assert len(cache.datasets) == 1
+
+
+def test_worker_detaches_stale_shared_datasets(local_stocks_day_k_df: pd.DataFrame):
+    from tradepy.optimization.dataset import _attached_segments
+
+    cache = DatasetCache()
+    shared = [SharedDataset.publish(local_stocks_day_k_df) for _ in range(2)]
+    try:
+        for version, dataset in enumerate(shared):
+            request = {
+                "dataset_path": "dataset.pkl",
+                "dataset_version": str(version),
+                "dataset_shm": dataset.name,
+            }
+            assert len(cache.get(request)) == len(local_stocks_day_k_df)  # type: ignore
+
+        # The new version replaced the old one, whose segment is closed
+        assert len(cache.datasets) == 1
+        assert set(_attached_segments) == {shared[1].name}
+    finally:
+        for dataset in shared:
+            dataset.unlink()
+
+
+def test_columnar_dataset_projection(local_stocks_day_k_df: pd.DataFrame):
+    df = local_stocks_day_k_df.set_index("timestamp", append=True)
+    with tempfile.TemporaryDirectory() as tempdir:
+        path = save_columnar_dataset(df, Path(tempdir) / "dataset")
+        pd.testing.assert_frame_equal(load_dataset(str(path))[df.columns], df)
+
+        projected_df = load_dataset(str(path), columns=["close", "market", "vol"])
+        assert sorted(projected_df.columns) == ["close", "market", "vol"]
+        assert projected_df.index.equals(df.index)
+        pd.testing.assert_series_equal(projected_df["close"], df["close"])
+
+
+def test_dataset_projection_is_opt_in(
+    optimization_conf: OptimizationConf, local_stocks_day_k_df: pd.DataFrame
+):
+    from tradepy.optimization.worker import get_dataset_columns
+
+    request = {"backtest_conf": optimization_conf.backtest.model_dump()}
+    assert get_dataset_columns(request) is None  # type: ignore
+
+    class ProjectedStrategy(MovingAverageCrossoverStrategy):
+        project_dataset = True
+        extra_dataset_columns = ("listdate",)
+
+    request["backtest_conf"]["strategy"]["strategy_class"] = ProjectedStrategy
+    columns = get_dataset_columns(request)  # type: ignore
+    assert columns is not None and {"close", "sma120", "listdate"} <= set(columns)
+
+    # The same columns whichever way the dataset arrives
+    df = local_stocks_day_k_df.set_index("timestamp", append=True)
+    columns = ["close", "market", "vol", "missing"]
+    with tempfile.TemporaryDirectory() as tempdir:
+        pkl_path = Path(tempdir) / "dataset.pkl"
+        df.to_pickle(pkl_path)
+        npy_path = save_columnar_dataset(df, Path(tempdir) / "dataset")
+        shared = SharedDataset.publish(df)
+        try:
+            frames = [
+                DatasetCache.load(
+                    {"dataset_path": path, "dataset_shm": shm}, columns  # type: ignore
+                )
+                for path, shm in [
+                    (str(pkl_path), ""),
+                    (str(npy_path), ""),
+                    (str(pkl_path), shared.name),
+                ]
+            ]
+        finally:
+            shared.unlink()
+
+    for frame in frames:
+        assert sorted(frame.columns) == ["close", "market", "vol"]
+
+
+def test_runs_result_without_output():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        result = BacktestRunsResult(tmp_dir)
+        assert result.load_capital_curves().empty
+        assert result.load_trade_returns().empty
+
+        # Tasks that have not written their trade books yet
+        (Path(tmp_dir) / "workers" / "task-1").mkdir(parents=True)
+        cap_curves_df = result.load_capital_curves()
+        assert list(cap_curves_df.columns) == ["run_id", "capital"]
+        assert isinstance(cap_curves_df.index, pd.DatetimeIndex)
+        assert result.load_trade_returns().index.name == "run_id"
@@ -80,3 +80,35 @@ def test_to_sell_order(position: Position, closed_position: Position):
     assert sell_remark["price"] == closing_price
     assert sell_remark["vol"] == order.vol
     assert sell_remark["pct_chg"] == approx(5)
+
+
+def test_backtest_position_matches_model(position: Position):
+    from tradepy.core.models import BacktestOrder, BacktestPosition
+
+    order = BacktestOrder("2023-09-16", "000333", 100, 100)
+    backtest_pos = BacktestPosition.from_order(order)
+    backtest_pos.update_price(position.latest_price)
+
+    for price in (90.0, 100.0, 123.45):
+        assert backtest_pos.total_value_at(price) == position.total_value_at(price)
+        assert backtest_pos.pct_chg_at(price) == position.pct_chg_at(price)
+    assert backtest_pos.price_at_pct_change(5) == position.price_at_pct_change(5)
+
+    model = backtest_pos.to_model()
+    assert isinstance(model, Position)
+    assert model.id == order.id
+    assert model.latest_price == position.latest_price
+    assert model.avail_vol == model.yesterday_vol == 100
+
+    sell_order = backtest_pos.to_sell_order("2023-09-18", "止盈")
+    assert sell_order.vol == 100 and sell_order.direction == "sell"
+
+
+def test_backtest_order_ids():
+    from tradepy.core.models import BacktestOrder
+
+    first, second = (BacktestOrder("2023-09-16", "000333", 10, 100) for _ in range(2))
+    assert first.id != second.id
+    assert first.id.startswith("000333-")
+    assert not hasattr(first, "__dict__")
+    assert first.to_model().placed_value == first.placed_value
@@ -0,0 +1,75 @@
+import os
+import sys
+import json
+import subprocess
+
+
+# Importing the package alone must not drag these in
+HEAVY_MODULES = [
+    "pandas",
+    "numpy",
+    "numba",
+    "akshare",
+    "tushare",
+    "pydantic",
+    "loguru",
+    "tqdm",
+    "networkx",
+    "plotly",
+    "sklearn",
+    "quantstats",
+]
+
+# Generous enough for slow CI machines, while an eager import of the vendors or the
+# config alone takes about a second
+MAX_IMPORT_SECONDS = 0.5
+
+
+def _import_in_fresh_process(module: str) -> dict:
+    script = f"""
+import sys, json, time
+start = time.perf_counter()
+import {module}
+print(json.dumps({{
+    "seconds": time.perf_counter() - start,
+    "loaded": [m for m in {HEAVY_MODULES!r} if m in sys.modules],
+}}))
+"""
+    res = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=os.environ | {"CI": "yes"},
+    )
+    return json.loads(res.stdout.strip().splitlines()[-1])
+
+
+def test_import_tradepy_is_fast():
+    # Best of a few runs, to rule out noises
+    runs = [_import_in_fresh_process("tradepy") for _ in range(3)]
+
+    assert runs[0]["loaded"] == []
+    assert min(run["seconds"] for run in runs) < MAX_IMPORT_SECONDS
+
+
+def test_heavy_dependencies_are_loaded_on_demand():
+    conf_run = _import_in_fresh_process("tradepy.core.conf")
+    assert not {"akshare", "tushare", "networkx"} & set(conf_run["loaded"])
+
+    result_run = _import_in_fresh_process("tradepy.optimization.result")
+    assert not {"plotly", "sklearn", "quantstats"} & set(result_run["loaded"])
+
+
+def test_lazy_globals():
+    script = """
+import sys, tradepy
+assert "tushare" not in sys.modules
+assert tradepy.ts_api is sys.modules["tradepy.vendors.tushare"]
+assert type(tradepy.listing).__name__ == "StocksPool"
+assert tradepy.listing is tradepy.listing
+assert tradepy.__version__
+"""
+    subprocess.run(
+        [sys.executable, "-c", script], check=True, env=os.environ | {"CI": "yes"}
+    )
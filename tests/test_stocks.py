@@ -0,0 +1,24 @@
+import pandas as pd
+
+from tradepy.stocks import CodeDictionary
+
+
+def test_code_dictionary_keeps_assigned_ids():
+    prev_ids = CodeDictionary.assign_ids(["000002", "000001"])
+    assert prev_ids.to_dict() == {"000002": 1, "000001": 0}
+
+    ids = CodeDictionary.assign_ids(["600000", "000001", "000002"], prev_ids)
+    assert ids.to_dict() == {"600000": 2, "000001": 0, "000002": 1}
+
+
+def test_code_dictionary_encode_decode():
+    code_dict = CodeDictionary(CodeDictionary.assign_ids(["000001", "000002"]))
+
+    ids = code_dict.encode(pd.Index(["000002", "000001", "000002"]))
+    assert ids.tolist() == [1, 0, 1]
+
+    # Unknown codes are given temporary ids
+    ids = code_dict.encode(["300001", "000001"])
+    assert ids.tolist() == [2, 0]
+    assert len(code_dict) == 3
+    assert code_dict.decode([2, 1, 0]).tolist() == ["300001", "000002", "000001"]
@@ -230,6 +230,22 @@ def test_generate_valid_buy_orders(
         assert trade_amount >= strategy_conf.min_trade_amount
 
 
+def test_allocate_buy_orders_batch(
+    sample_strategy: SampleBacktestStrategy,
+    sample_portfolio: pd.DataFrame,
+):
+    batch = sample_strategy.allocate_buy_orders(
+        sample_portfolio, "2023-03-03", budget=1e6
+    )
+    orders = batch.to_orders()
+
+    assert len(orders) == len(batch) == len(sample_portfolio)
+    assert [o.code for o in orders] == batch.codes.tolist()
+    assert [o.vol for o in orders] == batch.vols.tolist()
+    assert batch.costs.sum() <= 1e6
+    assert (batch.costs == [o.placed_value for o in orders]).all()
+
+
 @pytest.mark.parametrize("budget", [-100, 0, 100])
 def test_generate_no_orders_if_insufficient_budget(
     sample_strategy: SampleBacktestStrategy,
@@ -1,7 +1,15 @@
+import pickle
 import pytest
+import numpy as np
 import tempfile
+import pandas as pd
 from pandas.testing import assert_frame_equal
 
+from tradepy.backtest.evaluation import (
+    BasicEvaluator,
+    BatchEvaluator,
+    StreamingEvaluator,
+)
 from tradepy.core.models import Position, Account
 from tradepy.trade_book import TradeBook
 from tradepy.trade_book.storage import SQLiteTradeBookStorage, InMemoryTradeBookStorage
@@ -125,3 +133,209 @@ def test_sqlite_tradebook_log_capitals(
     assert len(capitals_df) == 1
     assert str(capitals_df.iloc[0].name.date()) == date  # type: ignore
     assert capitals_df.iloc[0]["free_cash_amount"] == expect_closing_free_cash
+
+
+def test_in_memory_storage_columns(
+    in_memory_trade_book: TradeBook, sample_account: Account, sample_position: Position
+):
+    storage: InMemoryTradeBookStorage = in_memory_trade_book.storage  # type: ignore
+    n_days = 1000  # more than the initial buffer capacity
+    for day in range(n_days):
+        in_memory_trade_book.buy(str(day), sample_position)
+        in_memory_trade_book.log_closing_capitals(str(day), sample_account)
+
+    trades_df = storage.fetch_trade_logs_df()
+    assert len(trades_df) == n_days
+    assert trades_df["action"].dtype == "category"
+    assert trades_df["code"].cat.categories.tolist() == ["000333"]
+    assert trades_df["vol"].dtype == np.int64
+
+    # Zero-copy and read-only views
+    buffer = storage.trade_logs.buffers["price"].data
+    assert np.shares_memory(trades_df["price"].values, buffer)
+    with pytest.raises(ValueError):
+        trades_df["price"].values[0] = 0
+
+    # Copy-on-write clones
+    clone = storage.clone()
+    assert storage.trade_logs.buffers["price"].data is buffer
+    assert clone.trade_logs.buffers["price"].data is buffer
+    clone.buy(in_memory_trade_book.make_open_position_log("new", sample_position))
+    assert len(clone.fetch_trade_logs_df()) == n_days + 1
+    assert len(storage.fetch_trade_logs_df()) == n_days
+    assert storage.trade_logs.buffers["price"].data is buffer
+
+    # Pickles only the logged rows
+    restored = pickle.loads(pickle.dumps(storage))
+    assert len(restored.trade_logs.buffers["price"].data) == n_days
+    assert_frame_equal(restored.fetch_trade_logs_df(), trades_df)
+    assert restored.fetch_capital_logs() == storage.fetch_capital_logs()
+
+
+def test_sqlite_storage(sqlite_db_location, sample_position: Position):
+    from tradepy.trade_book.storage.sqlite import close_connections
+
+    trade_book = TradeBook.live_trading(sqlite_db_location)
+    another = TradeBook.live_trading(sqlite_db_location)
+    storage: SQLiteTradeBookStorage = trade_book.storage  # type: ignore
+    assert storage.conn is another.storage.conn  # type: ignore
+
+    journal_mode = storage.conn.execute("pragma journal_mode").fetchone()[0]
+    assert journal_mode == "wal"
+    indexes = {
+        row[0]
+        for row in storage.conn.execute(
+            "select name from sqlite_master where type = 'index'"
+        )
+    }
+    assert {"idx_TradeLog_timestamp", "idx_TradeLog_code"} <= indexes
+
+    # Batched trades are written on exit
+    with trade_book.batch():
+        trade_book.buy("2023-09-17", sample_position)
+        trade_book.buy("2023-09-18", sample_position)
+        assert not another.storage.fetch_trade_logs()
+    assert len(another.storage.fetch_trade_logs()) == 2
+
+    # ... including those collected before an error
+    with pytest.raises(RuntimeError):
+        with trade_book.batch():
+            trade_book.buy("2023-09-18", sample_position)
+            raise RuntimeError
+    assert len(another.storage.fetch_trade_logs()) == 3
+    assert trade_book.metrics.actions[TradeActions.OPEN] == 3
+
+    # Values are bound, not formatted into the statements
+    quoted = sample_position.model_copy(update={"id": "it's"})
+    trade_book.buy("2023-09-19", quoted)
+    assert storage.trade_logs_tbl.select(storage.conn, id="it's")[0]["code"] == "000333"
+
+    close_connections()
+
+
+def test_save_and_load(
+    in_memory_trade_book: TradeBook, sample_account: Account, sample_position: Position
+):
+    for day in range(1, 11):
+        date = f"2023-09-{day:02d}"
+        in_memory_trade_book.buy(date, sample_position)
+        in_memory_trade_book.log_closing_capitals(date, sample_account)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = in_memory_trade_book.save(f"{tmp_dir}/trade_book")
+        loaded = TradeBook.load(path)
+        assert_frame_equal(loaded.trade_logs_df, in_memory_trade_book.trade_logs_df)
+        assert_frame_equal(loaded.cap_logs_df, in_memory_trade_book.cap_logs_df)
+
+        # Only the capital column is read
+        caps_df = TradeBook.load_capitals(path)
+        assert caps_df.columns.tolist() == ["capital"]
+        assert (caps_df["capital"] == in_memory_trade_book.cap_logs_df["capital"]).all()
+
+        # The loaded book is still appendable, without touching the saved files
+        loaded.buy("2023-09-11", sample_position)
+        assert len(loaded.storage.fetch_trade_logs_df()) == 11
+        assert len(TradeBook.load(path).storage.fetch_trade_logs_df()) == 10
+
+
+def simulate_trades(trade_book: TradeBook, rng: np.random.Generator, n_days=100):
+    capital = 1e6
+    sell_methods = [trade_book.close, trade_book.stop_loss, trade_book.take_profit]
+    for i, date in enumerate(pd.bdate_range("2023-01-02", periods=n_days).astype(str)):
+        pos = Position(
+            id=str(i),
+            timestamp=date,
+            code="000333",
+            vol=100,
+            price=10.0,
+            latest_price=10.0,
+            avail_vol=100,
+            yesterday_vol=100,
+        )
+        trade_book.buy(date, pos)
+        pos.update_price(round(10 * (1 + rng.normal(0, 0.05)), 2))
+        sell_methods[i % 3](date, pos)
+
+        capital *= 1 + rng.normal(0, 0.01)
+        account = Account(
+            frozen_cash_amount=0.0, market_value=capital / 2, free_cash_amount=capital / 2
+        )
+        trade_book.log_closing_capitals(date, account)
+
+
+def test_streaming_metrics(in_memory_trade_book: TradeBook):
+    simulate_trades(in_memory_trade_book, np.random.default_rng(0))
+
+    metrics = StreamingEvaluator(in_memory_trade_book).evaluate_trades()
+    expected = BasicEvaluator(in_memory_trade_book).evaluate_trades()
+    assert metrics == pytest.approx(expected)
+
+    # Kept through clones and saved trade books
+    clone = in_memory_trade_book.clone()
+    assert clone.metrics == in_memory_trade_book.metrics
+    assert clone.metrics.returns is not in_memory_trade_book.metrics.returns
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = in_memory_trade_book.save(f"{tmp_dir}/trade_book")
+        assert TradeBook.load(path).metrics.evaluate() == pytest.approx(metrics)
+
+        (path / "metrics.json").unlink()
+        assert TradeBook.load(path).metrics.evaluate() == pytest.approx(metrics)
+
+
+def test_batch_evaluator():
+    rng = np.random.default_rng(0)
+    trade_books = [TradeBook.backtest() for _ in range(5)]
+    for trade_book in trade_books:
+        simulate_trades(trade_book, rng)
+    # Runs of different lengths
+    simulate_trades(short_run := TradeBook.backtest(), rng, n_days=50)
+    trade_books.append(short_run)
+
+    evaluator = BatchEvaluator.from_trade_books(trade_books)
+    assert evaluator.capitals.shape == (6, 100)
+    assert evaluator.trade_returns.shape == (6, 100)  # type: ignore
+
+    metrics_df = evaluator.evaluate()
+    for run_id, trade_book in enumerate(trade_books):
+        expected = BasicEvaluator(trade_book).evaluate_trades()
+        actual = metrics_df.loc[run_id].to_dict()
+        assert actual == pytest.approx({k: expected[k] for k in actual})
+
+    # Capital curves over different date ranges are not padded with flat days
+    cap_curves_df = pd.concat(
+        [
+            trade_book.cap_logs_df[["capital"]]
+            .assign(run_id=run_id)
+            .shift(30 * run_id, freq="B")
+            for run_id, trade_book in enumerate(trade_books)
+        ]
+    )
+    curves_df = BatchEvaluator.from_capital_curves(cap_curves_df).evaluate()
+    assert_frame_equal(
+        curves_df.drop(columns="win_rate"), metrics_df.drop(columns="win_rate")
+    )
+
+    bounds_df = evaluator.bootstrap(n_samples=200, seed=0, chunk_size=10_000)
+    assert_frame_equal(bounds_df, evaluator.bootstrap(n_samples=200, seed=0))
+    for metric in ["total_returns", "max_drawdown", "sharpe_ratio"]:
+        lower, upper = bounds_df[(metric, "lower")], bounds_df[(metric, "upper")]
+        assert (lower <= metrics_df[metric]).all()
+        assert (metrics_df[metric] <= upper).all()
+
+
+def test_batch_bootstrap():
+    # Two identical runs, losing 1% each day
+    capitals = 100 * 0.99 ** np.arange(50)
+    evaluator = BatchEvaluator(capitals=np.vstack([capitals, capitals]))
+    bounds_df = evaluator.bootstrap(n_samples=200, seed=0)
+
+    # The runs are resampled independently
+    assert not bounds_df.loc[0].equals(bounds_df.loc[1])
+
+    # The capital before the first day counts as the first peak, so the whole loss
+    # is a drawdown
+    for bound in ["lower", "upper"]:
+        assert bounds_df[("max_drawdown", bound)].to_numpy() == pytest.approx(
+            bounds_df[("total_returns", bound)].to_numpy() - 100, abs=0.011
+        )
@@ -1,3 +1,4 @@
+import pytest
 import numpy as np
 import pandas as pd
 from datetime import date
@@ -17,7 +18,7 @@ from tradepy.utils import (
     optimize_dtype_memory,
     import_class,
 )
-from tradepy.trade_cal import trade_cal
+from tradepy.trade_cal import TradingCalendar, trade_cal, trade_calendar
 
 
 def test_gt():
@@ -93,6 +94,44 @@ def test_get_latest_trade_date():
         assert str(latest_trade_date) == trade_cal[0]
 
 
+def test_trading_calendar():
+    # A Friday, then the weekend and a Monday holiday
+    cal = TradingCalendar(["2023-09-18", "2023-09-15", "2023-09-14", "2023-09-19"])
+    assert cal.first == "2023-09-14" and cal.last == "2023-09-19"
+
+    assert "2023-09-15" in cal and date(2023, 9, 15) in cal
+    assert "2023-09-16" not in cal
+    assert cal.ordinal("2023-09-18") == 2
+
+    assert cal.next("2023-09-15") == "2023-09-18"
+    assert cal.next("2023-09-16") == "2023-09-18"
+    assert cal.next("2023-09-15", inclusive=True) == "2023-09-15"
+    assert cal.prev("2023-09-17") == "2023-09-15"
+    assert cal.prev("2023-09-18", inclusive=True) == "2023-09-18"
+    with pytest.raises(IndexError):
+        cal.next("2023-09-19")
+
+    assert cal.offset("2023-09-14", 2) == "2023-09-18"
+    assert cal.offset("2023-09-17", -1) == "2023-09-14"
+    assert cal.offset("2023-09-19", 5, clip=True) == "2023-09-19"
+    with pytest.raises(IndexError):
+        cal.offset("2023-09-19", 1)
+
+    assert cal.range("2023-09-15", "2023-09-18") == ["2023-09-15", "2023-09-18"]
+    assert cal.range(until_date="2023-09-16") == ["2023-09-14", "2023-09-15"]
+
+    dates = np.array(["2023-09-14", "2023-09-16", "2023-09-19"])
+    assert cal.to_ordinals(dates).tolist() == [0, 2, 3]
+    assert cal.to_ordinals(dates.astype("datetime64[D]")).tolist() == [0, 2, 3]
+    assert cal.from_ordinals([0, 3]).tolist() == ["2023-09-14", "2023-09-19"]
+    assert cal.is_trade_day(dates).tolist() == [True, False, True]
+
+
+def test_trading_calendar_matches_trade_cal_list():
+    assert list(trade_calendar) == trade_cal[::-1]
+    assert trade_calendar.offset(trade_cal[10], -5) == trade_cal[15]
+
+
 def test_chunks():
     data = list(range(10))
     batch_size = 3
@@ -136,7 +175,7 @@ def test_optimize_dtype_memory():
         }
     )
     optimized_df = optimize_dtype_memory(sample_data)
-    assert optimized_df["small_floats"].dtype == np.float16
+    assert optimized_df["small_floats"].dtype == np.float32
     assert optimized_df["large_floats"].dtype == np.float32
     assert optimized_df["small_integers"].dtype == np.int8
     assert optimized_df["large_integers"].dtype == np.int32
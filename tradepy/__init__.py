@@ -1,24 +1,22 @@
 import os
 import sys
 import random
-import importlib.metadata
-import tomllib
-from loguru import logger
-from tqdm import tqdm
-
-from tradepy.stocks import StocksPool
-from tradepy.vendors import akshare, tushare
-from tradepy.core.conf import TradePyConf
+from types import ModuleType
+from typing import TYPE_CHECKING, Any
+
 from tradepy.hacks import inject_hacks
 from tradepy.logging import LOG  # noqa
 
+if TYPE_CHECKING:
+    from tradepy.stocks import StocksPool
+    from tradepy.core.conf import TradePyConf
+    from tradepy.vendors.akshare import AkShareClient
 
-try:
-    with open("pyproject.toml", "rb") as f:
-        pyproject = tomllib.load(f)
-    __version__ = pyproject["tool"]["poetry"]["version"]
-except FileNotFoundError as e:
-    __version__ = importlib.metadata.version("tradepy")
+    __version__: str
+    config: TradePyConf
+    listing: StocksPool
+    ak_api: AkShareClient
+    ts_api: ModuleType
 
 
 def is_bootstrapping():
@@ -37,13 +35,8 @@ def is_ci():
     return os.environ.get("CI", "no") == "yes"
 
 
-tqdm.pandas()
-
 random.seed()
 
-ak_api = akshare.AkShareClient()
-ts_api = tushare
-
 environment_status = {
     "bootstrapping": is_bootstrapping(),
     "running_tests": is_running_tests(),
@@ -51,20 +44,77 @@ environment_status = {
     "ci": is_ci(),
 }
 
-try:
-    config: TradePyConf = TradePyConf.load_from_config_file()
-except FileNotFoundError:
-    if (
-        environment_status["bootstrapping"]
-        or environment_status["building_docs"]
-        or environment_status["running_tests"]
-        or environment_status["ci"]
-    ):
-        logger.debug(f"TradePy配置项无法从配置文件中加载。当前环境状态{environment_status}")
-    else:
+
+# --------------------
+# Lazy loaded globals
+# --------------------
+# The config, the vendor clients and the stocks listing pull in heavy dependencies
+# (pandas, akshare, tushare, pydantic...), so they are only set up on first access.
+# Every Celery task, Dask worker and CLI call thereby only pays for what it uses.
+def _load_version() -> str:
+    import importlib.metadata
+    import tomllib
+
+    try:
+        with open("pyproject.toml", "rb") as f:
+            pyproject = tomllib.load(f)
+        return pyproject["tool"]["poetry"]["version"]
+    except FileNotFoundError:
+        return importlib.metadata.version("tradepy")
+
+
+def _load_config() -> "TradePyConf":
+    from tradepy.core.conf import TradePyConf
+
+    try:
+        return TradePyConf.load_from_config_file()
+    except FileNotFoundError:
+        if (
+            environment_status["bootstrapping"]
+            or environment_status["building_docs"]
+            or environment_status["running_tests"]
+            or environment_status["ci"]
+        ):
+            from loguru import logger
+
+            logger.debug(f"TradePy配置项无法从配置文件中加载。当前环境状态{environment_status}")
+            raise AttributeError("config")
         raise
 
 
-listing: StocksPool = StocksPool()
+def _load_ak_api() -> "AkShareClient":
+    from tradepy.vendors import akshare
+
+    return akshare.AkShareClient()
+
+
+def _load_ts_api() -> ModuleType:
+    from tradepy.vendors import tushare
+
+    return tushare
+
+
+def _load_listing() -> "StocksPool":
+    from tradepy.stocks import StocksPool
+
+    return StocksPool()
+
+
+_lazy_loaders = {
+    "__version__": _load_version,
+    "config": _load_config,
+    "ak_api": _load_ak_api,
+    "ts_api": _load_ts_api,
+    "listing": _load_listing,
+}
+
+
+def __getattr__(name: str) -> Any:
+    if (loader := _lazy_loaders.get(name)) is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = globals()[name] = loader()
+    return value
+
 
 inject_hacks()
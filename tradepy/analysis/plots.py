@@ -132,16 +132,15 @@ def plot_return_box(
 def plot_bars(
     bars_df, code: str, buy_date: str, window_size: tuple[int, int] = (200, 60)
 ):
-    trade_cal = sorted(tradepy.trade_cal.trade_cal)
+    trade_calendar = tradepy.trade_cal.trade_calendar
 
     df = bars_df.query("code == @code").reset_index().copy()
     df["ma60"] = talib.SMA(df["close"], 60).round(2)
     df["ma20"] = talib.SMA(df["close"], 20).round(2)
     df["ma5"] = talib.SMA(df["close"], 5).round(2)
 
-    mid_day_cal_idx = trade_cal.index(buy_date)
-    sicne_date = trade_cal[max(mid_day_cal_idx - window_size[0], 0)]
-    until_date = trade_cal[min(mid_day_cal_idx + window_size[1], len(trade_cal) - 1)]
+    sicne_date = trade_calendar.offset(buy_date, -window_size[0], clip=True)
+    until_date = trade_calendar.offset(buy_date, window_size[1], clip=True)
 
     df = df.query("@sicne_date <= timestamp <= @until_date")
     df.dropna(inplace=True)
@@ -1,3 +1,3 @@
 # flake8: noqa
-from tradepy.backtest.evaluation import BasicEvaluator
+from tradepy.backtest.evaluation import BasicEvaluator, StreamingEvaluator
 from tradepy.backtest.backtester import Backtester
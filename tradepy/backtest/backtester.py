@@ -5,11 +5,11 @@ import numpy as np
 from typing import TYPE_CHECKING
 from tqdm import tqdm
 
+import tradepy
+
 from tradepy import LOG, utils
 from tradepy.blacklist import Blacklist
 from tradepy.core.account import BacktestAccount
-from tradepy.core.order import Order
-from tradepy.core.position import Position
 from tradepy.depot.stocks import StockMinuteBarsDepot
 from tradepy.mixins import TradeMixin
 from tradepy.trade_book import TradeBook
@@ -56,35 +56,44 @@ class Backtester(TradeMixin):
 
         raise ValueError(f"无效的滑点配置: {slip}")
 
-    def __orders_to_positions(self, orders: list[Order]) -> list[Position]:
-        return [
-            Position(
-                id=o.id,
-                code=o.code,
-                price=o.price,
-                latest_price=o.price,
-                timestamp=o.timestamp,
-                vol=o.vol,
-                avail_vol=o.vol,
-                yesterday_vol=o.vol,
-            )
-            for o in orders
-        ]
+    def max_position_value(self, strategy: "StrategyBase") -> float:
+        return strategy.max_position_size * self.account.total_asset_value
+
+    def _holding_mask(
+        self, df: pd.DataFrame, code_ids: np.ndarray | None = None
+    ) -> np.ndarray:
+        holding_codes = self.account.holdings.position_codes
+        if not holding_codes:
+            return np.zeros(len(df), dtype=bool)
+
+        code_dict = tradepy.listing.code_dict
+        if code_ids is None:
+            code_ids = code_dict.encode(df.index)
+        return np.isin(code_ids, code_dict.encode(holding_codes))
 
     def get_buy_options(
         self,
         df: pd.DataFrame,
         strategy: "StrategyBase",
+        code_ids: np.ndarray | None = None,
+        date: str | None = None,
     ) -> pd.DataFrame:
-        holding_codes = self.account.holdings.position_codes
+        """
+        :param date: the simulated trading date, against which the blacklist is
+            checked. Default to today.
+        """
+        candidates_df = df[strategy.buy_indicators]
+        if self.account.holdings.position_codes:
+            candidates_df = candidates_df[~self._holding_mask(df, code_ids)]
+
+        if (blacklisted := Blacklist.mask(candidates_df.index, date)).any():
+            candidates_df = candidates_df[~blacklisted]
 
         # Looks ugly but it's fast...
         codes_and_prices = [
             (code, price_and_weight[0], price_and_weight[1])
-            for code, *indicators in df[strategy.buy_indicators].itertuples(name=None)
-            if (code not in holding_codes)
-            and (not Blacklist.contains(code))
-            and (price_and_weight := strategy.should_buy(*indicators))
+            for code, *indicators in candidates_df.itertuples(name=None)
+            if (price_and_weight := strategy.should_buy(*indicators))
         ]
 
         if not codes_and_prices:
@@ -100,19 +109,22 @@ class Backtester(TradeMixin):
         )
 
     def get_close_signals(
-        self, df: pd.DataFrame, strategy: "StrategyBase"
+        self,
+        df: pd.DataFrame,
+        strategy: "StrategyBase",
+        code_ids: np.ndarray | None = None,
     ) -> list[str]:
         if not strategy.sell_indicators:
             return []
 
-        curr_positions = self.account.holdings.position_codes
-        if not curr_positions:
+        if not self.account.holdings.position_codes:
             return []
 
+        positions_df = df.loc[self._holding_mask(df, code_ids), strategy.sell_indicators]
         return [
             code
-            for code, *indicators in df[strategy.sell_indicators].itertuples(name=None)
-            if (code in curr_positions) and strategy.should_sell(*indicators)
+            for code, *indicators in positions_df.itertuples(name=None)
+            if strategy.should_sell(*indicators)
         ]
 
     def _trade_using_day_k(
@@ -121,10 +133,11 @@ class Backtester(TradeMixin):
         bars_df: pd.DataFrame,
         trade_book: TradeBook,
         strategy: "StrategyBase",
+        code_ids: np.ndarray | None = None,
     ):
         # Sell
-        buys_df = self.get_buy_options(bars_df, strategy)
-        close_codes = self.get_close_signals(bars_df, strategy)
+        buys_df = self.get_buy_options(bars_df, strategy, code_ids, date)
+        close_codes = self.get_close_signals(bars_df, strategy, code_ids)
         sell_positions = []
 
         for code, pos in self.account.holdings:
@@ -191,10 +204,13 @@ class Backtester(TradeMixin):
                 total_asset_value=self.account.total_asset_value,
             )
 
-            buy_orders = strategy.generate_buy_orders(buys_df, date, budget)
-            buy_positions = self.__orders_to_positions(buy_orders)
-
-            self.account.buy(buy_positions)
+            batch = strategy.allocate_buy_orders(
+                buys_df,
+                date,
+                budget,
+                max_position_value=self.max_position_value(strategy),
+            )
+            buy_positions = self.account.buy_batch(batch)
             for pos in buy_positions:
                 trade_book.buy(date, pos)
 
@@ -202,16 +218,17 @@ class Backtester(TradeMixin):
         self,
         date: str,
         day_df: pd.DataFrame,
-        min_df: pd.DataFrame,
+        minute_bars_depot: StockMinuteBarsDepot,
         trade_book: TradeBook,
         strategy: "StrategyBase",
+        code_ids: np.ndarray | None = None,
     ):
-        buys_df = self.get_buy_options(day_df, strategy)
+        buys_df = self.get_buy_options(day_df, strategy, code_ids, date)
         suspending_codes = set()
 
         # Only look at the intraday bars of the stocks that are tradable (ones can be bought / sold)
         tradable_codes: list[str] = list(
-            set(buys_df.index) | set(self.account.holdings.position_codes)
+            self.account.holdings.position_codes.union(buys_df.index)
         )
 
         if not tradable_codes:
@@ -229,15 +246,16 @@ class Backtester(TradeMixin):
             tradable_codes = list(set(tradable_codes) - suspending_codes)
             adjust_factors = compute_adjust_factors(tradable_codes)
 
-        min_df = min_df.loc[tradable_codes].copy()
-        min_df.sort_index(inplace=True)
+        # Only decode the intraday bars of the tradable stocks
+        min_df = minute_bars_depot.load_day(date, tradable_codes)
+        min_df.sort_index(kind="stable", inplace=True)
         min_df["orig_open"] = min_df["open"].copy()
         min_df["open"] = (min_df["open"] * adjust_factors).values
         min_df["low"] = (min_df["low"] * adjust_factors).values
         min_df["high"] = (min_df["high"] * adjust_factors).values
         min_df["close"] = (min_df["close"] * adjust_factors).values
 
-        for time, min_bars in min_df.groupby("time"):
+        for time, min_bars in min_df.groupby("time", observed=True):
             # Sell
             # if time < "1456":
             for code in self.account.holdings.position_codes:
@@ -297,10 +315,13 @@ class Backtester(TradeMixin):
                         total_asset_value=self.account.total_asset_value,
                     )
 
-                    buy_orders = strategy.generate_buy_orders(_buys_df, date, budget)
-                    buy_positions = self.__orders_to_positions(buy_orders)
-
-                    self.account.buy(buy_positions)
+                    batch = strategy.allocate_buy_orders(
+                        _buys_df,
+                        date,
+                        budget,
+                        max_position_value=self.max_position_value(strategy),
+                    )
+                    buy_positions = self.account.buy_batch(batch)
                     for pos in buy_positions:
                         trade_book.buy(date, pos)
 
@@ -317,31 +338,45 @@ class Backtester(TradeMixin):
                 df.reset_index(inplace=True, drop=True)
             df.set_index(["timestamp", "code"], inplace=True, drop=False)
             df.sort_index(inplace=True)
+        elif not df.index.is_monotonic_increasing:
+            df.sort_index(inplace=True)
 
         LOG.info(">>> 交易中 ...")
         trade_book = TradeBook.backtest()
 
+        # Split the frame into days where the timestamp changes, using the index's
+        # integer codes, which saves comparing the timestamp strings of every row
+        timestamps = df.index.get_level_values("timestamp")
+        day_codes = df.index.codes[df.index.names.index("timestamp")]
+        bounds = np.flatnonzero(np.diff(day_codes, prepend=-1, append=-1))
+        days_df = df.droplevel("timestamp")
+        code_ids = tradepy.listing.code_dict.encode(days_df.index)
+
         # Per day
-        month, month_minute_df = None, pd.DataFrame()
-        for date, bars_df in tqdm(df.groupby(level="timestamp"), file=sys.stdout):
-            assert isinstance(date, str)
+        minute_bars_depot = StockMinuteBarsDepot() if self.use_minute_k else None
+        for start, end in tqdm(
+            zip(bounds[:-1], bounds[1:]), total=len(bounds) - 1, file=sys.stdout
+        ):
+            date: str = timestamps[start]
 
             # Opening
-            bars_df = bars_df.loc[date]  # to remove the timestamp index
-            price_lookup = lambda code: bars_df.loc[code, "close"]  # NOTE: slow
-            self.account.update_holdings(price_lookup)
+            bars_df = days_df.iloc[start:end]
+            self.account.update_holdings(bars_df.index, bars_df["close"].to_numpy())
 
             # Trading
-            if self.use_minute_k:
-                if month != date[:7]:
-                    month = date[:7]
-                    month_minute_df = StockMinuteBarsDepot.load(month)
-
+            if minute_bars_depot is not None:
                 self._trade_using_minute_k(
-                    date, bars_df, month_minute_df.loc[(date,)], trade_book, strategy
+                    date,
+                    bars_df,
+                    minute_bars_depot,
+                    trade_book,
+                    strategy,
+                    code_ids[start:end],
                 )
             else:
-                self._trade_using_day_k(date, bars_df, trade_book, strategy)
+                self._trade_using_day_k(
+                    date, bars_df, trade_book, strategy, code_ids[start:end]
+                )
 
             # Logging
             trade_book.log_closing_capitals(date, self.account)
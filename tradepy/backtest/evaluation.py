@@ -5,7 +5,7 @@ import pandas as pd
 import quantstats as qs
 from dataclasses import dataclass
 from tradepy.trade_book import TradeBook
-from tradepy.trade_cal import trade_cal
+from tradepy.types import TradeActions
 
 
 def coerce_type(type_):
@@ -124,3 +124,265 @@ class BasicEvaluator(ResultEvaluator):
 夏普比率: {metrics["sharpe_ratio"]}
 ==========="""
         )
+
+
+class StreamingEvaluator(BasicEvaluator):
+    """
+    Reads the metrics the trade book accumulated while logging, instead of building
+    the log frames.
+    """
+
+    def evaluate_trades(self) -> dict[str, Any]:
+        return self.trade_book.metrics.evaluate()
+
+
+# NOTE: the helpers below work along the last axis, and skip the NaN padded days
+
+def _sharpe_ratio(returns: np.ndarray, periods: int) -> np.ndarray:
+    count = (~np.isnan(returns)).sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.nansum(returns, axis=-1) / count
+        deviations = returns - mean[..., np.newaxis]
+        std = np.sqrt(np.nansum(deviations**2, axis=-1) / (count - 1))
+        ratio = mean / std
+    ratio[~np.isfinite(ratio)] = np.nan
+    return ratio * np.sqrt(periods)
+
+
+def _profit_factor(returns: np.ndarray) -> np.ndarray:
+    gains = np.where(returns >= 0, returns, 0).sum(axis=-1)
+    losses = -np.where(returns < 0, returns, 0).sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        factor = gains / losses
+    # Same as quantstats when there's no loss
+    return np.where(losses == 0, np.where(gains == 0, 0.0, np.inf), factor)
+
+
+def _drawdowns(capitals: np.ndarray, initial: float | None = None) -> np.ndarray:
+    """
+    :param initial: the capital before the first day, which then counts as the
+        first peak
+    """
+    peaks = np.fmax.accumulate(capitals, axis=-1)
+    if initial is not None:
+        peaks = np.fmax(peaks, initial)
+    return capitals / peaks - 1
+
+
+def _max_drawdown(capitals: np.ndarray, initial: float | None = None) -> np.ndarray:
+    return np.fmin.reduce(_drawdowns(capitals, initial), axis=-1)
+
+
+@dataclass
+class BatchEvaluator:
+    """
+    Evaluates many backtest runs at once. The capital curves are stacked into a
+    (runs, days) array, so each metric is one NumPy pass over all the runs.
+
+    The metrics are in the same units as `BasicEvaluator`.
+    """
+
+    capitals: np.ndarray  # (runs, days), shorter runs padded with NaN at the end
+    trade_returns: np.ndarray | None = None  # (runs, trades) sell pct_chg, NaN padded
+    run_ids: pd.Index | None = None
+    periods: int = 252
+
+    def __post_init__(self):
+        self.capitals = np.atleast_2d(np.asarray(self.capitals, dtype=np.float64))
+        if self.run_ids is None:
+            self.run_ids = pd.RangeIndex(len(self.capitals), name="run_id")
+
+    @classmethod
+    def from_capital_curves(
+        cls, cap_curves_df: pd.DataFrame, trade_returns: pd.Series | None = None
+    ) -> "BatchEvaluator":
+        """
+        :param cap_curves_df: the capitals indexed by timestamp with the run_id column,
+            as given by `BacktestRunsResult.load_capital_curves`. Each run keeps only
+            its own days, so runs over different date ranges are padded with NaN.
+        :param trade_returns: the pct_chg of the sells, indexed by run_id
+        """
+        caps_df = cap_curves_df.reset_index().pivot_table(
+            index="run_id", columns="timestamp", values="capital", aggfunc="last"
+        )
+        capitals = caps_df.to_numpy(dtype=np.float64)
+
+        # Move each run's days to the front, leaving the NaN padding at the end
+        missing = np.isnan(capitals)
+        order = np.argsort(missing, axis=1, kind="stable")
+        capitals = np.take_along_axis(capitals, order, axis=1)
+        capitals = capitals[:, : (~missing).sum(axis=1).max(initial=0)]
+
+        return cls(
+            capitals=capitals,
+            trade_returns=None
+            if trade_returns is None
+            else cls._pad_by_run(trade_returns, caps_df.index),
+            run_ids=caps_df.index,
+        )
+
+    @classmethod
+    def from_trade_books(
+        cls, trade_books: list[TradeBook], run_ids: list[str] | None = None
+    ) -> "BatchEvaluator":
+        caps_list, returns_list, index = [], [], []
+        for idx, trade_book in enumerate(trade_books):
+            trades_df = trade_book.storage.fetch_trade_logs_df()
+            sells = trades_df["action"] != TradeActions.OPEN
+            returns_list.append(trades_df.loc[sells, "pct_chg"].to_numpy())
+            caps_list.append(trade_book.cap_logs_df["capital"].to_numpy())
+            index.append(run_ids[idx] if run_ids else idx)
+
+        run_index = pd.Index(index, name="run_id")
+        trade_returns = pd.Series(
+            np.concatenate(returns_list),
+            index=run_index.repeat([len(r) for r in returns_list]),
+        )
+        return cls(
+            capitals=cls._stack(caps_list),
+            trade_returns=cls._pad_by_run(trade_returns, run_index),
+            run_ids=run_index,
+        )
+
+    @staticmethod
+    def _stack(arrays: list[np.ndarray]) -> np.ndarray:
+        width = max(len(arr) for arr in arrays)
+        stacked = np.full((len(arrays), width), np.nan)
+        for row, arr in enumerate(arrays):
+            stacked[row, : len(arr)] = arr
+        return stacked
+
+    @staticmethod
+    def _pad_by_run(values: pd.Series, run_ids: pd.Index) -> np.ndarray:
+        rows = run_ids.get_indexer(values.index)
+        values = values[rows >= 0]
+        rows = rows[rows >= 0]
+
+        # The position of each value within its run
+        order = np.argsort(rows, kind="stable")
+        rows = rows[order]
+        counts = np.bincount(rows, minlength=len(run_ids))
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        cols = np.arange(len(rows)) - starts[rows]
+
+        padded = np.full((len(run_ids), counts.max(initial=0)), np.nan)
+        padded[rows, cols] = values.to_numpy(dtype=np.float64)[order]
+        return padded
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """
+        The number of days of each run.
+        """
+        return (~np.isnan(self.capitals)).sum(axis=1)
+
+    @property
+    def returns(self) -> np.ndarray:
+        """
+        The daily returns, being 0 on the first day like `TradeBook.cap_logs_df`.
+        """
+        returns = np.zeros_like(self.capitals)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns[:, 1:] = self.capitals[:, 1:] / self.capitals[:, :-1] - 1
+        returns = np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0)
+        returns[np.isnan(self.capitals)] = np.nan
+        return returns
+
+    def get_drawdowns(self) -> np.ndarray:
+        return _drawdowns(self.capitals)
+
+    def get_max_drawdown(self) -> np.ndarray:
+        return np.round(100 * _max_drawdown(self.capitals), 2)
+
+    def get_sharpe_ratio(self) -> np.ndarray:
+        return np.round(_sharpe_ratio(self.returns, self.periods), 2)
+
+    def get_total_returns(self) -> np.ndarray:
+        rows = np.arange(len(self.capitals))
+        last = self.capitals[rows, np.maximum(self.lengths - 1, 0)]
+        return np.round(100 * last / self.capitals[:, 0], 2)
+
+    def get_profit_factor(self) -> np.ndarray:
+        return _profit_factor(self.returns)
+
+    def get_win_rate(self) -> np.ndarray:
+        if self.trade_returns is None:
+            return np.full(len(self.capitals), np.nan)
+
+        wins = (self.trade_returns > 0).sum(axis=1)
+        loss = (self.trade_returns <= 0).sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.round(100 * wins / (wins + loss), 2)
+
+    def evaluate(self) -> pd.DataFrame:
+        """
+        :return: the metrics of each run, indexed by run_id
+        """
+        return pd.DataFrame(
+            {
+                "total_returns": self.get_total_returns(),
+                "max_drawdown": self.get_max_drawdown(),
+                "sharpe_ratio": self.get_sharpe_ratio(),
+                "profit_factor": self.get_profit_factor(),
+                "win_rate": self.get_win_rate(),
+            },
+            index=self.run_ids,
+        )
+
+    def bootstrap(
+        self,
+        n_samples: int = 1000,
+        confidence: float = 0.95,
+        seed: int | None = None,
+        chunk_size: int = 10_000_000,
+    ) -> pd.DataFrame:
+        """
+        Bootstrap confidence intervals of the metrics. Each sample resamples the days
+        of every run (with replacement, independently per run) at once, and rebuilds
+        the capital curves from the resampled returns, starting from 1.
+
+        :param n_samples: number of bootstrap samples
+        :param confidence: the confidence level of the intervals
+        :param seed: the random seed
+        :param chunk_size: max number of elements resampled at once, to bound memory
+        :return: the lower and upper bounds of each metric, indexed by run_id
+        """
+        returns, lengths = self.returns, self.lengths
+        n_runs, n_days = returns.shape
+        padded = np.arange(n_days) >= lengths[:, np.newaxis, np.newaxis]
+        rng = np.random.default_rng(seed)
+        step = max(1, chunk_size // max(1, n_runs * n_days))
+
+        samples: dict[str, list[np.ndarray]] = {
+            "total_returns": [],
+            "max_drawdown": [],
+            "sharpe_ratio": [],
+            "profit_factor": [],
+        }
+        for start in range(0, n_samples, step):
+            # Draw the days within each run's own length, sample by sample so that
+            # the chunking doesn't change the draws: (runs, samples, days)
+            days = rng.integers(
+                0,
+                np.maximum(lengths, 1)[:, np.newaxis],
+                size=(min(step, n_samples - start), n_runs, n_days),
+            ).transpose(1, 0, 2)
+            resampled = np.take_along_axis(returns[:, np.newaxis, :], days, axis=-1)
+            resampled[np.broadcast_to(padded, resampled.shape)] = np.nan
+            capitals = np.cumprod(np.nan_to_num(1 + resampled, nan=1.0), axis=-1)
+
+            samples["total_returns"].append(100 * capitals[..., -1])
+            samples["max_drawdown"].append(100 * _max_drawdown(capitals, initial=1.0))
+            samples["sharpe_ratio"].append(_sharpe_ratio(resampled, self.periods))
+            samples["profit_factor"].append(_profit_factor(resampled))
+
+        alpha = 100 * (1 - confidence) / 2
+        bounds = {}
+        for name, chunks in samples.items():
+            values = np.concatenate(chunks, axis=1)
+            values[np.isinf(values)] = np.nan
+            lower, upper = np.nanpercentile(values, [alpha, 100 - alpha], axis=1)
+            bounds[(name, "lower")] = np.round(lower, 2)
+            bounds[(name, "upper")] = np.round(upper, 2)
+
+        return pd.DataFrame(bounds, index=self.run_ids)
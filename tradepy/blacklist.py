@@ -1,12 +1,17 @@
 import re
 from datetime import date
 from dataclasses import dataclass
+from typing import Iterable
+import numpy as np
 import pandas as pd
 import tradepy
 
 
 DATE_REGEX = re.compile(r"(\d{4})-(\d{2})-(\d{2})")
 
+# Compares after every date, for the stocks blacklisted without a due date
+FOREVER = "9999-99-99"
+
 
 @dataclass
 class BlacklistStock:
@@ -19,7 +24,11 @@ class BlacklistStock:
 
 class Blacklist:
     cached: set[BlacklistStock] | None = None
-    thing = dict()
+
+    # Compiled from the cached stocks: code => due date (or FOREVER)
+    _until: dict[str, str] | None = None
+    _until_index: pd.Index | None = None
+    _until_values: np.ndarray | None = None
 
     @classmethod
     def read(cls) -> set[BlacklistStock]:
@@ -41,25 +50,79 @@ class Blacklist:
         return cls.cached
 
     @classmethod
-    def contains(cls, code: str, timestamp: str | None = None) -> bool:
+    def compile(cls) -> dict[str, str]:
+        """
+        :return: the due date of each blacklisted stock, or FOREVER
+        """
         stocks = cls.read()
-        if not stocks:
-            return False
+        if cls._until is not None and stocks is cls.cached:
+            return cls._until
+
+        until = {
+            stock.code: FOREVER
+            if not stock.until or pd.isna(stock.until)
+            else stock.until
+            for stock in stocks
+        }
+        if stocks is cls.cached:
+            cls._until = until
+            cls._until_index = pd.Index(list(until.keys()), dtype=object)
+            cls._until_values = np.array(list(until.values()), dtype=object)
+        return until
+
+    @staticmethod
+    def _check_timestamp(timestamp: str | None) -> str:
+        timestamp = timestamp or str(date.today())
+        if not DATE_REGEX.match(timestamp):
+            raise ValueError(f"无效的日期: {timestamp}")
+        return timestamp
 
-        try:
-            stock = next(stock for stock in stocks if stock.code == code)
+    @classmethod
+    def contains(cls, code: str, timestamp: str | None = None) -> bool:
+        if (until := cls.compile().get(code)) is None:
+            return False
 
-            if not stock.until or pd.isna(stock.until):
-                return True
+        if until == FOREVER:
+            return True
 
-            timestamp = timestamp or str(date.today())
-            if not DATE_REGEX.match(timestamp):
-                raise ValueError(f"无效的日期: {timestamp}")
+        return cls._check_timestamp(timestamp) <= until
 
-            return timestamp <= stock.until
-        except StopIteration:
-            return False
+    @classmethod
+    def mask(
+        cls,
+        codes: Iterable[str],
+        timestamps: str | Iterable[str] | None = None,
+    ) -> np.ndarray:
+        """
+        Vectorized `contains`.
+
+        :param codes: the stock codes
+        :param timestamps: the date to check against (default to today), or the date
+            of each code
+        :return: whether each code is blacklisted on its date
+        """
+        codes = codes if isinstance(codes, pd.Index) else pd.Index(list(codes))
+        mask = np.zeros(len(codes), dtype=bool)
+        if not cls.compile():
+            return mask
+
+        assert cls._until_index is not None and cls._until_values is not None
+        positions = cls._until_index.get_indexer(codes)
+        found = positions >= 0
+        if not found.any():
+            return mask
+
+        if timestamps is None or isinstance(timestamps, str):
+            dates = cls._check_timestamp(timestamps)
+        else:
+            dates = np.asarray(list(timestamps), dtype=object)[found]
+
+        mask[found] = dates <= cls._until_values[positions[found]]
+        return mask
 
     @classmethod
     def purge_cache(cls):
         cls.cached = None
+        cls._until = None
+        cls._until_index = None
+        cls._until_values = None
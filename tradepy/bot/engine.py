@@ -132,17 +132,14 @@ class TradingEngine(TradeMixin):
         self, ind_df: pd.DataFrame, orders: list[Order], positions: list[Position]
     ) -> pd.DataFrame:
         already_traded = set(x.code for x in orders + positions)
+        candidates_df = ind_df[self.strategy.buy_indicators]
+        if (blacklisted := Blacklist.mask(candidates_df.index)).any():
+            candidates_df = candidates_df[~blacklisted]
+
         codes_and_prices = [
-            (
-                code,
-                self.adjust_factors.to_real_price(code, price_and_weight[0]),
-                price_and_weight[1],
-            )
-            for code, *indicators in ind_df[self.strategy.buy_indicators].itertuples(
-                name=None
-            )
+            (code, *price_and_weight)
+            for code, *indicators in candidates_df.itertuples(name=None)
             if (code not in already_traded)
-            and (not Blacklist.contains(code))
             and (price_and_weight := self.strategy.should_buy(*indicators))
         ]
 
@@ -157,7 +154,7 @@ class TradingEngine(TradeMixin):
         timestamp = ind_df.iloc[0]["timestamp"]
         return pd.DataFrame(
             {
-                "order_price": prices,
+                "order_price": self.adjust_factors.to_real_prices(codes, prices),
                 "weight": weights,
                 "timestamp": [timestamp] * len(prices),
             },
@@ -299,7 +296,13 @@ class TradingEngine(TradeMixin):
                 max_position_opens=avail_opens_count,
             )
 
-            buy_orders = self.strategy.generate_buy_orders(port_df, budget)
+            buy_orders = self.strategy.allocate_buy_orders(
+                port_df,
+                trade_date,
+                budget,
+                max_position_value=self.strategy_conf.max_position_size
+                * self.account.total_asset_value,
+            ).to_orders()
             LOG.info(
                 f"当日已买入{n_bought}, 最大可开仓位{self.strategy_conf.max_position_opens}, "
                 f"当前可用资金{self.account.free_cash_amount}. "
@@ -324,9 +327,11 @@ class TradingEngine(TradeMixin):
         ]
         sell_orders, trade_date = [], ind_df.iloc[0]["timestamp"]
 
-        for pos in positions_to_close:
-            bar = ind_df.loc[pos.code].to_dict()  # type: ignore
-            real_price = self.adjust_factors.to_real_price(pos.code, bar["close"])
+        codes = [pos.code for pos in positions_to_close]
+        close_prices = ind_df["close"].values[ind_df.index.get_indexer(codes)]
+        real_prices = self.adjust_factors.to_real_prices(codes, close_prices)
+
+        for pos, real_price in zip(positions_to_close, real_prices.tolist()):
             pos.update_price(real_price)
             sell_orders.append(pos.to_sell_order(trade_date, action="平仓"))
 
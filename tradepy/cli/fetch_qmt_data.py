@@ -10,7 +10,7 @@ from loguru import logger
 
 from xtquant.xtdata import download_history_data2, get_local_data
 from tradepy.utils import chunks
-from tradepy.depot.stocks import StockListingDepot
+from tradepy.depot.stocks import StockListingDepot, StockMinuteBarsDepot
 from tradepy.collectors.stock_listing import StocksListingCollector
 from tradepy.conversion import convert_code_to_exchange
 
@@ -24,9 +24,7 @@ class QMTDataFetcher:
         assert self.data_dir.exists()
 
         self.individual_stock_out_dir = out_dir / "per_stock"
-        self.monthly_stock_out_dir = out_dir / "per_month"
         self.individual_stock_out_dir.mkdir(exist_ok=True)
-        self.monthly_stock_out_dir.mkdir(exist_ok=True)
 
     @cached_property
     def listing_df(self):
@@ -118,18 +116,14 @@ class QMTDataFetcher:
                 sub_df.drop(columns=["month"], inplace=True)
                 sub_df.to_pickle(out_dir / f"{code}.pkl")
 
-    def export_monthly_stock_data(self):
-        logger.info("开始导出每月的个股数据")
+    def export_daily_stock_data(self):
+        depot = StockMinuteBarsDepot()
+        logger.info(f"开始导出每日的个股数据至{depot.folder}")
 
         for month_dir in tqdm(list(self.individual_stock_out_dir.glob("*"))):
             df = pd.concat(self.walk_month_data(month_dir, load=True))
-            df["code"] = pd.Categorical(df["code"])
-            df["time"] = pd.Categorical(df["time"])
-            df["date"] = pd.Categorical(df["date"])
-            df.reset_index(drop=True, inplace=True)
-            df.set_index(["date", "code"], inplace=True)
-            df.sort_index(inplace=True)
-            df.to_pickle(self.monthly_stock_out_dir / f"{month_dir.name}.pkl")
+            for day, day_df in df.groupby("date"):
+                depot.save_day(day_df, str(day))
 
 
 def ensure_stock_listing_exists():
@@ -153,7 +147,7 @@ def main(
     fetcher = QMTDataFetcher(qmt_path, out_dir)
     fetcher.fetch(start_date, until_date, period)
     fetcher.export_individual_stock_data(start_date, until_date, period)
-    fetcher.export_monthly_stock_data()
+    fetcher.export_daily_stock_data()
 
 
 if __name__ == "__main__":
@@ -166,7 +160,7 @@ if __name__ == "__main__":
             raise argparse.ArgumentTypeError("错误的日期格式!")
 
     parser = argparse.ArgumentParser(
-        description="步骤如下: \n\n 1.下载QMT的分钟级K线数据;\n 2. 导出每支个股的数据为pickle文件;\n 3. 将同月份的个股数据合并, 导出为pickle文件.",
+        description="步骤如下: \n\n 1.下载QMT的分钟级K线数据;\n 2. 导出每支个股的数据为pickle文件;\n 3. 将同一日的个股数据合并, 以压缩的列式格式导出至分钟K线数据库.",
         formatter_class=argparse.RawTextHelpFormatter,
     )
     parser.add_argument(
@@ -179,7 +173,7 @@ if __name__ == "__main__":
         "--out_dir",
         type=Path,
         required=True,
-        help="Pickle文件的输出文件夹路径, e.g., 'E:\out'",
+        help="个股Pickle文件的输出文件夹路径, e.g., 'E:\out'",
     )
     parser.add_argument(
         "--start_date",
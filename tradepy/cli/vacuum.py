@@ -1,14 +1,17 @@
-import re
 import tradepy
 import argparse
 import shutil
 from datetime import date, timedelta
+from itertools import islice
 from pathlib import Path
-from tqdm import tqdm
 
-from tradepy.utils import get_latest_trade_date
 from tradepy.depot.stocks import StocksDailyBarsDepot
-from tradepy.trade_cal import trade_cal
+from tradepy.trade_cal import trade_calendar
+
+
+STALE_KEYS_PATTERN = "tradepy:[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]:*"
+SCAN_COUNT = 1000
+DELETE_BATCH_SIZE = 500
 
 
 def delete_stale_redis_keys(days: int):
@@ -16,36 +19,38 @@ def delete_stale_redis_keys(days: int):
 
     # Get the Redis client
     redis_client = tradepy.config.common.get_redis_client()  # type: ignore
+    cutoff_date = str(date.today() - timedelta(days=days))
+
+    # The cache keys are prefixed with their creation date, see `CacheKeys`. SCAN walks
+    # them incrementally, unlike KEYS that blocks the server until all keys are listed
+    stale_keys = (
+        key
+        for key in redis_client.scan_iter(match=STALE_KEYS_PATTERN, count=SCAN_COUNT)
+        if key.split(":")[1] < cutoff_date
+    )
 
-    # Get all keys matching the pattern "tradepy:*"
-    keys = redis_client.keys("tradepy:*")
-    today = date.today()
-
-    # Delete tradepy keys older than `days`
-    date_regex = r"\d{4}-\d{2}-\d{2}"
-    for key in keys:
-        if create_date := re.findall(date_regex, key):
-            create_date = create_date[0]
-            if date.fromisoformat(create_date) < today - timedelta(days=days):
-                redis_client.delete(key)
-                print(f"删除键: {key}")
+    # Delete the stale keys in batches, each sent in one round trip, so that no more
+    # than a batch of commands is queued at a time
+    n_deleted = 0
+    with redis_client.pipeline(transaction=False) as pipe:
+        while batch := list(islice(stale_keys, DELETE_BATCH_SIZE)):
+            for key in batch:
+                pipe.unlink(key)
+            pipe.execute()
+            n_deleted += len(batch)
+    print(f"已删除{n_deleted}个键")
 
 
 def delete_daily_k(days: int):
     print("删除过期的日K数据")
 
-    # Load day bars up to (now - days)
-    until_date: str = str(get_latest_trade_date())
-    end_idx = trade_cal.index(until_date) + 1
-    start_idx = end_idx + days
-    since_date = trade_cal[start_idx]
-    df = StocksDailyBarsDepot.load(since_date=since_date)
+    since_date = trade_calendar.offset(trade_calendar.latest(), -(days + 1))
 
-    # Export the capped day bars
-    p = tradepy.config.common.database_dir / StocksDailyBarsDepot.folder_name
-    for code, sub_df in tqdm(df.groupby(level="code")):
-        sub_df.drop("code", axis=1, inplace=True)
-        sub_df.to_csv(p / f"{code}.csv", index=False)
+    # Expire by whole months, so that the cutoff only moves once a month. On the other
+    # days the manifest shows there is nothing to drop and no file is touched
+    cutoff_date = f"{since_date[:7]}-01"
+    n_trimmed = StocksDailyBarsDepot().expire(cutoff_date)
+    print(f"已清理{n_trimmed}个文件中{cutoff_date}之前的日K数据")
 
 
 def delete_workspace_dirs(days: int):
@@ -78,7 +83,7 @@ def main():
 
     # Sub-parser for 'database' sub-command
     database_parser = subparsers.add_parser("database", help="清理过期的日K数据")
-    database_parser.add_argument("--days", type=int, required=True, help="删除多少天前的日K数据")
+    database_parser.add_argument("--days", type=int, required=True, help="删除多少天前的日K数据 (按整月清理)")
     database_parser.set_defaults(func=delete_daily_k)
 
     # Sub-parser for 'workspace' sub-command
@@ -77,21 +77,12 @@ class DayBarsCollector(DataCollector):
 
     def jobs_generator(self):
         LOG.info(f"检查本地数据是否需要更新")
-        repo_iter = self.repo.find(always_load=True)
-        curr_codes = list()
+        manifest = dict(self.repo.manifest.entries)
         last_trade_date = get_latest_trade_date()
 
-        for code, df in repo_iter:
-            assert isinstance(df, pd.DataFrame)
-            curr_codes.append(code)
-
+        for code, entry in manifest.items():
             try:
-                if not df.empty:
-                    latest_date = df["timestamp"].max()
-                else:
-                    latest_date = "2000-01-01"
-
-                latest_date = date.fromisoformat(latest_date)
+                latest_date = date.fromisoformat(entry["max_timestamp"] or "2000-01-01")
                 if latest_date < last_trade_date:
                     start_date = latest_date + timedelta(days=1)
                     yield {
@@ -106,7 +97,7 @@ class DayBarsCollector(DataCollector):
                 raise exc
 
         listing_df = self.listing_depot_class.load()
-        new_listings = list(set(listing_df.index) - set(curr_codes))
+        new_listings = list(set(listing_df.index) - set(manifest.keys()))
         if new_listings:
             LOG.info(f"添加新标的, 起始日期 {self.since_date}")
             random.shuffle(new_listings)
@@ -26,10 +26,11 @@ class ETFDayBarsCollector(DayBarsCollector):
             iteration_pause=iteration_pause,
             fun=tradepy.ak_api.get_etf_daily,
         )
-        for args, bars_df in results_gen:
-            if bars_df.empty:
-                LOG.info(f"找不到{args['code']}日K数据. Args = {args}")
-            else:
-                code = args["code"]
-                bars_df["name"] = listing_df.loc[code]["name"]
-                self.repo.append(bars_df, f"{code}.csv")
+        with self.repo.batch():
+            for args, bars_df in results_gen:
+                if bars_df.empty:
+                    LOG.info(f"找不到{args['code']}日K数据. Args = {args}")
+                else:
+                    code = args["code"]
+                    bars_df["name"] = listing_df.loc[code]["name"]
+                    self.repo.append(bars_df, f"{code}.csv")
@@ -27,14 +27,15 @@ class EastMoneySectorIndexCollector(DataCollector):
         )
 
         repo = SectorIndexBarsDepot()
-        for args, bars_df in results_gen:
-            bars_df = bars_df.query("timestamp >= @start_date").copy()
-            name = args["name"]  # noqa
-            code = listing_df.query("name == @name").iloc[0]["code"]
-            bars_df["code"] = code
+        with repo.batch():
+            for args, bars_df in results_gen:
+                bars_df = bars_df.query("timestamp >= @start_date").copy()
+                name = args["name"]  # noqa
+                code = listing_df.query("name == @name").iloc[0]["code"]
+                bars_df["code"] = code
 
-            if write_file:
-                repo.save(bars_df, f"{code}.csv")
+                if write_file:
+                    repo.save(bars_df, f"{code}.csv")
 
 
 class BroadBasedIndexCollector(DataCollector):
@@ -46,15 +47,16 @@ class BroadBasedIndexCollector(DataCollector):
         curr_quote_df = tradepy.ak_api.get_broad_based_index_current_quote(*index_names)
         latest_ts = curr_quote_df["timestamp"].values[0]
 
-        for code, name in broad_index_code_name_mapping.items():
-            LOG.info(f"下载 {name}")
-            df = tradepy.ak_api.get_broad_based_index_day_bars(code, start_date)
+        with repo.batch():
+            for code, name in broad_index_code_name_mapping.items():
+                LOG.info(f"下载 {name}")
+                df = tradepy.ak_api.get_broad_based_index_day_bars(code, start_date)
 
-            if df["timestamp"].max() < latest_ts:
-                # The day bars does not include the current day if the market is still open.
-                # So we need to patch the current quotation to the day bars data.
-                latest_quote = curr_quote_df.query("code == @code").copy()
-                df = pd.concat([df, latest_quote[df.columns]])
+                if df["timestamp"].max() < latest_ts:
+                    # The day bars does not include the current day if the market is still open.
+                    # So we need to patch the current quotation to the day bars data.
+                    latest_quote = curr_quote_df.query("code == @code").copy()
+                    df = pd.concat([df, latest_quote[df.columns]])
 
-            if write_file:
-                repo.save(df.copy(), f"{name}.csv")
+                if write_file:
+                    repo.save(df.copy(), f"{name}.csv")
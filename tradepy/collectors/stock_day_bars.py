@@ -103,23 +103,25 @@ class StockDayBarsCollector(DayBarsCollector):
             iteration_pause=iteration_pause,
             fun=self.download_and_process,
         )
-        for args, bars_df in results_gen:
-            if bars_df.empty:
-                LOG.info(f"找不到{args['code']}日K数据. Args = {args}")
-            else:
-                code = args["code"]
-                self.repo.append(bars_df, f"{code}.csv")
+        with self.repo.batch():
+            for args, bars_df in results_gen:
+                if bars_df.empty:
+                    LOG.info(f"找不到{args['code']}日K数据. Args = {args}")
+                else:
+                    code = args["code"]
+                    self.repo.append(bars_df, f"{code}.csv")
 
         LOG.info("计算个股的每日市值分位")
-        df = self.repo.load(index_by="timestamp", fields="all")
+        df = self.repo.scan().raw().index_by("timestamp").collect()
         df = pd.concat(self._compute_mkt_cap_percentile_ranks(df))
         df.reset_index(inplace=True, drop=True)
 
         if write_file:
             LOG.info("保存中")
-            for code, sub_df in df.groupby("code"):
-                sub_df.drop("code", axis=1, inplace=True)
-                assert isinstance(code, str)
-                self.repo.save(sub_df, filename=code + ".csv")
+            with self.repo.batch():
+                for code, sub_df in df.groupby("code"):
+                    sub_df.drop("code", axis=1, inplace=True)
+                    assert isinstance(code, str)
+                    self.repo.save(sub_df, filename=code + ".csv")
 
         return df
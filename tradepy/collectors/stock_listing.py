@@ -40,7 +40,8 @@ class StocksListingCollector(DataCollector):
         )
 
         if write_file:
-            listing_df.to_csv(out_path := StockListingDepot.file_path())
+            StockListingDepot.save(listing_df)
+            out_path = StockListingDepot.file_path()
             LOG.info(f"已下载至 {out_path}")
 
         return listing_df
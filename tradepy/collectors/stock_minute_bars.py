@@ -44,4 +44,9 @@ class StockMinuteBarsCollector(DataCollector):
 
         LOG.info("保存中")
         df = pd.concat(bars_list)
-        self.repo.save(df, filename=f"{self.date}.csv")
+        timestamps = df["timestamp"].astype(str)
+        df["date"] = timestamps.str[:10]
+        df["time"] = timestamps.str[11:16].str.replace(":", "", regex=False)
+
+        for date, day_df in df.groupby("date"):
+            self.repo.save_day(day_df, str(date))
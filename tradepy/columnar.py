@@ -0,0 +1,234 @@
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Any, Iterable
+
+
+# The columnar dataset format, shared by the depot sidecars, the trade books and the
+# optimization datasets: a dataframe flattened into plain numpy arrays plus a JSON
+# layout, saved as a directory of ``.npy`` files or packed into a buffer.
+
+# ------
+# Layout
+# ------
+class LayoutBuilder:
+    """
+    Flattens a dataframe into a list of plain numpy arrays plus a JSON-able description.
+    Numeric columns of the same dtype are stacked into one 2D array, so that they can
+    be turned back into a single pandas block without copying.
+    """
+
+    def __init__(self, stack=True) -> None:
+        self.stack = stack
+        self.arrays: list[np.ndarray] = []
+        self.blocks: dict[str, list[tuple[Any, np.ndarray]]] = dict()
+
+    def _add_array(self, arr: np.ndarray) -> int:
+        self.arrays.append(np.ascontiguousarray(arr))
+        return len(self.arrays) - 1
+
+    def encode(
+        self, name, values: pd.Series | pd.Index, stackable=True
+    ) -> dict[str, Any] | None:
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            cat: pd.Categorical = values.array
+            return {
+                "name": name,
+                "kind": "category",
+                "array": self._add_array(cat.codes),
+                "categories": cat.categories.tolist(),
+                "ordered": bool(cat.ordered),
+            }
+
+        if isinstance(values.dtype, np.dtype) and values.dtype.kind in "biufcmM":
+            arr = np.asarray(values)
+            if stackable:
+                self.blocks.setdefault(arr.dtype.str, []).append((name, arr))
+                return None
+            return {"name": name, "kind": "array", "array": self._add_array(arr)}
+
+        codes, uniques = pd.factorize(values)
+        if not all(isinstance(u, str) for u in uniques):
+            raise TypeError(f"无法共享列{name}: 仅支持数值, 类别以及字符串类型")
+        return {
+            "name": name,
+            "kind": "strings",
+            "array": self._add_array(codes.astype(np.int32)),
+            "uniques": list(uniques),
+        }
+
+    def build(self, df: pd.DataFrame) -> dict[str, Any]:
+        if isinstance(df.index, pd.RangeIndex) and df.index.name is None:
+            index = None
+        else:
+            index = [
+                self.encode(name, df.index.get_level_values(level), stackable=False)
+                for level, name in enumerate(df.index.names)
+            ]
+
+        columns = [
+            spec
+            for name, series in df.items()
+            if (spec := self.encode(name, series, stackable=self.stack)) is not None
+        ]
+
+        for dtype, cols in self.blocks.items():
+            columns.append(
+                {
+                    "kind": "block",
+                    "names": [name for name, _ in cols],
+                    "array": self._add_array(np.stack([arr for _, arr in cols])),
+                }
+            )
+
+        return {"n_rows": len(df), "index": index, "columns": columns}
+
+
+def _decode_values(spec: dict[str, Any], arrays: list[np.ndarray]):
+    arr = arrays[spec["array"]]
+    kind = spec["kind"]
+
+    if kind == "category":
+        return pd.Categorical.from_codes(
+            arr, categories=spec["categories"], ordered=spec["ordered"]
+        )
+
+    if kind == "strings":
+        uniques = np.array(spec["uniques"] + [np.nan], dtype=object)
+        return uniques.take(arr)  # NA (-1) picks the trailing NaN
+
+    return arr
+
+
+def _decode_index(specs: list[dict[str, Any]] | None, arrays, n_rows: int) -> pd.Index:
+    if specs is None:
+        return pd.RangeIndex(n_rows)
+
+    names = [spec["name"] for spec in specs]
+    if len(specs) == 1:
+        return pd.Index(_decode_values(specs[0], arrays), name=names[0])
+
+    if all(spec["kind"] == "strings" for spec in specs):
+        return pd.MultiIndex(
+            levels=[pd.Index(spec["uniques"], dtype=object) for spec in specs],
+            codes=[arrays[spec["array"]] for spec in specs],
+            names=names,
+            verify_integrity=False,
+        )
+
+    return pd.MultiIndex.from_arrays(
+        [_decode_values(spec, arrays) for spec in specs], names=names
+    )
+
+
+def decode_frame(layout: dict[str, Any], arrays: list[np.ndarray]) -> pd.DataFrame:
+    """
+    Rebuild the dataframe on top of the arrays without copying the numeric columns.
+    Stacked columns come back grouped by their dtypes, the others in their saved order.
+    """
+    n_rows = layout["n_rows"]
+    index = _decode_index(layout["index"], arrays, n_rows)
+
+    frames = []
+    for spec in layout["columns"]:
+        if spec["kind"] == "block":
+            block, names = arrays[spec["array"]], spec["names"]
+            if (rows := spec.get("rows")) is not None:
+                block, names = block[rows], [names[i] for i in rows]
+            frames.append(pd.DataFrame(block.T, columns=names, copy=False))
+        elif spec["kind"] == "array":
+            arr = arrays[spec["array"]].reshape(-1, 1)
+            frames.append(pd.DataFrame(arr, columns=[spec["name"]], copy=False))
+        else:
+            frames.append(pd.DataFrame({spec["name"]: _decode_values(spec, arrays)}))
+
+    if not frames:
+        return pd.DataFrame(index=index)
+
+    df = pd.concat(frames, axis=1, copy=False)
+    df.index = index
+    return df
+
+
+def project_layout(layout: dict[str, Any], columns: Iterable[str]) -> dict[str, Any]:
+    wanted = set(columns)
+    projected = []
+    for spec in layout["columns"]:
+        if spec["kind"] != "block":
+            if spec["name"] in wanted:
+                projected.append(spec)
+            continue
+
+        rows = [i for i, name in enumerate(spec["names"]) if name in wanted]
+        if len(rows) == len(spec["names"]):
+            projected.append(spec)
+        elif rows:
+            projected.append(spec | {"rows": rows})
+
+    return layout | {"columns": projected}
+
+
+# ----------------
+# Columnar on disk
+# ----------------
+_LAYOUT_FILE = "layout.json"
+
+
+class _MemoryMappedArrays:
+    """
+    Opens the column files on first access only, so the columns that are not read
+    are never paged in.
+    """
+
+    def __init__(self, path: Path, mmap_mode: str) -> None:
+        self.path = path
+        self.mmap_mode = mmap_mode
+        self._arrays: dict[int, np.ndarray] = dict()
+
+    def __getitem__(self, idx: int) -> np.ndarray:
+        if (arr := self._arrays.get(idx)) is None:
+            arr = self._arrays[idx] = np.load(
+                self.path / f"{idx}.npy", mmap_mode=self.mmap_mode  # type: ignore
+            )
+        return arr
+
+
+def save_columnar_dataset(df: pd.DataFrame, path: str | Path, stack=True) -> Path:
+    """
+    Save the dataset as a directory of typed ``.npy`` columns plus a JSON layout with
+    the categorical and string dictionaries.
+
+    :param stack: store the numeric columns of the same dtype as one 2D array. Turn it
+        off to keep the original column order.
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+
+    builder = LayoutBuilder(stack=stack)
+    layout = builder.build(df)
+    for idx, arr in enumerate(builder.arrays):
+        np.save(path / f"{idx}.npy", arr, allow_pickle=False)
+
+    with (path / _LAYOUT_FILE).open("w", encoding="utf-8") as f:
+        json.dump(layout, f, ensure_ascii=False)
+    return path
+
+
+def load_columnar_dataset(
+    path: str | Path, columns: Iterable[str] | None = None, mmap_mode="r"
+) -> pd.DataFrame:
+    """
+    Open a dataset saved by `save_columnar_dataset`. The columns are memory-mapped,
+    read-only and only the selected ones are loaded.
+
+    :param mmap_mode: pass "c" to get copy-on-write columns that can be modified
+        in memory without touching the files
+    """
+    path = Path(path)
+    with (path / _LAYOUT_FILE).open("r", encoding="utf-8") as f:
+        layout = json.load(f)
+
+    if columns is not None:
+        layout = project_layout(layout, columns)
+    return decode_frame(layout, _MemoryMappedArrays(path, mmap_mode))  # type: ignore
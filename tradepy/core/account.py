@@ -1,8 +1,11 @@
+import numpy as np
+import pandas as pd
 from pydantic import BaseModel, Field
 from typing import Iterable
 from tradepy.core.holdings import Holdings
-from tradepy.core.position import Position
-from tradepy.decorators import require_mode
+from tradepy.core.order import BuyOrderBatch
+from tradepy.core.position import BacktestPosition, PositionBase
+from tradepy.decorators import ensure_mode
 from tradepy.utils import round_val
 
 
@@ -36,22 +39,29 @@ class BacktestAccount(BaseModel):
     class Config:
         arbitrary_types_allowed = True
 
-    @require_mode("backtest")
-    def update_holdings(self, price_lookup: Holdings.PriceLookupFun):
-        if any(self.holdings):
-            self.holdings.update_price(price_lookup)
+    def model_post_init(self, __context):
+        # Checked once here, as the trading methods below run for every bar
+        ensure_mode("backtest", op=type(self).__name__)
 
-    @require_mode("backtest")
-    def buy(self, positions: Iterable[Position]):
+    def update_holdings(self, codes: np.ndarray | pd.Index, prices: np.ndarray):
+        if self.holdings:
+            self.holdings.update_prices(codes, prices)
+
+    def buy(self, positions: Iterable[PositionBase]):
         if cost_total := self.holdings.buy(positions):
             self.free_cash_amount -= self.add_buy_commissions(cost_total)
 
-    @require_mode("backtest")
-    def sell(self, positions: Iterable[Position]):
+    def buy_batch(self, batch: BuyOrderBatch) -> list[BacktestPosition]:
+        positions = BacktestPosition.from_batch(batch)
+        if self.holdings.buy(positions):
+            cost_total = round(float(batch.costs.sum()), 2)
+            self.free_cash_amount -= self.add_buy_commissions(cost_total)
+        return positions
+
+    def sell(self, positions: Iterable[PositionBase]):
         if close_total := self.holdings.sell(positions):
             self.free_cash_amount += self.take_sell_commissions(close_total)
 
-    @require_mode("backtest")
     def clear(self):
         all_positions = [pos for _, pos in self.holdings]
         self.sell(all_positions)
@@ -76,7 +86,7 @@ class BacktestAccount(BaseModel):
         stamp_duty_fee = self.get_stamp_duty_fee(amount)
         return amount - broker_commission_fee - stamp_duty_fee
 
-    def get_position_net_pct_chg(self, position: Position) -> float:
+    def get_position_net_pct_chg(self, position: PositionBase) -> float:
         gross_return = position.profit_or_loss_at(position.latest_price)
         buy_commission_fee = self.get_broker_commission_fee(position.cost)
         sell_commission_fee = self.get_broker_commission_fee(position.total_value)
@@ -2,6 +2,9 @@ import pandas as pd
 import numpy as np
 import numba as nb
 from functools import cached_property
+from typing import Iterable
+
+from tradepy.trade_cal import to_day_numbers
 
 
 @nb.njit(cache=True)
@@ -27,28 +30,82 @@ class AdjustFactors:
             factors_df.reset_index(inplace=True)
             factors_df.set_index("code", inplace=True)
 
-        self.factors_df = factors_df.copy()
-        self.factors_df.sort_values(["code", "timestamp"], inplace=True)
+        # Skip sorting (and copying) the factors that are already in order
+        order = pd.MultiIndex.from_arrays([factors_df.index, factors_df["timestamp"]])
+        if order.is_monotonic_increasing:
+            self.factors_df = factors_df
+        else:
+            self.factors_df = factors_df.sort_values(["code", "timestamp"])
+
+        # Plain arrays aligned with the factors frame, for the Numba helpers
+        self._factor_days = to_day_numbers(self.factors_df["timestamp"].values)
+        self._factor_vals = self.factors_df["hfq_factor"].values.astype(np.float64)
+
+    @cached_property
+    def _latest_positions(self) -> np.ndarray:
+        # The factors are sorted by code and timestamp, so each code's latest factor
+        # is its last row that is not the NaN end padding
+        valid = np.flatnonzero(~np.isnan(self._factor_vals))
+        codes = self.factors_df.index.values[valid]
+        is_last = np.append(codes[1:] != codes[:-1], True)
+        return valid[is_last]
+
+    @cached_property
+    def _latest_codes(self) -> pd.Index:
+        return pd.Index(self.factors_df.index.values[self._latest_positions])
+
+    @cached_property
+    def _latest_values(self) -> np.ndarray:
+        return self._factor_vals[self._latest_positions]
+
+    @cached_property
+    def _latest_by_code(self) -> dict[str, float]:
+        return dict(zip(self._latest_codes, self._latest_values.tolist()))
 
     @cached_property
     def latest_factors(self) -> pd.DataFrame:
-        return self.factors_df.groupby("code").tail(2).dropna()  # drop the end padding
+        return self.factors_df.iloc[self._latest_positions]
+
+    def get_latest_factors(self, codes: Iterable[str]) -> np.ndarray:
+        """
+        The latest hfq factors of the stocks, in the given order
+        """
+        codes = np.asarray(codes if isinstance(codes, pd.Index) else list(codes))
+        positions = self._latest_codes.get_indexer(codes)
+        if (missing := positions < 0).any():
+            raise KeyError(f"找不到复权因子: {codes[missing].tolist()}")
+        return self._latest_values[positions]
 
     def to_real_price(self, code: str, price: float) -> float:
-        factor: float = self.latest_factors.loc[code, "hfq_factor"]  # type: ignore
-        return round(price / factor, 2)
+        return round(price / self._latest_by_code[code], 2)
+
+    def to_real_prices(self, codes: Iterable[str], prices: Iterable[float]) -> np.ndarray:
+        """
+        Bulk version of `to_real_price`
+        """
+        return np.round(np.asarray(prices) / self.get_latest_factors(codes), 2)
+
+    def to_adjusted_prices(
+        self, codes: Iterable[str], prices: Iterable[float]
+    ) -> np.ndarray:
+        """
+        The reverse of `to_real_prices`, backward adjusts the real prices
+        """
+        return np.asarray(prices) * self.get_latest_factors(codes)
 
     def backward_adjust_history_prices(self, code: str, bars_df: pd.DataFrame):
         """
         bars_df: an individual stock's day bars
         """
-        factors_df = self.factors_df.loc[code]
+        loc = self.factors_df.index.get_loc(code)
+        if isinstance(loc, int):
+            loc = slice(loc, loc + 1)
 
         # Find each day's adjust factor
         factor_vals = _assign_factor_value_to_day(
-            nb.typed.List(factors_df["timestamp"].tolist()),
-            nb.typed.List(factors_df["hfq_factor"].tolist()),
-            nb.typed.List(bars_df["timestamp"].tolist()),
+            self._factor_days[loc],
+            self._factor_vals[loc],
+            to_day_numbers(bars_df["timestamp"].values),
         )
 
         # Adjust prices accordingly
@@ -67,8 +124,9 @@ class AdjustFactors:
         """
         bars_df: stocks' candlestick bars (one per stock).
         """
-        bars_df["close"] *= self.latest_factors["hfq_factor"]
-        bars_df["low"] *= self.latest_factors["hfq_factor"]
-        bars_df["high"] *= self.latest_factors["hfq_factor"]
-        bars_df["open"] *= self.latest_factors["hfq_factor"]
+        positions = self._latest_codes.get_indexer(bars_df.index)
+        factors = np.where(
+            positions >= 0, self._latest_values[positions], np.nan
+        ).reshape(-1, 1)
+        bars_df[["close", "low", "high", "open"]] *= factors
         return bars_df
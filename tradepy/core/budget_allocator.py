@@ -39,3 +39,135 @@ def evenly_distribute(stocks, budget: float, min_trade_cost: int, trade_lot_vol:
     buy_lots = stocks.copy()
     buy_lots[:, PriceCol] = total_lots
     return buy_lots
+
+
+@nb.njit(cache=True)
+def _fill_targets(weights, active, budget: float, max_position_value: float):
+    # Split the budget by weights, and hand what the capped positions can't take over
+    # to the rest (water-filling)
+    n_stocks = len(weights)
+    targets = np.zeros(n_stocks)
+    capped = np.zeros(n_stocks, dtype=np.bool_)
+
+    remaining_budget = budget
+    for _ in range(n_stocks):
+        total_weight = 0.0
+        for idx in range(n_stocks):
+            if active[idx] and not capped[idx]:
+                total_weight += weights[idx]
+        if total_weight <= 0:
+            break
+
+        newly_capped = False
+        for idx in range(n_stocks):
+            if active[idx] and not capped[idx]:
+                targets[idx] = remaining_budget * weights[idx] / total_weight
+                if targets[idx] > max_position_value:
+                    newly_capped = True
+
+        if not newly_capped:
+            break
+
+        for idx in range(n_stocks):
+            if active[idx] and not capped[idx] and targets[idx] > max_position_value:
+                targets[idx] = max_position_value
+                capped[idx] = True
+                remaining_budget -= max_position_value
+
+    return targets
+
+
+@nb.njit(cache=True)
+def _allocate_active(
+    lot_costs, weights, active, budget: float, max_position_value: float, lots
+):
+    targets = _fill_targets(weights, active, budget, max_position_value)
+
+    # Round down to whole lots, then spend the residual budget on the positions that
+    # fall shortest of their targets
+    remaining_budget = budget
+    for idx in range(len(lot_costs)):
+        lots[idx] = targets[idx] // lot_costs[idx] if active[idx] else 0
+        remaining_budget -= lots[idx] * lot_costs[idx]
+
+    shortfalls = targets - lots * lot_costs
+    order = np.argsort(-shortfalls)
+    while True:
+        bought = False
+        for idx in order:
+            lot_cost = lot_costs[idx]
+            room = max_position_value - lots[idx] * lot_cost
+            if not active[idx] or lot_cost > remaining_budget or lot_cost > room:
+                continue
+
+            n_lots = min(
+                max(1.0, shortfalls[idx] // lot_cost),
+                remaining_budget // lot_cost,
+                room // lot_cost,
+            )
+            lots[idx] += n_lots
+            shortfalls[idx] -= n_lots * lot_cost
+            remaining_budget -= n_lots * lot_cost
+            bought = True
+
+        if not bought:
+            break
+
+
+@nb.njit(cache=True)
+def _pick_drops(failed, weights, lot_costs, n_drop: int, deterministic: bool):
+    if deterministic:
+        # The smallest weights first, then the most expensive lots
+        by_cost = failed[np.argsort(-lot_costs[failed], kind="mergesort")]
+        by_weight = by_cost[np.argsort(weights[by_cost], kind="mergesort")]
+        return by_weight[:n_drop]
+    return np.random.permutation(failed)[:n_drop]
+
+
+@nb.njit(cache=True)
+def allocate_lots(
+    prices,
+    weights,
+    budget: float,
+    min_trade_amount: float,
+    max_position_value: float,
+    trade_lot_vol: int,
+    deterministic: bool = False,
+):
+    """
+    Allocate the budget to the stocks in whole lots, in proportion to their weights.
+
+    No position takes more than `max_position_value`, and the budget that the capped
+    positions can't take goes to the others. The stocks whose positions end up
+    smaller than `min_trade_amount` are dropped, and the budget is allocated again
+    among the rest. Randomly picks the ones to drop, or the ones of the smallest
+    weights (then the most expensive lots) if `deterministic`.
+
+    :param prices: the order price of each stock
+    :param weights: the weight of each stock. Non-positive weights get nothing.
+    :return: the number of lots to buy for each stock
+    """
+    n_stocks = len(prices)
+    lot_costs = prices.astype(np.float64) * trade_lot_vol
+    weights = weights.astype(np.float64)
+    active = weights > 0
+    lots = np.zeros(n_stocks)
+
+    while active.any():
+        _allocate_active(lot_costs, weights, active, budget, max_position_value, lots)
+
+        failed = np.flatnonzero(active & (lots * lot_costs < min_trade_amount))
+        if len(failed) == 0:
+            break
+
+        # Drop one at a time, as each drop leaves more to the others. Unless the budget
+        # can't cover the minimum trade amount of this many stocks anyway.
+        n_drop = 1
+        if min_trade_amount > 0:
+            n_drop = max(n_drop, active.sum() - int(budget // min_trade_amount))
+
+        for idx in _pick_drops(failed, weights, lot_costs, n_drop, deterministic):
+            active[idx] = False
+            lots[idx] = 0
+
+    return lots.astype(np.int64)
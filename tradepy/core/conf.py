@@ -300,7 +300,11 @@ class TaskConf(ConfBase):
     backtest: BacktestConf
     dataset_path: Path | None = None
     repetition: int = Field(1, description="同一批参数组合重复运行次数")
-    evaluator_class: str = "tradepy.backtest.evaluation.BasicEvaluator"
+    dataset_format: Literal["npy", "pkl"] = Field(
+        "npy", description="预先计算的回测数据的保存格式, npy为可内存映射的列式存储目录"
+    )
+    share_dataset: bool = Field(True, description="同一节点的Dask进程通过共享内存读取同一份回测数据")
+    evaluator_class: str = "tradepy.backtest.evaluation.StreamingEvaluator"
 
     def load_evaluator_class(self) -> Type["ResultEvaluator"]:
         return import_class(self.evaluator_class)
@@ -11,7 +11,7 @@ from tradepy.vendors.types import AskBid
 class AStockExchange:
     @staticmethod
     def is_today_trade_day():
-        return str(date.today()) in trade_cal.trade_cal
+        return date.today() in trade_cal.trade_calendar
 
     @staticmethod
     def market_phase_now():
@@ -1,26 +1,88 @@
+import numpy as np
+import pandas as pd
 from typing import Callable, Iterable
 from contextlib import suppress
-from tradepy.core.position import Position
-from tradepy.decorators import require_mode
+from tradepy.core.position import PositionBase
+from tradepy.decorators import ensure_mode
 
 
 class Holdings:
+    """
+    The backtest positions, with the codes, volumes and latest prices also kept in
+    arrays (in the order of `positions`), so that the code set and the market value
+    are maintained on buy / sell / price updates instead of being rebuilt on every
+    read.
+
+    NOTE: the market value only reflects the prices updated through the holdings.
+    Positions priced directly by `Position.update_price` are expected to be sold.
+    """
+
     PriceLookupFun = Callable[[str], float]
 
     def __init__(self):
-        self.positions: dict[str, Position] = dict()  # code => Position
+        ensure_mode("backtest", op=type(self).__name__)
+        self.positions: dict[str, PositionBase] = dict()  # code => Position
+
+        self._codes: frozenset[str] = frozenset()
+        self._code_array = np.empty(0, dtype=object)
+        self._vols = np.empty(0, dtype=np.int64)
+        self._prices = np.empty(0, dtype=np.float64)
+        self._market_value = 0.0
 
     @property
-    def position_codes(self) -> set[str]:
-        return set(code for code, _ in self)
+    def position_codes(self) -> frozenset[str]:
+        # Replaced rather than mutated on buy / sell, so callers can keep iterating it
+        # while trading
+        return self._codes
+
+    def _sync_arrays(self):
+        positions = self.positions.values()
+        self._codes = frozenset(self.positions)
+        self._code_array = np.array(list(self.positions), dtype=object)
+        self._vols = np.fromiter((p.vol for p in positions), np.int64, len(positions))
+        self._prices = np.fromiter(
+            (p.latest_price for p in positions), np.float64, len(positions)
+        )
+        self._sync_market_value()
+
+    def _sync_market_value(self):
+        # Same as summing `Position.total_value_at`, which rounds each position
+        self._market_value = float(np.round(self._vols * self._prices, 2).sum())
 
     def update_price(self, price_lookup: PriceLookupFun):
         for _, pos in self:
             with suppress(KeyError):
                 pos.update_price(price_lookup(pos.code))
-
-    @require_mode("backtest")
-    def buy(self, positions: Iterable[Position]) -> float:
+        self._prices = np.fromiter(
+            (p.latest_price for p in self.positions.values()),
+            np.float64,
+            len(self.positions),
+        )
+        self._sync_market_value()
+
+    def update_prices(self, codes: np.ndarray | pd.Index, prices: np.ndarray):
+        """
+        Mark the positions to market in one go.
+
+        :param codes: the stock codes, e.g. all stocks traded on the day
+        :param prices: the prices of the codes. Positions not found in codes keep
+            their previous prices.
+        """
+        if not self.positions:
+            return
+
+        found = pd.Index(codes).get_indexer(self._code_array)
+        held = found >= 0
+        if not held.any():
+            return
+
+        new_prices = np.asarray(prices, dtype=np.float64)[found[held]]
+        self._prices[held] = new_prices
+        for code, price in zip(self._code_array[held], new_prices.tolist()):
+            self.positions[code].latest_price = price
+        self._sync_market_value()
+
+    def buy(self, positions: Iterable[PositionBase]) -> float:
         total = 0
 
         for pos in positions:
@@ -30,10 +92,10 @@ class Holdings:
             self.positions[pos.code] = pos
             total += pos.cost
 
+        self._sync_arrays()
         return total
 
-    @require_mode("backtest")
-    def sell(self, positions: Iterable[Position]) -> float:
+    def sell(self, positions: Iterable[PositionBase]) -> float:
         total = 0
 
         for pos in positions:
@@ -45,14 +107,18 @@ class Holdings:
             pos = self.positions.pop(pos.code)
             total += pos.latest_price * pos.yesterday_vol
 
+        self._sync_arrays()
         return total
 
-    def get_total_market_value(self):
-        return sum(pos.total_value_at(pos.latest_price) for _, pos in self)
+    def get_total_market_value(self) -> float:
+        return self._market_value
 
     def has(self, code) -> bool:
         return code in self.positions
 
+    def __len__(self) -> int:
+        return len(self.positions)
+
     def __iter__(self):
         yield from self.positions.items()
 
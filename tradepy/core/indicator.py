@@ -1,6 +1,8 @@
-import networkx as nx
 from dataclasses import dataclass, field
-from typing import Union
+from typing import TYPE_CHECKING, Union
+
+if TYPE_CHECKING:
+    import networkx as nx
 
 
 class IndicatorSet:
@@ -17,7 +19,9 @@ class IndicatorSet:
             elif ind == item:
                 return ind
 
-    def build_graph(self) -> nx.DiGraph:
+    def build_graph(self) -> "nx.DiGraph":
+        import networkx as nx
+
         G = nx.DiGraph()
 
         nodes, edges = set(), set()
@@ -44,6 +48,8 @@ class IndicatorSet:
     def sort_by_execute_order(
         self, target_list: list[str] | None = None
     ) -> list["Indicator"]:
+        import networkx as nx
+
         G = self.build_graph()
         res = []
 
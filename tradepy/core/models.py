@@ -1,4 +1,4 @@
 # flake8: noqa
-from tradepy.core.order import Order
-from tradepy.core.position import Position
+from tradepy.core.order import Order, BacktestOrder, BuyOrderBatch
+from tradepy.core.position import Position, BacktestPosition
 from tradepy.core.account import Account
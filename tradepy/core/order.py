@@ -1,5 +1,8 @@
 import uuid
+import itertools
+import numpy as np
 from loguru import logger
+from dataclasses import dataclass
 from datetime import date, datetime
 from dateutil import parser as date_parser
 from typing import Literal, TypedDict
@@ -151,3 +154,100 @@ class Order(BaseModel):
             f"[{self.timestamp}] {self.code} @{self.price} * {self.vol}. [{self.direction}, {self.status}] "
             + self.serialize_tags()
         )
+
+
+# Unique within the process, which is all a backtest needs. Unlike `Order.make_id`,
+# this doesn't cost an uuid4 per order.
+_id_counter = itertools.count(1)
+
+
+def make_backtest_id(code: str) -> str:
+    return f"{code}-{next(_id_counter)}"
+
+
+class BacktestOrder:
+    """
+    A compact buy order used during backtesting. Use `to_model` to get the
+    pydantic `Order`.
+    """
+
+    __slots__ = ("id", "timestamp", "code", "price", "vol", "direction")
+
+    def __init__(
+        self,
+        timestamp: str,
+        code: str,
+        price: float,
+        vol: int,
+        direction: OrderDirection = "buy",
+        id: str | None = None,
+    ) -> None:
+        self.id = id or make_backtest_id(code)
+        self.timestamp = timestamp
+        self.code = code
+        self.price = price
+        self.vol = vol
+        self.direction = direction
+
+    @property
+    def is_buy(self) -> bool:
+        return self.direction == "buy"
+
+    @property
+    def placed_value(self) -> float:
+        return self.price * self.vol
+
+    def to_model(self) -> Order:
+        return Order(
+            id=self.id,
+            timestamp=self.timestamp,
+            code=self.code,
+            price=self.price,
+            vol=self.vol,
+            direction=self.direction,
+        )
+
+    def __str__(self) -> str:
+        return (
+            f"[{self.timestamp}] {self.code} @{self.price} * {self.vol}. "
+            f"[{self.direction}]"
+        )
+
+    def __repr__(self) -> str:
+        return str(self)
+
+
+@dataclass
+class BuyOrderBatch:
+    """
+    A day's buy orders, kept as arrays so that costs and fees are computed in one go.
+    Order objects are only made (`to_orders`) when they are to be sent to the broker.
+    """
+
+    timestamp: str
+    codes: np.ndarray
+    prices: np.ndarray
+    vols: np.ndarray
+
+    @property
+    def costs(self) -> np.ndarray:
+        return (self.prices * self.vols).round(2)
+
+    def to_orders(self) -> list[Order]:
+        return [
+            Order(
+                id=Order.make_id(code),
+                timestamp=self.timestamp,
+                code=code,
+                price=price,
+                vol=vol,
+                direction="buy",
+            )
+            for code, price, vol in zip(
+                self.codes.tolist(), self.prices.tolist(), self.vols.tolist()
+            )
+        ]
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
@@ -1,11 +1,18 @@
 from pydantic import BaseModel
 
-from tradepy.core.order import Order
+from tradepy.core.order import BacktestOrder, BuyOrderBatch, Order, make_backtest_id
 from tradepy.types import TradeActionType
-from tradepy.utils import calc_pct_chg, round_val
+from tradepy.utils import calc_pct_chg
 
 
-class Position(BaseModel):
+class PositionBase:
+    """
+    The position calculations, shared by the pydantic `Position` model and the compact
+    backtest positions. The values are rounded to 2 decimals, like `round_val` does.
+    """
+
+    __slots__ = ()
+
     id: str
     timestamp: str
     code: str
@@ -13,7 +20,7 @@ class Position(BaseModel):
     vol: int
     latest_price: float
     avail_vol: int
-    yesterday_vol: int = 0
+    yesterday_vol: int
 
     def to_sell_order(self, timestamp, action: TradeActionType) -> Order:
         assert (
@@ -35,41 +42,33 @@ class Position(BaseModel):
         return order
 
     @property
-    @round_val
     def cost(self):
-        return self.total_value_at(self.price)
+        return round(self.price * self.vol, 2)
 
     @property
-    @round_val
     def total_value(self) -> float:
-        return self.total_value_at(self.latest_price)
+        return round(self.latest_price * self.vol, 2)
 
     @property
-    @round_val
     def yesterday_total_value(self) -> float:
-        return self.total_value_at(self.price)
+        return round(self.price * self.vol, 2)
 
-    @round_val
     def total_value_at(self, price: float) -> float:
-        return price * self.vol
+        return round(price * self.vol, 2)
 
-    @round_val
     def profit_or_loss_at(self, price: float) -> float:
-        return self.total_value_at(price) - self.cost
+        return round(self.total_value_at(price) - self.cost, 2)
 
-    @round_val
     def chg_at(self, price: float) -> float:
-        return price - self.price
+        return round(price - self.price, 2)
 
-    @round_val
     def pct_chg_at(self, price: float) -> float:
         if self.chg_at(price) == 0:
             return 0
-        return calc_pct_chg(self.price, price)
+        return round(calc_pct_chg(self.price, price), 2)
 
-    @round_val
     def price_at_pct_change(self, pct: float):
-        return self.price * (1 + pct * 1e-2)
+        return round(self.price * (1 + pct * 1e-2), 2)
 
     def update_price(self, price: float):
         self.latest_price = price
@@ -92,3 +91,95 @@ class Position(BaseModel):
 
     def __repr__(self):
         return str(self)
+
+
+class Position(PositionBase, BaseModel):
+    id: str
+    timestamp: str
+    code: str
+    price: float
+    vol: int
+    latest_price: float
+    avail_vol: int
+    yesterday_vol: int = 0
+
+
+class BacktestPosition(PositionBase):
+    """
+    A compact position used during backtesting, with the same calculations as the
+    pydantic `Position`. Use `to_model` to get the pydantic `Position`.
+    """
+
+    __slots__ = (
+        "id",
+        "timestamp",
+        "code",
+        "price",
+        "vol",
+        "latest_price",
+        "avail_vol",
+        "yesterday_vol",
+    )
+
+    def __init__(
+        self,
+        id: str,
+        timestamp: str,
+        code: str,
+        price: float,
+        vol: int,
+        latest_price: float,
+        avail_vol: int,
+        yesterday_vol: int = 0,
+    ) -> None:
+        self.id = id
+        self.timestamp = timestamp
+        self.code = code
+        self.price = price
+        self.vol = vol
+        self.latest_price = latest_price
+        self.avail_vol = avail_vol
+        self.yesterday_vol = yesterday_vol
+
+    @classmethod
+    def from_order(cls, order: BacktestOrder | Order) -> "BacktestPosition":
+        """
+        The position of a filled buy order. Backtest positions are held overnight
+        before being sold, so the whole volume counts as available.
+        """
+        assert order.id
+        return cls(
+            order.id,
+            order.timestamp,
+            order.code,
+            order.price,
+            order.vol,
+            latest_price=order.price,
+            avail_vol=order.vol,
+            yesterday_vol=order.vol,
+        )
+
+    @classmethod
+    def from_batch(cls, batch: BuyOrderBatch) -> list["BacktestPosition"]:
+        """
+        The positions of a filled order batch, without making the orders.
+        """
+        timestamp = batch.timestamp
+        return [
+            cls(
+                make_backtest_id(code),
+                timestamp,
+                code,
+                price,
+                vol,
+                latest_price=price,
+                avail_vol=vol,
+                yesterday_vol=vol,
+            )
+            for code, price, vol in zip(
+                batch.codes.tolist(), batch.prices.tolist(), batch.vols.tolist()
+            )
+        ]
+
+    def to_model(self) -> Position:
+        return Position(**{name: getattr(self, name) for name in self.__slots__})
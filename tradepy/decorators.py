@@ -64,13 +64,20 @@ def tag(outputs=list(), notna=False):
     return inner
 
 
+def ensure_mode(*modes: "ModeType", op: object = None):
+    """
+    Raise `OperationForbidden` unless running in one of the given modes. Objects that
+    only exist in some modes call it once when created, instead of having each of
+    their methods decorated with `require_mode`.
+    """
+    if tradepy.config.common.mode not in modes:
+        raise OperationForbidden(f"{op or 'Operation'} is only allowed in {modes} modes")
+
+
 def require_mode(*modes: "ModeType"):
     def inner(fun):
         def decor(*args, **kwargs):
-            if tradepy.config.common.mode not in modes:
-                raise OperationForbidden(
-                    f"Method {fun} is only allowed in {modes} modes"
-                )
+            ensure_mode(*modes, op=f"Method {fun}")
             return fun(*args, **kwargs)
 
         return decor
@@ -3,14 +3,19 @@ import pandas as pd
 from pathlib import Path
 from contextlib import suppress
 from tqdm import tqdm
-from typing import Any, Generator
 from functools import partial
 
 import tradepy
+from tradepy.depot.fingerprint import file_fingerprint
+from tradepy.depot.manifest import DepotManifest
+from tradepy.depot.scan import BarsScan
+from tradepy.depot.sidecar import load_with_sidecar
+from tradepy.depot import schema as dtype_schema
 
 
 class GenericListingDepot:
     file_name: str
+    schema: dtype_schema.DtypeSchema = {"code": dtype_schema.TEXT}
 
     def __init__(self) -> None:
         db_folder = tradepy.config.common.database_dir
@@ -20,10 +25,16 @@ class GenericListingDepot:
     def file_path(cls) -> Path:
         return tradepy.config.common.database_dir / cls.file_name
 
+    @classmethod
+    def fingerprint(cls) -> str:
+        return file_fingerprint(cls.file_path())
+
     @classmethod
     def load(cls) -> pd.DataFrame:
         path = cls.file_path()
-        return pd.read_csv(path, index_col="code", dtype={"code": str})
+        return load_with_sidecar(
+            path, lambda: dtype_schema.read_csv(path, cls.schema, index_col="code")
+        )
 
     @classmethod
     def save(cls, df: pd.DataFrame):
@@ -33,52 +44,115 @@ class GenericListingDepot:
 
 class GenericBarsDepot:
     folder_name: str
-    caches: dict[str, Any] = dict()
+    schema: dtype_schema.DtypeSchema = dict()
+    caches: dict[str, tuple[str, pd.DataFrame]] = dict()
 
     def __init__(self) -> None:
         assert isinstance(self.folder_name, str)
         self.folder = tradepy.config.common.database_dir / self.folder_name
         self.folder.mkdir(parents=True, exist_ok=True)
+        self.manifest = DepotManifest(self.folder)
 
     @classmethod
     def clear_cache(cls):
         cls.caches.clear()
 
     def size(self) -> int:
-        return sum(1 for _ in self.folder.iterdir())
+        return len(self.manifest)
+
+    def batch(self):
+        """
+        Save many files while writing the manifest only once, see `DepotManifest.batch`
+        """
+        return self.manifest.batch()
+
+    def _write_csv(self, df: pd.DataFrame, path: Path):
+        raw = df.to_csv(index=False).encode("utf-8")
+        path.write_bytes(raw)
+        self.manifest.update(path, df, raw)
 
     def save(self, df: pd.DataFrame, filename: str) -> Path:
         assert filename.endswith("csv")
         out_path = self.folder / filename
-        df.to_csv(out_path, index=False)
+        self._write_csv(df, out_path)
         return out_path
 
     def append(self, df: pd.DataFrame, filename: str):
         assert filename.endswith("csv")
         path = self.folder / filename
 
-        if not path.exists():
-            df.to_csv(path, index=False)
+        if path.exists():
+            _df = pd.read_csv(path, index_col=None)
+            df = pd.concat([df, _df]).drop_duplicates()
 
-        _df = pd.read_csv(path, index_col=None)
+        self._write_csv(df, path)
 
-        (pd.concat([df, _df]).drop_duplicates().to_csv(path, index=False))
+    def delete(self, name: str):
+        (self.folder / f"{name}.csv").unlink(missing_ok=True)
+        self.manifest.remove(name)
 
     def exists(self, name: str):
         return (self.folder / f"{name}.csv").exists()
 
-    def find(self, codes: list[str] | None = None, always_load=False):
+    def expire(self, before_date: str) -> int:
+        """
+        Drop the bars older than `before_date`. The manifest tells which files hold
+        such bars, so the other files are neither read nor rewritten.
+
+        Files without any bars since `before_date` (e.g., of long suspended stocks)
+        are left intact, as the collectors resume downloading from their last bar.
+
+        :return: number of files trimmed
+        """
+        n_trimmed = 0
+        with self.batch():
+            for name, entry in list(self.manifest.entries.items()):
+                min_ts, max_ts = entry["min_timestamp"], entry["max_timestamp"]
+                if min_ts is None or not (min_ts < before_date <= max_ts):  # type: ignore
+                    continue
+
+                path = self.folder / f"{name}.csv"
+                df = pd.read_csv(path, dtype=str, keep_default_na=False)
+                self.save(df[df["timestamp"] >= before_date], path.name)
+                n_trimmed += 1
+        return n_trimmed
+
+    def fingerprint(self) -> str:
+        """
+        Version id of the depot's content, changes whenever any bars file changes
+        """
+        return self.manifest.fingerprint()
+
+    def coverage(self) -> pd.DataFrame:
+        """
+        Date range, row count, size and content hash of each bars file
+        """
+        return self.manifest.to_frame()
+
+    def find(
+        self,
+        codes: list[str] | None = None,
+        always_load=False,
+        usecols: set[str] | None = None,
+        apply_schema=True,
+    ):
         def get_iterator():
-            if not codes:
-                if (total := sum(1 for _ in self.folder.iterdir())) > 1000:
+            if codes is None:
+                names = sorted(self.manifest.entries.keys())
+                if (total := len(names)) > 1000:
                     miniters = total // 20  # to console per 5%
                 else:
                     miniters = 0  # auto
-                return tqdm(self.folder.iterdir(), miniters=miniters)
+                return tqdm(
+                    (self.folder / f"{name}.csv" for name in names),
+                    total=total,
+                    miniters=miniters,
+                )
 
             return (self.folder / f"{code}.csv" for code in codes)
 
-        load = partial(pd.read_csv)
+        schema = self.schema if apply_schema else dict()
+        load = partial(dtype_schema.read_csv, schema=schema, usecols=usecols)
         for path in get_iterator():
             if str(path).endswith(".csv"):
                 if always_load:
@@ -88,22 +162,40 @@ class GenericBarsDepot:
                     if should_load:
                         yield load(path)
 
+    def scan(self) -> BarsScan:
+        """
+        Start a lazy query on the bars, see `BarsScan`
+        """
+        return BarsScan(self)
+
+    def _should_scan(self, name: str) -> bool:
+        return True
+
+    def _prepare_bars(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Clean up a single loaded bars file, before the query filters are applied
+        """
+        return df
+
+    def _finalize_bars(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Clean up the concatenated bars, before being indexed and sorted
+        """
+        # Concatenating the files may widen the dtypes, e.g., categories => object
+        return dtype_schema.apply_schema(df, self.schema)
+
     def _generic_load_bars(
         self, index_by: str | list[str] = "code", cache_key=None, cache=False
     ) -> pd.DataFrame:
         if cache_key in self.caches:
             assert cache_key
-            if cache:
-                return self.caches[cache_key]
+            # Only reuse the cached bars if the files haven't changed since
+            fingerprint, cached_df = self.caches[cache_key]
+            if cache and fingerprint == self.fingerprint():
+                return cached_df
             del self.caches[cache_key]
 
-        def loader() -> Generator[pd.DataFrame, None, None]:
-            for code, df in self.find(always_load=True):
-                df["code"] = code
-                yield df
-
-        df = pd.concat(loader())
-        df.set_index(index_by, inplace=True)
+        df = self.scan().index_by(index_by, drop=True).collect()
         df.sort_index(inplace=True)
 
         with suppress(KeyError):
@@ -111,7 +203,7 @@ class GenericBarsDepot:
 
         if cache:
             assert cache_key
-            self.caches[cache_key] = df.copy()
+            self.caches[cache_key] = (self.fingerprint(), df.copy())
         return df
 
     @abc.abstractmethod
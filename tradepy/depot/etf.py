@@ -1,13 +1,16 @@
 import pandas as pd
 from tradepy.depot.base import GenericListingDepot, GenericBarsDepot
+from tradepy.depot.schema import DAY_BARS_SCHEMA, ETF_LISTING_SCHEMA
 
 
 class ETFListingDepot(GenericListingDepot):
     file_name = "etf-listing.csv"
+    schema = ETF_LISTING_SCHEMA
 
 
 class ETFDailyBarsDepot(GenericBarsDepot):
     folder_name = "daily-etfs"
+    schema = DAY_BARS_SCHEMA
 
     def _load(self, index_by: str | list[str] = "code", cache=False) -> pd.DataFrame:
         return self._generic_load_bars(index_by)
@@ -0,0 +1,59 @@
+import hashlib
+from pathlib import Path
+from typing import Iterable
+
+
+_CHUNK_SIZE = 1 << 20
+
+# path => (size, mtime_ns, content hash), of the latest version of each file. The
+# oldest entries are evicted past the max size.
+_file_hashes: dict[str, tuple[int, int, str]] = dict()
+_MAX_FILE_HASHES = 1 << 16
+
+
+def hash_bytes(raw: bytes) -> str:
+    return hashlib.md5(raw).hexdigest()
+
+
+def combine_fingerprints(fingerprints: Iterable[tuple[str, str]]) -> str:
+    """
+    Derive a single version id from the (name, fingerprint) pairs of a collection
+    of files, regardless of their order.
+    """
+    hasher = hashlib.md5()
+    for name, fp in sorted(fingerprints):
+        hasher.update(f"{name}:{fp};".encode("utf-8"))
+    return hasher.hexdigest()
+
+
+def file_fingerprint(path: str | Path) -> str:
+    """
+    Content hash of a file, or the combined hash of the files under a directory.
+
+    The hash is memoized on the file's size and modification time, so that asking
+    again for an unchanged file is nearly free.
+    """
+    path = Path(path)
+    if path.is_dir():
+        return combine_fingerprints(
+            (str(p.relative_to(path)), file_fingerprint(p))
+            for p in path.rglob("*")
+            if p.is_file()
+        )
+
+    stat = path.stat()
+    key = str(path.absolute())
+    if (memo := _file_hashes.get(key)) and memo[:2] == (stat.st_size, stat.st_mtime_ns):
+        return memo[2]
+
+    hasher = hashlib.md5()
+    with path.open("rb") as f:
+        while chunk := f.read(_CHUNK_SIZE):
+            hasher.update(chunk)
+
+    fp = hasher.hexdigest()
+    _file_hashes.pop(key, None)
+    if len(_file_hashes) >= _MAX_FILE_HASHES:
+        del _file_hashes[next(iter(_file_hashes))]
+    _file_hashes[key] = (stat.st_size, stat.st_mtime_ns, fp)
+    return fp
@@ -1,9 +1,11 @@
 import pandas as pd
 from tradepy.depot.base import GenericBarsDepot
+from tradepy.depot.schema import STOCK_FUTURES_DAY_BARS_SCHEMA
 
 
 class StockFuturesDailyBarsDepot(GenericBarsDepot):
     folder_name = "daily-stock-futures"
+    schema = STOCK_FUTURES_DAY_BARS_SCHEMA
 
     def _load(self, index_by: str | list[str] = "code", cache=True) -> pd.DataFrame:
         return self._generic_load_bars(index_by, cache)
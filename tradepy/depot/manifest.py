@@ -0,0 +1,179 @@
+import io
+import os
+import json
+import tempfile
+import pandas as pd
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, TypedDict
+
+from tradepy.depot.fingerprint import combine_fingerprints, hash_bytes
+
+
+class ManifestEntry(TypedDict):
+    min_timestamp: str | None
+    max_timestamp: str | None
+    n_rows: int
+    file_size: int
+    mtime_ns: int
+    hash: str
+
+
+class DepotManifest:
+    """
+    A small index of the bar files kept in a depot folder. It records each file's
+    date range, row count, size and content hash, so that callers can plan updates
+    or check coverage without parsing the CSV files.
+    """
+
+    file_name = "manifest.json"
+
+    def __init__(self, folder: Path) -> None:
+        self.folder = folder
+        self.path = folder / self.file_name
+        self._entries: dict[str, ManifestEntry] | None = None
+        self._batch_depth = 0
+        self._dirty = False
+
+    @property
+    def entries(self) -> dict[str, ManifestEntry]:
+        if self._entries is None:
+            self._entries = self._read()
+            self.refresh()
+        return self._entries
+
+    def get(self, name: str) -> ManifestEntry | None:
+        return self.entries.get(name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _read(self) -> dict[str, ManifestEntry]:
+        try:
+            with self.path.open("r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return dict()
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        Defer writing the manifest until exit, so that saving many files rewrites
+        it once. Files saved before an error are still recorded.
+        """
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth and self._dirty:
+                self._write()
+
+    def _write(self):
+        assert self._entries is not None
+        if self._batch_depth:
+            self._dirty = True
+            return
+
+        self._dirty = False
+        fd, temp_path = tempfile.mkstemp(dir=self.folder, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, sort_keys=True)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    @staticmethod
+    def _make_entry(
+        path: Path, df: pd.DataFrame | None = None, raw: bytes | None = None
+    ) -> ManifestEntry:
+        if raw is None:
+            raw = path.read_bytes()
+        stat = path.stat()
+
+        if df is None:
+            header = raw.split(b"\n", 1)[0].decode("utf-8").strip().split(",")
+            usecols = ["timestamp"] if "timestamp" in header else [0]
+            df = pd.read_csv(io.BytesIO(raw), usecols=usecols, dtype=str)
+
+        if "timestamp" in df and not df.empty:
+            min_ts, max_ts = str(df["timestamp"].min()), str(df["timestamp"].max())
+        else:
+            min_ts = max_ts = None
+
+        return {
+            "min_timestamp": min_ts,
+            "max_timestamp": max_ts,
+            "n_rows": len(df),
+            "file_size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "hash": hash_bytes(raw),
+        }
+
+    def refresh(self) -> bool:
+        """
+        Re-index the files that were added, changed or removed behind the depot's back,
+        e.g., written by an older TradePy version. Only the stale files are parsed.
+
+        :return: whether the manifest has been changed
+        """
+        entries = self._entries if self._entries is not None else self._read()
+        self._entries = entries
+        changed = False
+
+        on_disk = {p.stem: p for p in self.folder.glob("*.csv")}
+        for name in list(entries.keys()):
+            if name not in on_disk:
+                del entries[name]
+                changed = True
+
+        for name, path in on_disk.items():
+            stat = path.stat()
+            entry = entries.get(name)
+            if (
+                entry is None
+                or entry["file_size"] != stat.st_size
+                or entry["mtime_ns"] != stat.st_mtime_ns
+            ):
+                entries[name] = self._make_entry(path)
+                changed = True
+
+        if changed:
+            self._write()
+        return changed
+
+    def update(
+        self, path: Path, df: pd.DataFrame | None = None, raw: bytes | None = None
+    ):
+        """
+        Record a freshly written bars file.
+
+        :param path: the bars file path
+        :param df: the written dataframe, saves re-parsing the file if given
+        :param raw: the written bytes, saves re-reading the file if given
+        """
+        self.entries[path.stem] = self._make_entry(path, df, raw)
+        self._write()
+
+    def remove(self, name: str):
+        if self.entries.pop(name, None) is not None:
+            self._write()
+
+    def fingerprint(self) -> str:
+        """
+        Version id of the whole folder, which changes whenever any file is added,
+        changed or removed.
+        """
+        return combine_fingerprints(
+            (name, entry["hash"]) for name, entry in self.entries.items()
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        df = pd.DataFrame.from_dict(self.entries, orient="index")
+        df.index.name = "code"
+        return df.sort_index()
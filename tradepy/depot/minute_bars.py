@@ -0,0 +1,146 @@
+import json
+import os
+import struct
+import tempfile
+import zlib
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Iterable
+
+from tradepy.depot.schema import MINUTE_BARS_SCHEMA, apply_schema
+
+_MAGIC = b"TPMB"
+_VERSION = 2
+_HEADER = struct.Struct("<4sBI")
+_COMPRESS_LEVEL = 6
+
+
+def _compress(arr: np.ndarray) -> bytes:
+    # Shuffle the bytes so that the slowly changing high bytes of neighbouring values
+    # end up next to each other, which is what makes the prices compress well
+    raw = arr.view(np.uint8).reshape(-1, arr.itemsize).T.tobytes()
+    return zlib.compress(raw, _COMPRESS_LEVEL)
+
+
+def _decompress(blob: bytes, dtype: str, n_rows: int) -> np.ndarray:
+    dtype_ = np.dtype(dtype)
+    shuffled = np.frombuffer(zlib.decompress(blob), dtype=np.uint8)
+    raw = shuffled.reshape(dtype_.itemsize, n_rows).T.copy()
+    return raw.view(dtype_).reshape(n_rows)
+
+
+def write_minute_bars(df: pd.DataFrame, path: Path):
+    """
+    Write one day of minute bars into a compressed columnar file.
+
+    The rows are sorted by code and time. Each code's rows of each column are
+    compressed as a block of their own, and the header records the block sizes, so
+    that readers only read and decompress the blocks of the stocks they ask for.
+
+    :param df: the minute bars, with columns code, time (HHMM), open, high, low, close, vol
+    :param path: output file path
+    """
+    df = df.reset_index() if "code" not in df else df
+    df = df.sort_values(["code", "time"], kind="stable")
+    df = apply_schema(df[["code", "time", *MINUTE_BARS_SCHEMA]].copy(), MINUTE_BARS_SCHEMA)
+
+    codes, starts = np.unique(df["code"].astype(str).values, return_index=True)
+    offsets = np.append(starts, len(df))
+    time_codes, times = pd.factorize(df["time"].astype(str), sort=True)
+
+    columns = [("time", time_codes.astype(np.int16))] + [
+        (col, df[col].values) for col in MINUTE_BARS_SCHEMA
+    ]
+    bounds = list(zip(offsets[:-1].tolist(), offsets[1:].tolist()))
+    blocks = [
+        [_compress(np.ascontiguousarray(arr[start:end])) for start, end in bounds]
+        for _, arr in columns
+    ]
+
+    header = json.dumps(
+        {
+            "codec": "zlib-shuffle",
+            "n_rows": len(df),
+            "codes": codes.tolist(),
+            "offsets": offsets.tolist(),
+            "times": list(times),
+            "columns": [
+                {
+                    "name": name,
+                    "dtype": arr.dtype.str,
+                    "sizes": [len(blob) for blob in col_blocks],
+                }
+                for (name, arr), col_blocks in zip(columns, blocks)
+            ],
+        }
+    ).encode("utf-8")
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, len(header)))
+            f.write(header)
+            for col_blocks in blocks:
+                for blob in col_blocks:
+                    f.write(blob)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def read_minute_bars(path: Path, codes: Iterable[str] | None = None) -> pd.DataFrame:
+    """
+    Read one day of minute bars written by `write_minute_bars`.
+
+    :param path: the file path
+    :param codes: only return the bars of these stocks, default to all
+    :return: the minute bars indexed by code, sorted by code and time
+    """
+    with path.open("rb") as f:
+        magic, version, header_size = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"不支持的分钟K线文件: {path}")
+        header = json.loads(f.read(header_size))
+
+        all_codes = np.array(header["codes"], dtype=object)
+        counts = np.diff(np.array(header["offsets"], dtype=np.int64))
+        code_idx = np.arange(len(all_codes))
+        if codes is not None:
+            code_idx = pd.Index(all_codes).get_indexer(list(codes))
+            code_idx = np.sort(code_idx[code_idx >= 0])
+
+        # Where each (column, code) block starts in the file
+        sizes = np.array([col["sizes"] for col in header["columns"]], dtype=np.int64)
+        sizes = sizes.reshape(len(header["columns"]), len(all_codes))
+        starts = np.cumsum(sizes).reshape(sizes.shape) - sizes
+        starts += _HEADER.size + header_size
+
+        blocks = []
+        for col_starts, col_sizes in zip(starts, sizes):
+            col_blocks = []
+            for i in code_idx:
+                f.seek(col_starts[i])
+                col_blocks.append(f.read(col_sizes[i]))
+            blocks.append(col_blocks)
+
+    all_codes, counts = all_codes[code_idx], counts[code_idx]
+
+    data = dict()
+    for col, col_blocks in zip(header["columns"], blocks):
+        arr = np.concatenate(
+            [
+                _decompress(blob, col["dtype"], n_rows)
+                for blob, n_rows in zip(col_blocks, counts.tolist())
+            ]
+            or [np.empty(0, dtype=col["dtype"])]
+        )
+        if col["name"] == "time":
+            data["time"] = pd.Categorical.from_codes(arr, categories=header["times"])
+        else:
+            data[col["name"]] = arr
+
+    index = pd.Index(np.repeat(all_codes, counts), name="code")
+    return pd.DataFrame(data, index=index)
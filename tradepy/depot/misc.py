@@ -1,10 +1,12 @@
-from functools import cache
+from functools import cache, lru_cache
 from pathlib import Path
 import time
 import pandas as pd
 
 import tradepy
 from tradepy.core.adjust_factors import AdjustFactors
+from tradepy.depot.fingerprint import file_fingerprint
+from tradepy.depot.sidecar import load_with_sidecar
 
 
 class AdjustFactorDepot:
@@ -15,16 +17,31 @@ class AdjustFactorDepot:
         return tradepy.config.common.database_dir / AdjustFactorDepot.file_name
 
     @staticmethod
-    @cache
+    def fingerprint() -> str:
+        return file_fingerprint(AdjustFactorDepot.file_path())
+
+    @staticmethod
     def load() -> AdjustFactors:
+        # Keyed on the content fingerprint, so that a re-downloaded file gets reloaded
+        # and the previous factors get released
+        return AdjustFactorDepot._load(AdjustFactorDepot.fingerprint())
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _load(fingerprint: str) -> AdjustFactors:
         path = AdjustFactorDepot.file_path()
-        df = pd.read_csv(
-            path,
-            dtype={"code": str, "date": str, "hfq_factor": float},
-            index_col="code",
-        )
-        df.sort_values(["code", "timestamp"], inplace=True)
-        return AdjustFactors(df)
+
+        def parse() -> pd.DataFrame:
+            df = pd.read_csv(
+                path,
+                dtype={"code": str, "timestamp": str, "hfq_factor": float},
+                index_col="code",
+            )
+            df.sort_values(["code", "timestamp"], inplace=True)
+            return df
+
+        # The sidecar keeps the factors sorted, so they are used as is
+        return AdjustFactors(load_with_sidecar(path, parse))
 
 
 class RestrictedSharesReleaseDepot:
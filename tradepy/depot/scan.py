@@ -0,0 +1,180 @@
+import copy
+import pandas as pd
+from typing import TYPE_CHECKING, Callable, Generator, Iterable
+
+if TYPE_CHECKING:
+    from tradepy.depot.base import GenericBarsDepot
+
+
+Predicate = Callable[[pd.DataFrame], pd.DataFrame | pd.Series]
+
+
+class BarsScan:
+    """
+    A lazy query over the bar files of a depot. Filters and column selections are only
+    accumulated, and get executed at `collect()` time, which reads just the files and
+    columns needed by the query, and sorts the result only when asked to.
+
+    Each method returns a new query, so a base query can be safely shared, e.g.,
+
+        scan = StocksDailyBarsDepot().scan().markets(["上证主板"])
+        df = scan.between("2023-01-01").select("timestamp,code,close").collect()
+    """
+
+    def __init__(self, depot: "GenericBarsDepot") -> None:
+        self.depot = depot
+        self._codes: list[str] | None = None
+        self._markets: list[str] | None = None
+        self._since_date: str | None = None
+        self._until_date: str | None = None
+        self._predicates: list[tuple[Predicate, list[str] | None]] = []
+        self._columns: list[str] | None = None
+        self._index_by: str | list[str] | None = None
+        self._drop_index = False
+        self._sort = False
+        self._raw = False
+
+    def _derive(self, **changes) -> "BarsScan":
+        scan = copy.copy(self)
+        scan._predicates = list(self._predicates)
+        for name, value in changes.items():
+            setattr(scan, name, value)
+        return scan
+
+    def codes(self, codes: Iterable[str] | None) -> "BarsScan":
+        return self._derive(_codes=None if codes is None else list(codes))
+
+    def markets(self, markets: Iterable[str] | None) -> "BarsScan":
+        return self._derive(_markets=None if not markets else list(markets))
+
+    def between(
+        self, since_date: str | None = None, until_date: str | None = None
+    ) -> "BarsScan":
+        """
+        Keep the bars within [since_date, until_date], both ends are optional
+        """
+        return self._derive(_since_date=since_date, _until_date=until_date)
+
+    def filter(
+        self, predicate: Predicate, columns: Iterable[str] | None = None
+    ) -> "BarsScan":
+        """
+        Apply a predicate on each loaded bars file. Like the strategies' `pre_process`,
+        the predicate may either return the filtered dataframe or a boolean mask.
+
+        :param predicate: the predicate function
+        :param columns: columns the predicate reads, all columns are loaded if not given
+        """
+        scan = self._derive()
+        scan._predicates.append((predicate, None if columns is None else list(columns)))
+        return scan
+
+    def select(self, columns: str | Iterable[str]) -> "BarsScan":
+        if isinstance(columns, str):
+            columns = columns.split(",")
+        return self._derive(_columns=list(columns))
+
+    def index_by(self, index_by: str | list[str], drop=False) -> "BarsScan":
+        return self._derive(_index_by=index_by, _drop_index=drop)
+
+    def sort_by_time(self) -> "BarsScan":
+        return self._derive(_sort=True)
+
+    def raw(self) -> "BarsScan":
+        """
+        Keep the dtypes as parsed by pandas instead of narrowing them to the depot's
+        schema, for bars that are going to be written back to the files.
+        """
+        return self._derive(_raw=True)
+
+    def _needed_columns(self) -> set[str] | None:
+        if self._columns is None:
+            return None
+
+        if any(cols is None for _, cols in self._predicates):
+            return None
+
+        needed = set(self._columns)
+        for _, cols in self._predicates:
+            needed.update(cols)  # type: ignore
+        if self._markets:
+            needed.add("market")
+        if self._since_date or self._until_date or self._sort:
+            needed.add("timestamp")
+        if self._index_by is not None:
+            if isinstance(self._index_by, str):
+                needed.add(self._index_by)
+            else:
+                needed.update(self._index_by)
+        return needed
+
+    def _overlaps(self, name: str) -> bool:
+        if not (self._since_date or self._until_date):
+            return True
+
+        entry = self.depot.manifest.get(name)
+        if not entry or entry["min_timestamp"] is None:
+            return True
+
+        if self._since_date and entry["max_timestamp"] < self._since_date:  # type: ignore
+            return False
+        if self._until_date and entry["min_timestamp"] > self._until_date:
+            return False
+        return True
+
+    def _apply_filters(self, df: pd.DataFrame) -> pd.DataFrame:
+        if self._markets:
+            df = df[df["market"].isin(self._markets)]
+
+        if self._since_date:
+            df = df[df["timestamp"] >= self._since_date]
+
+        if self._until_date:
+            df = df[df["timestamp"] <= self._until_date]
+
+        for predicate, _ in self._predicates:
+            res = predicate(df)
+            df = res if isinstance(res, pd.DataFrame) else df[res]
+        return df
+
+    def _iter_frames(self) -> Generator[pd.DataFrame, None, None]:
+        if self._codes is None:
+            names = sorted(self.depot.manifest.entries.keys())
+        else:
+            names = self._codes
+
+        names = [n for n in names if self.depot._should_scan(n) and self._overlaps(n)]
+        if not names:
+            return
+
+        needed = self._needed_columns()
+
+        for code, df in self.depot.find(
+            names, always_load=True, usecols=needed, apply_schema=not self._raw
+        ):
+            df["code"] = code
+            df = self._apply_filters(self.depot._prepare_bars(df))
+            if not df.empty:
+                yield df
+
+    def collect(self) -> pd.DataFrame:
+        frames = list(self._iter_frames())
+        if not frames:
+            return pd.DataFrame(columns=self._columns)
+
+        df = pd.concat(frames, ignore_index=True)
+        if not self._raw:
+            df = self.depot._finalize_bars(df)
+
+        if self._index_by is not None:
+            df.set_index(self._index_by, inplace=True, drop=self._drop_index)
+
+        if self._sort:
+            if "timestamp" in df.index.names:
+                df.sort_index(level="timestamp", inplace=True)
+            else:
+                df.sort_values("timestamp", inplace=True)
+
+        if self._columns is not None:
+            return df[self._columns]
+        return df
@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Iterable
+
+
+DtypeSchema = dict[str, str]
+"""
+Column name => dtype of a depot's files. The precision rules are:
+
+- prices, percentages and other real values: float32
+- market caps, turnovers and ranks: float64, as float32 would round them
+- volumes and other counts: int32, kept as int64 if any value would overflow
+- names, markets, sectors and other low-cardinality labels: category
+- codes and dates: str
+"""
+
+PRICE = "float32"
+AMOUNT = "float64"
+COUNT = "int32"
+LABEL = "category"
+TEXT = "str"
+
+
+DAY_BARS_SCHEMA: DtypeSchema = {
+    "timestamp": TEXT,
+    "code": TEXT,
+    "open": PRICE,
+    "high": PRICE,
+    "low": PRICE,
+    "close": PRICE,
+    "chg": PRICE,
+    "pct_chg": PRICE,
+    "turnover": AMOUNT,
+    "vol": COUNT,
+}
+
+STOCK_DAY_BARS_SCHEMA: DtypeSchema = DAY_BARS_SCHEMA | {
+    "company": LABEL,
+    "market": LABEL,
+    "mkt_cap": AMOUNT,
+    "mkt_cap_rank": AMOUNT,
+}
+
+SECTOR_INDEX_DAY_BARS_SCHEMA: DtypeSchema = DAY_BARS_SCHEMA | {
+    "code": LABEL,
+    "name": LABEL,
+}
+
+STOCK_FUTURES_DAY_BARS_SCHEMA: DtypeSchema = DAY_BARS_SCHEMA | {
+    "open_interest": COUNT,
+}
+
+MINUTE_BARS_SCHEMA: DtypeSchema = {
+    "open": PRICE,
+    "high": PRICE,
+    "low": PRICE,
+    "close": PRICE,
+    "vol": COUNT,
+}
+
+STOCK_LISTING_SCHEMA: DtypeSchema = {
+    "code": TEXT,
+    "market": LABEL,
+    "sector": LABEL,
+    "listdate": TEXT,
+    "id": COUNT,
+}
+
+ETF_LISTING_SCHEMA: DtypeSchema = {
+    "code": TEXT,
+    "mkt_cap": AMOUNT,
+}
+
+
+def _is_integer(dtype: str) -> bool:
+    return dtype.startswith("int")
+
+
+def reader_dtypes(
+    schema: DtypeSchema, usecols: Iterable[str] | None = None
+) -> dict[str, str]:
+    """
+    The dtypes that can be passed straight to `pd.read_csv`. Integer columns are left
+    out, as the CSV reader would silently wrap around on overflow, see `apply_schema`.
+    """
+    return {
+        col: dtype
+        for col, dtype in schema.items()
+        if not _is_integer(dtype) and (usecols is None or col in usecols)
+    }
+
+
+def apply_schema(df: pd.DataFrame, schema: DtypeSchema) -> pd.DataFrame:
+    """
+    Cast the columns to the schema dtypes in place. Integer columns are only narrowed
+    when all values are present and fit into the target type.
+    """
+    for col, dtype in schema.items():
+        if col not in df or str(df[col].dtype) == dtype:
+            continue
+
+        if _is_integer(dtype):
+            values = df[col]
+            if values.dtype.kind != "i":
+                continue
+            info = np.iinfo(dtype)
+            if values.empty or (info.min <= values.min() and values.max() <= info.max):
+                df[col] = values.astype(dtype)
+        elif dtype == TEXT:
+            if df[col].dtype.kind != "O":
+                df[col] = df[col].astype(str)
+        else:
+            df[col] = df[col].astype(dtype)
+    return df
+
+
+def read_csv(
+    path: Path, schema: DtypeSchema, usecols: Iterable[str] | None = None, **kwargs
+) -> pd.DataFrame:
+    if usecols is not None:
+        usecols = set(usecols)
+        kwargs["usecols"] = lambda col: col in usecols  # type: ignore
+
+    df = pd.read_csv(path, dtype=reader_dtypes(schema, usecols), **kwargs)  # type: ignore
+    return apply_schema(df, schema)
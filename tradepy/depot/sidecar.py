@@ -0,0 +1,64 @@
+import json
+import os
+import shutil
+import tempfile
+import pandas as pd
+from contextlib import suppress
+from pathlib import Path
+from typing import Callable
+
+from tradepy.columnar import load_columnar_dataset, save_columnar_dataset
+
+
+SIDECARS_FOLDER = ".sidecars"
+_SOURCE_FILE = "source.json"
+
+
+def sidecar_path(path: Path) -> Path:
+    return path.parent / SIDECARS_FOLDER / path.stem
+
+
+def _source_stat(path: Path) -> dict[str, int]:
+    stat = path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _write_sidecar(df: pd.DataFrame, sidecar: Path, source: dict[str, int]):
+    sidecar.parent.mkdir(parents=True, exist_ok=True)
+    temp_dir = Path(tempfile.mkdtemp(dir=sidecar.parent, prefix=f"{sidecar.name}."))
+    try:
+        save_columnar_dataset(df, temp_dir, stack=False)
+        (temp_dir / _SOURCE_FILE).write_text(json.dumps(source))
+
+        if sidecar.exists():
+            shutil.rmtree(sidecar)
+        os.replace(temp_dir, sidecar)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def load_with_sidecar(path: Path, parse: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+    """
+    Load a reference CSV through its binary sidecar, a typed columnar copy of the
+    parsed frame that is memory-mapped instead of parsed again.
+
+    The sidecar records the CSV's size and modification time, and gets regenerated
+    by `parse` once the CSV changes. The loaded columns are copy-on-write, so the
+    callers may still modify the frame in memory.
+
+    :param path: the CSV file
+    :param parse: parses the CSV into the frame to be cached
+    """
+    source = _source_stat(path)
+    sidecar = sidecar_path(path)
+
+    with suppress(FileNotFoundError, ValueError):
+        if json.loads((sidecar / _SOURCE_FILE).read_text()) == source:
+            return load_columnar_dataset(sidecar, mmap_mode="c")
+
+    df = parse()
+    # Not being able to write the sidecar (read-only database folder, a concurrent
+    # writer, columns of mixed types) only costs the next process another parse
+    with suppress(OSError, TypeError):
+        _write_sidecar(df, sidecar, source)
+    return df
@@ -1,15 +1,29 @@
 import pandas as pd
-from typing import Generator
+from pathlib import Path
+from typing import Iterable
 
 import tradepy
 from tradepy.depot.base import GenericBarsDepot, GenericListingDepot
+from tradepy.depot.minute_bars import read_minute_bars, write_minute_bars
+from tradepy.depot.schema import STOCK_DAY_BARS_SCHEMA, STOCK_LISTING_SCHEMA
+from tradepy.stocks import CodeDictionary
 from tradepy.types import MarketType
 
 
 class StocksDailyBarsDepot(GenericBarsDepot):
     folder_name = "daily-stocks"
+    schema = STOCK_DAY_BARS_SCHEMA
     default_loaded_fields = "timestamp,code,company,market,open,high,low,close,turnover,vol,chg,pct_chg,mkt_cap,mkt_cap_rank"
 
+    def _should_scan(self, name: str) -> bool:
+        return tradepy.listing.has_code(name)
+
+    def _prepare_bars(self, df: pd.DataFrame) -> pd.DataFrame:
+        # Convert "中小板" to "深证主板" for legacy reason
+        if "market" in df:
+            df["market"].replace("中小板", "深证主板", inplace=True)
+        return df
+
     def _load(
         self,
         codes: list[str] | None = None,
@@ -19,67 +33,92 @@ class StocksDailyBarsDepot(GenericBarsDepot):
         fields: str = default_loaded_fields,
         markets: tuple[MarketType, ...] | None = None,
     ) -> pd.DataFrame:
-        def loader() -> Generator[pd.DataFrame, None, None]:
-            source_iter = self.find(codes)
-
-            while True:
-                try:
-                    code: str = next(source_iter)
-                except StopIteration:
-                    break
-
-                if not tradepy.listing.has_code(code):
-                    continue
-
-                df = source_iter.send(True)
-                assert isinstance(df, pd.DataFrame)
-                df["code"] = code
-
-                if markets:
-                    df = df.query("market in @markets").copy()
-
-                if since_date or until_date:
-                    _since_date = since_date or "2000-01-01"  # noqa
-                    _until_date = until_date or "3000-01-01"  # noqa
-                    yield df.query("@_until_date >= timestamp >= @_since_date")
-                else:
-                    yield df
-
-        df = pd.concat(loader())
-
-        # Convert "中小板" to "深证主板" for legacy reason
-        df["market"].replace("中小板", "深证主板", inplace=True)
-
-        # Optimize the memory storage
-        cat_columns = ["company", "market"]
-        for col in cat_columns:
-            df[col] = df[col].astype("category")
-
-        df.set_index(index_by, inplace=True, drop=False)
-
-        # Sort by time order
-        if "timestamp" not in df.index.names:
-            df.sort_values("timestamp", inplace=True)
-        else:
-            df.sort_index(level="timestamp", inplace=True)
+        scan = (
+            self.scan()
+            .codes(codes)
+            .markets(markets)
+            .between(since_date, until_date)
+            .index_by(index_by)
+            .sort_by_time()
+        )
 
         if fields != "all":
-            _fields = fields.split(",")
-            return df[_fields]
-        return df
+            scan = scan.select(fields)
+        return scan.collect()
 
 
 class StockMinuteBarsDepot(GenericBarsDepot):
+    """
+    Minute bars are stored one compressed columnar file per day, partitioned by month:
+    ``stocks-minutes/<YYYY-MM>/<YYYY-MM-DD>.mb``
+    """
+
     folder_name = "stocks-minutes"
+    file_suffix = ".mb"
+
+    def day_file_path(self, date: str) -> Path:
+        return self.folder / date[:7] / f"{date}{self.file_suffix}"
+
+    def save_day(self, df: pd.DataFrame, date: str) -> Path:
+        """
+        :param df: 当日的分钟K线, 需包含code, time (HHMM), open, high, low, close, vol列
+        :param date: 日期, e.g., 2023-11-15
+        """
+        path = self.day_file_path(date)
+        write_minute_bars(df, path)
+        return path
+
+    def load_day(self, date: str, codes: Iterable[str] | None = None) -> pd.DataFrame:
+        """
+        :param date: 日期, e.g., 2023-11-15
+        :param codes: 只读取这些个股的分钟K线, 默认读取全部
+        :return: 以code为索引的分钟K线
+        """
+        path = self.day_file_path(date)
+        if path.exists():
+            return read_minute_bars(path, codes)
+
+        # Fall back to the legacy monthly pickle files
+        df = self._load_legacy_month(date[:7]).loc[(date,)]
+        return df if codes is None else df[df.index.isin(list(codes))]
+
+    def _load_legacy_month(self, month: str) -> pd.DataFrame:
+        cache_key = f"{self.folder_name}:{month}"
+        if cache_key not in self.caches:
+            # Keep only one month around
+            for key in [k for k in self.caches if k.startswith(self.folder_name)]:
+                del self.caches[key]
+
+            df = pd.read_pickle(self.folder / f"{month}.pkl")
+            if df.index.names != ["date", "code"]:
+                df.set_index(["date", "code"], inplace=True)
+                df.sort_index(inplace=True)
+            self.caches[cache_key] = ("", df)
+        return self.caches[cache_key][1]
 
     def _load(self, month: str) -> pd.DataFrame:
-        file = self.folder / f"{month}.pkl"
-        df = pd.read_pickle(file)
-        if df.index.names != ["date", "code"]:
-            df.set_index(["date", "code"], inplace=True)
-            df.sort_index(inplace=True)
-        return df
+        month_dir = self.folder / month
+        paths = sorted(month_dir.glob(f"*{self.file_suffix}"))
+        if not paths:
+            return self._load_legacy_month(month)
+
+        return pd.concat(
+            {path.stem: read_minute_bars(path) for path in paths}, names=["date"]
+        )
 
 
 class StockListingDepot(GenericListingDepot):
     file_name = "listing.csv"
+    schema = STOCK_LISTING_SCHEMA
+
+    @classmethod
+    def save(cls, df: pd.DataFrame):
+        # Carry over the stable code ids from the current listing file
+        try:
+            prev_ids = cls.load().get("id")
+        except FileNotFoundError:
+            prev_ids = None
+
+        df = df.copy()
+        df["id"] = CodeDictionary.assign_ids(df.index, prev_ids)
+        super().save(df)
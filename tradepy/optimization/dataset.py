@@ -0,0 +1,166 @@
+import gc
+import json
+import os
+import struct
+import numpy as np
+import pandas as pd
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from typing import Any, Iterable
+
+from tradepy.columnar import (
+    LayoutBuilder,
+    decode_frame,
+    load_columnar_dataset,
+    project_layout,
+)
+
+
+_ALIGNMENT = 64
+_HEADER = struct.Struct("<Q")
+
+
+def load_dataset(path: str, columns: Iterable[str] | None = None) -> pd.DataFrame:
+    """
+    :param path: 回测数据路径, 支持csv, pkl以及列式存储的目录
+    :param columns: 需要读取的列, 数据中不存在的列将被忽略. 默认读取全部列
+    """
+    if Path(path).is_dir():
+        return load_columnar_dataset(path, columns)
+    elif path.endswith("csv"):
+        df = pd.read_csv(path)
+    elif path.endswith("pkl"):
+        df = pd.read_pickle(path)
+    else:
+        raise ValueError(f"不支持的数据格式: {os.path.splitext(path)[1]}")
+
+    if columns is not None:
+        wanted = set(columns)
+        df = df[[col for col in df.columns if col in wanted]]
+    return df
+
+
+def _align(n: int) -> int:
+    return (n + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def _pack_layout(
+    layout: dict[str, Any], arrays: list[np.ndarray]
+) -> tuple[bytes, int, int]:
+    offset = 0
+    layout["arrays"] = []
+    for arr in arrays:
+        layout["arrays"].append(
+            {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": offset}
+        )
+        offset = _align(offset + arr.nbytes)
+
+    meta = json.dumps(layout, ensure_ascii=False).encode("utf-8")
+    data_start = _align(_HEADER.size + len(meta))
+    return meta, data_start, data_start + offset
+
+
+def _unpack_arrays(buf, writeable=False) -> tuple[dict[str, Any], list[np.ndarray]]:
+    (meta_size,) = _HEADER.unpack_from(buf, 0)
+    meta_start = _HEADER.size
+    layout = json.loads(bytes(buf[meta_start : meta_start + meta_size]))
+    data_start = _align(meta_start + meta_size)
+
+    arrays = []
+    for spec in layout["arrays"]:
+        shape = tuple(spec["shape"])
+        arr = np.ndarray(
+            shape, dtype=spec["dtype"], buffer=buf, offset=data_start + spec["offset"]
+        )
+        arr.flags.writeable = writeable
+        arrays.append(arr)
+    return layout, arrays
+
+
+# -------------
+# Shared memory
+# -------------
+class SharedDataset:
+    """
+    A backtest dataset published once into the node's shared memory. Every worker
+    process on the node then attaches to the same copy instead of unpickling its own.
+    """
+
+    def __init__(self, shm: SharedMemory) -> None:
+        self.shm = shm
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @classmethod
+    def publish(cls, df: pd.DataFrame) -> "SharedDataset":
+        builder = LayoutBuilder()
+        layout = builder.build(df)
+        meta, data_start, size = _pack_layout(layout, builder.arrays)
+
+        shm = SharedMemory(create=True, size=size)
+        try:
+            _HEADER.pack_into(shm.buf, 0, len(meta))
+            shm.buf[_HEADER.size : _HEADER.size + len(meta)] = meta
+            for arr, spec in zip(builder.arrays, layout["arrays"]):
+                start = data_start + spec["offset"]
+                shm.buf[start : start + arr.nbytes] = arr.reshape(-1).view(np.uint8)
+        except BaseException:
+            shm.close()
+            shm.unlink()
+            raise
+        return cls(shm)
+
+    def unlink(self):
+        self.shm.unlink()
+        self.shm.close()
+
+    def __reduce__(self):
+        # Unpickling would re-attach the segment, and register it with the unpickling
+        # process' resource tracker. Pass the name around instead.
+        raise TypeError("SharedDataset is not picklable, pass its name instead")
+
+
+# Segments attached by this process, kept open as the dataframes point into them
+_attached_segments: dict[str, SharedMemory] = dict()
+
+
+def attach_shared_dataset(
+    name: str, columns: Iterable[str] | None = None
+) -> pd.DataFrame:
+    """
+    Open a dataset published by `SharedDataset.publish`. The numeric columns are
+    read-only views on the shared memory.
+
+    :param columns: only decode these columns, the same as `load_columnar_dataset`
+    """
+    if (shm := _attached_segments.get(name)) is None:
+        shm = SharedMemory(name=name)
+        # The publisher owns the segment, so don't let this process' resource tracker
+        # unlink it on exit.
+        resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore
+        _attached_segments[name] = shm
+
+    layout, arrays = _unpack_arrays(shm.buf)
+    if columns is not None:
+        layout = project_layout(layout, columns)
+    return decode_frame(layout, arrays)
+
+
+def detach_shared_datasets(keep: str | None = None):
+    """
+    Close the segments attached by this process, other than `keep`. Segments still
+    referenced by dataframes can't be closed yet, and are left for a later call.
+    """
+    if not (names := [name for name in _attached_segments if name != keep]):
+        return
+
+    gc.collect()  # the dropped frames may still be held by reference cycles
+    for name in names:
+        try:
+            _attached_segments[name].close()
+        except BufferError:
+            continue
+        del _attached_segments[name]
@@ -1,18 +1,18 @@
 import itertools
 import random
 import pickle
-import quantstats as qs
+import numpy as np
 import pandas as pd
-import plotly.subplots as sp
-import plotly.graph_objects as go
-import plotly.express as px
 
 from functools import cached_property, cache
 from pathlib import Path
-from sklearn import manifold
+from typing import TYPE_CHECKING
 
 from tradepy.optimization.parameter import Parameter, ParameterGroup
 
+if TYPE_CHECKING:
+    from tradepy.backtest.evaluation import BatchEvaluator
+
 
 class BacktestRunsResult:
     def __init__(self, workspace_dir: Path | str) -> None:
@@ -20,20 +20,115 @@ class BacktestRunsResult:
             workspace_dir = Path(workspace_dir)
         self.workspace_dir = workspace_dir
 
+    def _load_capital_curve(self, task_dir: Path) -> pd.DataFrame | None:
+        from tradepy.trade_book import TradeBook
+
+        if (path := task_dir / "trade_book").is_dir():
+            return TradeBook.load_capitals(path)
+
+        if (path := task_dir / "trade_book.pkl").exists():
+            # Written before the trade books were saved as columnar datasets
+            with path.open("rb") as fh:
+                return pickle.load(fh).cap_logs_df[["capital"]]
+
+        return None
+
+    def _load_trades(self, task_dir: Path) -> pd.DataFrame | None:
+        from tradepy.trade_book import TradeBook
+
+        if (path := task_dir / "trade_book").is_dir():
+            return TradeBook.load_trades(path)
+
+        if (path := task_dir / "trade_book.pkl").exists():
+            with path.open("rb") as fh:
+                return pickle.load(fh).trade_logs_df[["action", "pct_chg"]]
+
+        return None
+
+    def _iter_task_dirs(self) -> list[Path]:
+        if not (workers_dir := self.workspace_dir / "workers").is_dir():
+            return []
+        return sorted(workers_dir.iterdir())
+
+    def load_trade_returns(self) -> pd.Series:
+        """
+        :return: the pct_chg of every run's sells, indexed by run_id
+        """
+        from tradepy.types import TradeActions
+
+        run_ids, returns = [], []
+        for task_dir in self._iter_task_dirs():
+            trades_df = self._load_trades(task_dir)
+            if trades_df is not None:
+                sells = trades_df["action"].to_numpy() != TradeActions.OPEN
+                returns.append(trades_df["pct_chg"].to_numpy()[sells])
+                run_ids.append(np.full(sells.sum(), task_dir.name, dtype=object))
+
+        if not returns:
+            return pd.Series(
+                [], index=pd.Index([], dtype=object, name="run_id"), name="pct_chg"
+            )
+
+        return pd.Series(
+            np.concatenate(returns),
+            index=pd.Index(np.concatenate(run_ids), name="run_id"),
+            name="pct_chg",
+        )
+
+    def get_batch_evaluator(self) -> "BatchEvaluator":
+        from tradepy.backtest.evaluation import BatchEvaluator
+
+        return BatchEvaluator.from_capital_curves(
+            self.load_capital_curves(), self.load_trade_returns()
+        )
+
+    def evaluate_runs(self) -> pd.DataFrame:
+        """
+        一次性计算所有回测轮次的收益率、最大回撤、夏普比率、盈亏比及胜率
+        """
+        return self.get_batch_evaluator().evaluate()
+
+    def bootstrap_metrics(
+        self, n_samples: int = 1000, confidence: float = 0.95, seed: int | None = None
+    ) -> pd.DataFrame:
+        """
+        通过自助法(bootstrap)估计每轮回测指标的置信区间
+
+        :param n_samples: 自助抽样次数
+        :param confidence: 置信水平
+        :param seed: 随机种子
+        """
+        return self.get_batch_evaluator().bootstrap(n_samples, confidence, seed)
+
     def load_capital_curves(self) -> pd.DataFrame:
-        cap_df_list = []
+        """
+        Read the capital column of every run's trade book, memory-mapped.
 
-        for trade_book_path in (self.workspace_dir / "workers").rglob(
-            "**/trade_book.pkl"
-        ):
-            run_id = trade_book_path.parent.name
-            with trade_book_path.open("rb") as fh:
-                trade_book = pickle.load(fh)
-                caps_df = trade_book.cap_logs_df
-                caps_df["run_id"] = run_id
-                cap_df_list.append(caps_df[["run_id", "capital"]])
+        :return: the capitals indexed by timestamp, with the run_id column
+        """
+        run_ids, cap_series = [], []
+        for task_dir in self._iter_task_dirs():
+            caps_df = self._load_capital_curve(task_dir)
+            if caps_df is not None:
+                run_ids.append(np.full(len(caps_df), task_dir.name, dtype=object))
+                cap_series.append(caps_df["capital"])
+
+        if not cap_series:
+            return pd.DataFrame(
+                {"run_id": pd.Series([], dtype=object), "capital": []},
+                index=pd.DatetimeIndex([], name="timestamp"),
+            )
 
-        return pd.concat(cap_df_list)
+        return pd.DataFrame(
+            {
+                "run_id": np.concatenate(run_ids),
+                "capital": np.concatenate([s.to_numpy() for s in cap_series]),
+            },
+            index=pd.DatetimeIndex(
+                np.concatenate([s.index.to_numpy() for s in cap_series]),
+                name="timestamp",
+            ),
+        )
 
     def plot_equity_curves(self, sample_runs: int | None = None):
         """
@@ -41,6 +136,7 @@ class BacktestRunsResult:
 
         :param sample_runs: 随机抽样的回测轮数
         """
+        import plotly.express as px
 
         cap_curves_df = self.load_capital_curves()
         if sample_runs:
@@ -60,6 +156,10 @@ class BacktestRunsResult:
         fig.show()
 
     def plot_equity_curve_bands(self):
+        import quantstats as qs
+        import plotly.subplots as sp
+        import plotly.graph_objects as go
+
         cap_curves_df = self.load_capital_curves()
         stats_df = cap_curves_df.groupby("timestamp")["capital"].agg(["mean", "std"])
         stats_df["lower"] = stats_df["mean"] - stats_df["std"]
@@ -237,6 +337,8 @@ class ParameterPerformancePlotter:
         self.param_cols = list(metrics_df.index.names)
 
     def _plot_2d(self, X, y, colors):
+        import plotly.graph_objects as go
+
         labels = [
             f'[{self.score_name}={row[(self.score_name, "mean")]}]: '
             + " \n\n; ".join(f"{name}={row[name].iloc[0]}" for name in self.param_cols)
@@ -263,6 +365,8 @@ class ParameterPerformancePlotter:
         fig.show()
 
     def _plot_heatmap(self, X, y):
+        import plotly.graph_objects as go
+
         fig = go.Figure(
             data=go.Heatmap(x=list(map(str, X[:, 0])), y=list(map(str, X[:, 1])), z=y)
         )
@@ -273,6 +377,8 @@ class ParameterPerformancePlotter:
         fig.show()
 
     def _plot_tsne_fit(self, X, y):
+        from sklearn import manifold
+
         t_sne = manifold.TSNE(
             n_components=2,
             perplexity=5,
@@ -1,8 +1,8 @@
 import abc
 import os
-import pickle
 import pandas as pd
-from typing import Any, Generic, Type, TypeVar, TypedDict
+from functools import partial
+from typing import Any, Callable, Generic, Type, TypeVar, TypedDict
 from uuid import uuid4
 from loguru import logger
 from pathlib import Path
@@ -10,12 +10,20 @@ from datetime import datetime
 from dask.distributed import Client as DaskClient
 from tradepy.backtest.evaluation import ResultEvaluator
 
+from tradepy.depot.fingerprint import file_fingerprint
 from tradepy.core.conf import BacktestConf, DaskConf, OptimizationConf, TaskConf
+from tradepy.columnar import save_columnar_dataset
+from tradepy.optimization.dataset import SharedDataset, load_dataset
 from tradepy.optimization.parameter import Parameter, ParameterGroup
 from tradepy.optimization.result import OptimizationResult
 from tradepy.optimization.types import Number, TaskRequest, TaskResult
-from tradepy.optimization.worker import Worker
+from tradepy.optimization.worker import (
+    Worker,
+    get_dataset_cache_stats,
+    warmup_dataset,
+)
 from tradepy.strategy.base import StrategyBase
+from tradepy.decorators import timeit
 from tradepy.utils import optimize_dtype_memory
 
 
@@ -34,37 +42,58 @@ def get_random_id() -> str:
 ConfType = TypeVar("ConfType", bound=TaskConf)
 
 
+def execute_task(request: TaskRequest, conf: TaskConf, workspace_dir: Path) -> TaskResult:
+    # Run backtesting and evaluate the results
+    evaluator_class: Type[ResultEvaluator] = conf.load_evaluator_class()
+    metrics = Worker(workspace_dir).run(request, evaluator_class)
+    return dict(metrics=metrics, **request)  # type: ignore
+
+
 class TaskScheduler(Generic[ConfType]):
     def __init__(self, conf: ConfType) -> None:
         self.conf = conf
         self.workspace_dir: Path = get_default_workspace_dir()
         self.workspace_dir.mkdir(parents=True, exist_ok=True)
+        self.dataset_version: str | None = None
+        self.shared_dataset: SharedDataset | None = None
+        self._warmed_up_version: str | None = None
         logger.info(f"任务工作目录: {self.workspace_dir}")
 
     @property
     def task_log_file_path(self) -> Path:
         return self.workspace_dir / "tasks.csv"
 
-    def _executor(self, request: TaskRequest) -> TaskResult:
-        # Run backtesting
-        trade_book_path: str = Worker(self.workspace_dir).run(request)
-
-        # Evaluate results
-        with open(trade_book_path, "rb") as file:
-            trade_book = pickle.load(file)
-            evaluator_class: Type[ResultEvaluator] = self.conf.load_evaluator_class()
-            metrics = evaluator_class(trade_book).evaluate_trades()  # type: ignore
-            return dict(metrics=metrics, **request)  # type: ignore
+    def _make_executor(self) -> Callable[[TaskRequest], TaskResult]:
+        # Only the conf and the workspace path are shipped with the tasks. The shared
+        # dataset travels by its name in the requests.
+        return partial(execute_task, conf=self.conf, workspace_dir=self.workspace_dir)
 
     def _output_indicators_df(self, df: pd.DataFrame) -> Path:
         strategy = self.conf.backtest.strategy.load_strategy()
         ind_df = strategy.compute_all_indicators_df(df)
-        out_path = self.workspace_dir / "dataset.pkl"
         ind_df = optimize_dtype_memory(ind_df)
-        ind_df.to_pickle(out_path)
+        if self.conf.dataset_format == "npy":
+            out_path = save_columnar_dataset(ind_df, self.workspace_dir / "dataset")
+        else:
+            out_path = self.workspace_dir / "dataset.pkl"
+            ind_df.to_pickle(out_path)
         logger.info(f"回测数据已保存至: {out_path}")
         return out_path
 
+    def _publish_dataset(self):
+        assert self.conf.dataset_path
+        try:
+            df = load_dataset(str(self.conf.dataset_path))
+            self.shared_dataset = SharedDataset.publish(df)
+            logger.info(f"回测数据已发布至共享内存: {self.shared_dataset.name}")
+        except (OSError, TypeError, ValueError) as exc:
+            logger.warning(f"无法将回测数据发布至共享内存, 各任务将单独读取数据文件: {exc}")
+
+    def _unpublish_dataset(self):
+        if self.shared_dataset:
+            self.shared_dataset.unlink()
+            self.shared_dataset = None
+
     def make_task_request(
         self,
         repetition: int,
@@ -83,6 +112,8 @@ class TaskScheduler(Generic[ConfType]):
             "repetition": repetition,
             "batch_id": batch_id,
             "dataset_path": str(self.conf.dataset_path),
+            "dataset_version": self.dataset_version or "",
+            "dataset_shm": self.shared_dataset.name if self.shared_dataset else "",
             "backtest_conf": backtest_conf.model_dump(),
         }
 
@@ -98,14 +129,40 @@ class TaskScheduler(Generic[ConfType]):
         except FileNotFoundError:
             batch_df.to_csv(self.task_log_file_path)
 
+    def warmup_workers(self, dask_client: DaskClient, request: TaskRequest):
+        """
+        Have every worker load the dataset before the tasks arrive, so that the tasks
+        don't all block on loading it at once.
+        """
+        if self._warmed_up_version == request["dataset_version"]:
+            return
+
+        logger.info("预热各Dask进程的回测数据")
+        with timeit() as timer:
+            dask_client.run(warmup_dataset, request)
+        self._warmed_up_version = request["dataset_version"]
+        logger.info(f"预热完成, 耗时: {timer['seconds']}s")
+
+    def log_dataset_cache_stats(self, dask_client: DaskClient):
+        stats: dict[str, dict] = dask_client.run(get_dataset_cache_stats)  # type: ignore
+        hits = sum(s["hits"] for s in stats.values())
+        misses = sum(s["misses"] for s in stats.values())
+        load_seconds = sum(s["load_seconds"] for s in stats.values())
+        hit_rate = hits / (hits + misses) if hits + misses else 0
+        logger.info(
+            f"回测数据缓存: 命中率 = {hit_rate:.2%}, 加载次数 = {misses}, 总加载耗时 = {load_seconds:.2f}s"
+        )
+
     def submit_tasks_and_patch_results(
         self, dask_client: DaskClient, batch_df: pd.DataFrame
     ) -> list[TaskResult]:
+        requests = batch_df.reset_index().to_dict(orient="records")
+        self.warmup_workers(dask_client, requests[0])  # type: ignore
+
         logger.info(f"提交{len(batch_df)}个任务")
-        futures = dask_client.map(
-            self._executor, batch_df.reset_index().to_dict(orient="records")
-        )
+        futures = dask_client.map(self._make_executor(), requests)
         results: list[TaskResult] = dask_client.gather(futures)  # type: ignore
+        self.log_dataset_cache_stats(dask_client)
 
         # Update metrics
         metrics_df = pd.DataFrame(
@@ -151,10 +208,17 @@ class TaskScheduler(Generic[ConfType]):
                 raise ValueError("`data_df`是空的")
             self.conf.dataset_path = self._output_indicators_df(data_df)
 
+        # Tasks and results produced from this dataset will be tagged with its version
+        self.dataset_version = file_fingerprint(self.conf.dataset_path)
+        logger.info(f"回测数据版本: {self.dataset_version}")
+
         # Run dask
         dask_client = DaskClient(**_dask_args)
 
         try:
+            if self.conf.share_dataset:
+                self._publish_dataset()
+
             info = dask_client.scheduler_info()
             logger.info(
                 f'启动Dask集群: id={info["id"]}, dashboard port={info["services"]["dashboard"]}, {dask_client}'
@@ -165,6 +229,7 @@ class TaskScheduler(Generic[ConfType]):
         finally:
             dask_client.close()
             logger.info("关闭Dask集群")
+            self._unpublish_dataset()
 
 
 def _make_parameter(name: str | list[str], choices) -> Parameter | ParameterGroup:
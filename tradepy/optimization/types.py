@@ -11,6 +11,8 @@ class TaskRequest(TypedDict):
     batch_id: str
     repetition: int
     dataset_path: str
+    dataset_version: str
+    dataset_shm: str
     backtest_conf: dict[str, Any]
 
 
@@ -1,18 +1,125 @@
-import os
 import json
-import pickle
+from collections import OrderedDict
 from pathlib import Path
-from typing import Type
+from typing import Any, Type
 from loguru import logger
 import pandas as pd
 
+from tradepy.backtest.evaluation import ResultEvaluator, StreamingEvaluator
 from tradepy.core.conf import BacktestConf
 from tradepy.strategy.base import BacktestStrategy
 from tradepy.decorators import timeit
+from tradepy.depot.fingerprint import file_fingerprint
 from tradepy.trade_book.trade_book import TradeBook
+from tradepy.optimization.dataset import (
+    attach_shared_dataset,
+    detach_shared_datasets,
+    load_dataset,
+)
 from tradepy.optimization.types import TaskRequest
 
 
+TRADE_BOOK_FOLDER = "trade_book"
+
+
+class DatasetCache:
+    """
+    Datasets kept resident in a worker process across tasks, keyed by the dataset path
+    and its content fingerprint. Only the most recently used ones are kept.
+    """
+
+    def __init__(self, max_size: int = 1) -> None:
+        self.max_size = max_size
+        self.datasets: OrderedDict[tuple, pd.DataFrame] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.load_seconds = 0.0
+
+    @staticmethod
+    def make_key(
+        request: TaskRequest, columns: list[str] | None = None
+    ) -> tuple[str, str, tuple[str, ...] | None]:
+        path = request["dataset_path"]
+        version = request.get("dataset_version") or file_fingerprint(path)
+        return path, version, tuple(columns) if columns is not None else None
+
+    @staticmethod
+    def load(request: TaskRequest, columns: list[str] | None = None) -> pd.DataFrame:
+        if shm_name := request.get("dataset_shm"):
+            try:
+                return attach_shared_dataset(shm_name, columns)
+            except FileNotFoundError:
+                # Published on another node
+                logger.warning(f"无法读取共享内存中的回测数据: {shm_name}, 将直接读取数据文件")
+        return load_dataset(request["dataset_path"], columns)
+
+    def get(self, request: TaskRequest, columns: list[str] | None = None) -> pd.DataFrame:
+        """
+        :param columns: the columns to load, all columns if None
+        """
+        key = self.make_key(request, columns)
+        if (df := self.datasets.get(key)) is not None:
+            self.hits += 1
+            self.datasets.move_to_end(key)
+            return df
+
+        self.misses += 1
+
+        # Drop the older versions of the dataset, and the shared memory segments
+        # they were attached to
+        path, version, _ = key
+        for stale_key in [k for k in self.datasets if k[0] == path and k[1] != version]:
+            del self.datasets[stale_key]
+        detach_shared_datasets(keep=request.get("dataset_shm") or None)
+
+        with timeit() as timer:
+            df = self.load(request, columns)
+        self.load_seconds += timer["seconds"]
+
+        self.datasets[key] = df
+        while len(self.datasets) > self.max_size:
+            self.datasets.popitem(last=False)
+        return df
+
+    def stats(self) -> dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "load_seconds": round(self.load_seconds, 2),
+        }
+
+
+# One per worker process
+dataset_cache = DatasetCache()
+
+
+def get_dataset_columns(request: TaskRequest) -> list[str] | None:
+    """
+    The columns the requested strategy reads, so that only these are paged in. None
+    (all columns) unless the strategy opts in with `project_dataset`.
+    """
+    bt_conf: BacktestConf = BacktestConf.from_dict(request["backtest_conf"])
+    strategy_class: Type[BacktestStrategy] = bt_conf.strategy.load_strategy_class()
+    if not strategy_class.project_dataset:
+        return None
+    return strategy_class(bt_conf.strategy).dataset_columns
+
+
+def warmup_dataset(request: TaskRequest) -> dict[str, float]:
+    """
+    Load the dataset into the worker's cache before any task arrives. Meant to be
+    broadcast to all workers with ``dask_client.run``.
+    """
+    dataset_cache.get(request, get_dataset_columns(request))
+    return dataset_cache.stats()
+
+
+def get_dataset_cache_stats() -> dict[str, float]:
+    return dataset_cache.stats()
+
+
 class Worker:
     def __init__(self, workspace_dir: str | Path) -> None:
         if isinstance(workspace_dir, str):
@@ -32,21 +139,10 @@ class Worker:
             json.dump(data, f)
 
     def write_trade_book(self, task_dir: Path, trade_book: TradeBook) -> Path:
-        path = task_dir / "trade_book.pkl"
-        with path.open("wb") as f:
-            pickle.dump(trade_book, f)
-        return path
+        return trade_book.save(task_dir / TRADE_BOOK_FOLDER)
 
     def backtest(self, request: TaskRequest) -> TradeBook:
-        # Load dataset
-        dataset_path = request["dataset_path"]
-
-        if dataset_path.endswith("csv"):
-            df = pd.read_csv(dataset_path)
-        elif dataset_path.endswith("pkl"):
-            df = pd.read_pickle(dataset_path)
-        else:
-            raise ValueError(f"不支持的数据格式: {os.path.splitext(dataset_path)[1]}")
+        df = dataset_cache.get(request, get_dataset_columns(request))
 
         # Run backtest
         bt_conf: BacktestConf = BacktestConf.from_dict(request["backtest_conf"])
@@ -54,7 +150,15 @@ class Worker:
         _, trade_book = strategy_class.backtest(df, bt_conf)
         return trade_book
 
-    def run(self, request: TaskRequest) -> str:
+    def run(
+        self,
+        request: TaskRequest,
+        evaluator_class: Type[ResultEvaluator] = StreamingEvaluator,
+    ) -> dict[str, Any]:
+        """
+        :return: the metrics of the backtest, evaluated before the trade book is
+            saved so that it needs not be loaded back
+        """
         logger.info(f'开始执行任务: {request["id"]} (第{request["repetition"]}轮)')
 
         with timeit() as timer:
@@ -62,7 +166,8 @@ class Worker:
             self.write_task_request(task_dir, request)
 
             trade_book = self.backtest(request)
-            trade_book_path = self.write_trade_book(task_dir, trade_book)
+            metrics = evaluator_class(trade_book).evaluate_trades()  # type: ignore
+            self.write_trade_book(task_dir, trade_book)
 
         logger.info(f'任务执行完成: {request["id"]}, 耗时: {timer["seconds"]}s')
-        return str(trade_book_path.absolute())
+        return metrics
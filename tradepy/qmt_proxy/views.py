@@ -198,44 +198,45 @@ async def flush_cache():
             sell_orders[order.code].append(order)
 
     positions = await get_positions()
-    for pos in positions:
-        if pos.is_new:
-            logger.info(f"[开仓] {pos}")
-            trade_book.buy(today, pos)
-
-        elif pos.is_closed:
-            orders = sell_orders[pos.code]
-            if not orders:
-                logger.error(f"未找到对应的卖出委托: {pos}")
-                continue
-
-            if len(orders) > 1:
-                logger.error(f"找到多个对应的卖出委托: {pos}, {orders}")
-                continue
-
-            # Patch the position info
-            order = orders[0]
-            remark: SellRemark | None = order.get_sell_remark(raw=False)  # type: ignore
-            if not remark:
-                logger.error(f"未找到对应的卖出委托备注: {pos}, {order}")
-                continue
-
-            open_price = remark["price"] * (1 - remark["pct_chg"] * 1e-2)
-            pos.price = open_price
-            pos.latest_price = order.filled_price
-
-            # Log it
-            if remark["action"] == "平仓":
-                logger.info(f"[平仓] {pos}")
-                trade_book.close(today, pos)
-            elif remark["action"] == "止损":
-                logger.info(f"[止损] {pos}")
-                trade_book.stop_loss(today, pos)
-            elif remark["action"] == "止盈":
-                logger.info(f"[止盈] {pos}")
-                trade_book.take_profit(today, pos)
-            else:
-                logger.error(f"无法识别的卖出委托备注: {pos}, {order}")
+    with trade_book.batch():
+        for pos in positions:
+            if pos.is_new:
+                logger.info(f"[开仓] {pos}")
+                trade_book.buy(today, pos)
+
+            elif pos.is_closed:
+                orders = sell_orders[pos.code]
+                if not orders:
+                    logger.error(f"未找到对应的卖出委托: {pos}")
+                    continue
+
+                if len(orders) > 1:
+                    logger.error(f"找到多个对应的卖出委托: {pos}, {orders}")
+                    continue
+
+                # Patch the position info
+                order = orders[0]
+                remark: SellRemark | None = order.get_sell_remark(raw=False)  # type: ignore
+                if not remark:
+                    logger.error(f"未找到对应的卖出委托备注: {pos}, {order}")
+                    continue
+
+                open_price = remark["price"] * (1 - remark["pct_chg"] * 1e-2)
+                pos.price = open_price
+                pos.latest_price = order.filled_price
+
+                # Log it
+                if remark["action"] == "平仓":
+                    logger.info(f"[平仓] {pos}")
+                    trade_book.close(today, pos)
+                elif remark["action"] == "止损":
+                    logger.info(f"[止损] {pos}")
+                    trade_book.stop_loss(today, pos)
+                elif remark["action"] == "止盈":
+                    logger.info(f"[止盈] {pos}")
+                    trade_book.take_profit(today, pos)
+                else:
+                    logger.error(f"无法识别的卖出委托备注: {pos}, {order}")
 
     return "ok"
 
@@ -1,5 +1,7 @@
+import numpy as np
 import pandas as pd
 from functools import cache, cached_property
+from typing import Iterable
 from fuzzywuzzy import fuzz
 
 from tradepy.conversion import convert_code_to_market
@@ -12,6 +14,69 @@ def _fuzzy_match(target, texts) -> str:
     )[0][0]
 
 
+class CodeDictionary:
+    """
+    Maps stock codes to int32 ids. The listed stocks' ids are persisted with the listing
+    file and never change, while codes outside of the listing (e.g., delisted stocks
+    in a backtest dataset) are given temporary ids on first encounter.
+    """
+
+    def __init__(self, code_ids: pd.Series) -> None:
+        self._index = pd.Index(code_ids.index.astype(str))
+        self._ids = code_ids.values.astype(np.int32)
+        self._codes_by_id = np.empty(0, dtype=object)
+        self._rebuild_reverse_lookup()
+
+    def _rebuild_reverse_lookup(self):
+        size = int(self._ids.max()) + 1 if len(self._ids) else 0
+        self._codes_by_id = np.full(size, None, dtype=object)
+        self._codes_by_id[self._ids] = self._index.values
+
+    def _extend(self, codes: np.ndarray):
+        next_id = int(self._ids.max()) + 1 if len(self._ids) else 0
+        new_ids = np.arange(next_id, next_id + len(codes), dtype=np.int32)
+        self._index = self._index.append(pd.Index(codes))
+        self._ids = np.concatenate([self._ids, new_ids])
+        self._rebuild_reverse_lookup()
+
+    def encode(self, codes: Iterable[str]) -> np.ndarray:
+        codes = np.asarray(codes if isinstance(codes, pd.Index) else list(codes))
+        positions = self._index.get_indexer(codes)
+        if (missing := positions < 0).any():
+            self._extend(pd.unique(codes[missing]))
+            positions = self._index.get_indexer(codes)
+        return self._ids[positions]
+
+    def decode(self, ids: Iterable[int]) -> np.ndarray:
+        return self._codes_by_id[np.asarray(ids, dtype=np.int32)]
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @staticmethod
+    def assign_ids(
+        codes: Iterable[str], prev_ids: pd.Series | None = None
+    ) -> pd.Series:
+        """
+        Keep the previously assigned ids, and number the new codes after them.
+        """
+        codes = pd.Index(codes).astype(str)
+        ids = pd.Series(-1, index=codes, dtype=np.int64)
+
+        if prev_ids is not None and not prev_ids.empty:
+            prev_ids = prev_ids.dropna().astype(np.int64)
+            prev_ids.index = prev_ids.index.astype(str)
+            known = codes.intersection(prev_ids.index)
+            ids.loc[known] = prev_ids.loc[known]
+            next_id = int(prev_ids.max()) + 1
+        else:
+            next_id = 0
+
+        new_codes = sorted(ids.index[ids < 0])
+        ids.loc[new_codes] = np.arange(next_id, next_id + len(new_codes))
+        return ids.astype(np.int32)
+
+
 class StocksPool:
     @cached_property
     def df(self):
@@ -19,6 +84,17 @@ class StocksPool:
 
         return StockListingDepot.load()
 
+    @cached_property
+    def code_dict(self) -> CodeDictionary:
+        try:
+            df = self.df
+        except FileNotFoundError:
+            # No listing yet, so every code will be given a temporary id
+            return CodeDictionary(pd.Series(dtype=np.int32))
+
+        prev_ids = df["id"] if "id" in df else None
+        return CodeDictionary(CodeDictionary.assign_ids(df.index, prev_ids))
+
     @property
     def names(self) -> list[str]:
         return self.df["name"].unique().tolist()
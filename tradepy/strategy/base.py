@@ -1,6 +1,7 @@
 import abc
 import sys
 import inspect
+import numpy as np
 import pandas as pd
 from functools import cache, cached_property
 from itertools import chain
@@ -13,14 +14,18 @@ from tradepy.core.conf import BacktestConf, StrategyConf
 from tradepy import LOG
 from tradepy.depot.misc import AdjustFactorDepot
 from tradepy.trade_book import TradeBook
-from tradepy.core.order import Order
+from tradepy.core.order import Order, BacktestOrder, BuyOrderBatch
 from tradepy.core.position import Position
 from tradepy.core import Indicator, IndicatorSet
 from tradepy.core.adjust_factors import AdjustFactors
-from tradepy.core.budget_allocator import evenly_distribute
+from tradepy.core.budget_allocator import allocate_lots
 from tradepy.utils import calc_pct_chg
 
 
+# Enables `progress_apply` and co. in the strategies
+tqdm.pandas()
+
+
 class BarData(TypedDict):
     code: str
     timestamp: str
@@ -39,6 +44,26 @@ Weight = float
 BuyOption = tuple[Price, Weight]
 
 
+# Raw day bar columns, which the backtester and the stop loss / take profit checks read
+BASE_DATASET_COLUMNS = (
+    "timestamp",
+    "code",
+    "company",
+    "market",
+    "open",
+    "high",
+    "low",
+    "close",
+    "orig_open",
+    "vol",
+    "chg",
+    "pct_chg",
+    "turnover",
+    "mkt_cap",
+    "mkt_cap_rank",
+)
+
+
 class IndicatorsRegistry:
     def __init__(self) -> None:
         self.registry: dict[str, IndicatorSet] = defaultdict(IndicatorSet)
@@ -68,6 +93,16 @@ class IndicatorsRegistry:
 class StrategyBase:
     indicators_registry: IndicatorsRegistry = IndicatorsRegistry()
 
+    # Drop the same stocks each time when the budget can't meet the minimum trade
+    # amount of every buy option, which makes backtests reproducible
+    deterministic_allocation: bool = False
+
+    # Have the optimization workers load only the `dataset_columns`. Off by default,
+    # as `pre_process`, `post_process` and the other overrides may read any column;
+    # declare those in `extra_dataset_columns` before opting in.
+    project_dataset: bool = False
+    extra_dataset_columns: tuple[str, ...] = ()
+
     def __init__(self, conf: StrategyConf) -> None:
         self.conf = conf
 
@@ -128,6 +163,26 @@ class StrategyBase:
     def all_indicators(self) -> list[Indicator]:
         return self.indicators_registry.get_specs(self)
 
+    @cached_property
+    def dataset_columns(self) -> list[str]:
+        """
+        回测时会读取的数据列: 日K的原始列, 本策略所需指标的输入与输出列, 以及额外声明的列
+        """
+        ind_columns = chain.from_iterable(
+            ind.predecessors + ind.outputs
+            for ind in self.indicators_registry.resolve_execute_order(self)
+        )
+        return list(
+            dict.fromkeys(
+                chain(
+                    BASE_DATASET_COLUMNS,
+                    self._required_indicators,
+                    ind_columns,
+                    self.extra_dataset_columns,
+                )
+            )
+        )
+
     @abc.abstractmethod
     def should_stop_loss(
         self, bar: BarData, position: Position, *indicators
@@ -175,37 +230,76 @@ class StrategyBase:
 
         return port_df, budget
 
-    def generate_buy_orders(
-        self, port_df: pd.DataFrame, timestamp: str, budget: float
-    ) -> list[Order]:
+    def make_buy_order(
+        self, timestamp: str, code: str, price: float, vol: int
+    ) -> Order | BacktestOrder:
+        return Order(
+            id=Order.make_id(code),
+            timestamp=timestamp,
+            code=code,
+            price=price,
+            vol=vol,
+            direction="buy",
+        )
+
+    def allocate_buy_orders(
+        self,
+        port_df: pd.DataFrame,
+        timestamp: str,
+        budget: float,
+        max_position_value: float = np.inf,
+    ) -> BuyOrderBatch:
         """
         port_df: portfolio dataframe
         budget: total budget to allocate
+        max_position_value: the most to spend on one stock
         """
         if port_df.empty or budget <= 0:
-            return []
+            return BuyOrderBatch(
+                timestamp,
+                codes=np.empty(0, dtype=object),
+                prices=np.empty(0),
+                vols=np.empty(0, dtype=np.int64),
+            )
 
-        _port_df = port_df.reset_index()
-        _port_df["temp_index"] = _port_df.index.values
-        allocations = evenly_distribute(
-            _port_df[["temp_index", "order_price"]].values,
+        prices = port_df["order_price"].to_numpy(dtype=np.float64)
+        weights = (
+            port_df["weight"].to_numpy(dtype=np.float64)
+            if "weight" in port_df
+            else np.ones(len(port_df))
+        )
+        lot_vol = tradepy.config.common.trade_lot_vol
+        total_lots = allocate_lots(
+            prices,
+            weights,
             budget=budget,
-            min_trade_cost=self.min_trade_amount,
-            trade_lot_vol=tradepy.config.common.trade_lot_vol,
+            min_trade_amount=self.min_trade_amount,
+            max_position_value=max_position_value,
+            trade_lot_vol=lot_vol,
+            deterministic=self.deterministic_allocation,
         )
-        _port_df["total_lots"] = pd.Series(allocations[:, 1], index=allocations[:, 0])
 
+        bought = total_lots > 0
+        return BuyOrderBatch(
+            timestamp,
+            codes=port_df.index.to_numpy(dtype=object)[bought],
+            prices=prices[bought],
+            vols=total_lots[bought] * lot_vol,
+        )
+
+    def generate_buy_orders(
+        self,
+        port_df: pd.DataFrame,
+        timestamp: str,
+        budget: float,
+        max_position_value: float = np.inf,
+    ) -> list[Order | BacktestOrder]:
+        batch = self.allocate_buy_orders(port_df, timestamp, budget, max_position_value)
         return [
-            Order(  # type: ignore
-                id=Order.make_id(row.code),
-                timestamp=timestamp,
-                code=row.code,
-                price=row.order_price,
-                vol=row.total_lots * tradepy.config.common.trade_lot_vol,
-                direction="buy",
+            self.make_buy_order(timestamp, code, price, vol)
+            for code, price, vol in zip(
+                batch.codes.tolist(), batch.prices.tolist(), batch.vols.tolist()
             )
-            for row in _port_df.itertuples()
-            if row.total_lots > 0
         ]
 
     def adjust_stock_history_prices(self, code: str, bars_df: pd.DataFrame):
@@ -288,6 +382,11 @@ class StrategyBase:
 
 
 class BacktestStrategy(StrategyBase):
+    def make_buy_order(
+        self, timestamp: str, code: str, price: float, vol: int
+    ) -> BacktestOrder:
+        return BacktestOrder(timestamp, code, price, vol)
+
     def should_stop_loss(self, bar: BarData, position: Position) -> float | None:
         # During opening
         open_pct_chg = calc_pct_chg(position.price, bar["open"])
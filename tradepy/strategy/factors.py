@@ -4,6 +4,7 @@ import pandas as pd
 import numba as nb
 from typing import Literal
 from tradepy.decorators import tag
+from tradepy.trade_cal import to_day_numbers
 
 
 Series = pd.Series
@@ -47,7 +48,7 @@ def linear_regression_slope(values: Series, dx: int):
 # Release of restricted shares
 @nb.njit(cache=True)
 def _get_nearest_release_date_indexes(
-    direction: str, query_dates: list[str], release_dates: list[str]
+    direction: str, query_dates: np.ndarray, release_dates: np.ndarray
 ) -> list[int]:
     assert direction in ("last", "next")
     indices = [-1 for i in range(len(query_dates))]
@@ -78,8 +79,8 @@ def nearest_release_of_restricted_shares(
 ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
     indexes = _get_nearest_release_date_indexes(
         direction,
-        nb.typed.List(query_dates.tolist()),
-        nb.typed.List(releases_df["timestamp"].tolist()),
+        to_day_numbers(query_dates.values),
+        to_day_numbers(releases_df["timestamp"].values),
     )
 
     release_dates = releases_df.loc[indexes, "timestamp"].values
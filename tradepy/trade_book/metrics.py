@@ -0,0 +1,163 @@
+import math
+from dataclasses import asdict, dataclass, field, replace
+from typing import Any, Iterable
+
+from tradepy.trade_book.types import TradeLog
+from tradepy.types import TradeActions
+
+
+@dataclass
+class RunningMoments:
+    """
+    Welford's online mean and (sample) variance.
+    """
+
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self) -> float:
+        if self.count < 2:
+            return math.nan
+        return self.m2 / (self.count - 1)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+
+@dataclass
+class StreamingMetrics:
+    """
+    The performance metrics accumulated as the trade book logs the trades and the
+    daily capitals, in O(1) per log. Gives the same metrics as `BasicEvaluator`
+    without building the log frames.
+
+    NOTE: expects one closing capitals log per day, as in the backtests.
+    """
+
+    periods: int = 252  # trading days per year, for annualizing the Sharpe ratio
+
+    # Daily capitals
+    first_capital: float = math.nan
+    last_capital: float = math.nan
+    peak_capital: float = -math.inf
+    max_drawdown: float = 0.0  # the lowest capital / running peak - 1
+
+    # Daily returns
+    returns: RunningMoments = field(default_factory=RunningMoments)
+    gains: float = 0.0  # sum of the non-negative returns
+    losses: float = 0.0  # absolute sum of the negative returns
+
+    # Trades
+    actions: dict[str, int] = field(default_factory=dict)  # action => count
+    wins: int = 0
+    loss: int = 0
+    trade_returns: RunningMoments = field(default_factory=RunningMoments)
+
+    def log_capital(self, capital: float):
+        if self.returns.count == 0:
+            # Same as the first day's pct_chg in the capital logs frame
+            self.first_capital = capital
+            ret = 0.0
+        elif self.last_capital:
+            ret = capital / self.last_capital - 1
+        else:
+            ret = 0.0
+
+        self.last_capital = capital
+        if capital > self.peak_capital:
+            self.peak_capital = capital
+        elif self.peak_capital > 0:
+            self.max_drawdown = min(self.max_drawdown, capital / self.peak_capital - 1)
+
+        self.returns.add(ret)
+        if ret >= 0:
+            self.gains += ret
+        else:
+            self.losses -= ret
+
+    def log_trade(self, log: TradeLog):
+        action = log["action"]
+        self.actions[action] = self.actions.get(action, 0) + 1
+
+        pct_chg = log.get("pct_chg")
+        if pct_chg is None or math.isnan(pct_chg):
+            return
+
+        self.trade_returns.add(pct_chg)
+        if action != TradeActions.OPEN:
+            if pct_chg > 0:
+                self.wins += 1
+            else:
+                self.loss += 1
+
+    def replay(self, trade_logs: Iterable[TradeLog], capitals: Iterable[float]):
+        for log in trade_logs:
+            self.log_trade(log)
+        for capital in capitals:
+            self.log_capital(capital)
+
+    def get_sharpe_ratio(self) -> float:
+        std = self.returns.std
+        if not std:
+            return math.nan
+        return self.returns.mean / std * math.sqrt(self.periods)
+
+    def get_profit_factor(self) -> float:
+        if self.losses == 0:
+            return 0.0 if self.gains == 0 else math.inf
+        return self.gains / self.losses
+
+    def get_win_rate(self) -> float:
+        if not (n_sells := self.wins + self.loss):
+            return math.nan
+        return self.wins / n_sells
+
+    def evaluate(self) -> dict[str, Any]:
+        """
+        :return: the metrics in the same units and keys as `BasicEvaluator`
+        """
+        return {
+            "total_returns": round(100 * self.last_capital / self.first_capital, 2),
+            "max_drawdown": round(100 * self.max_drawdown, 2),
+            "sharpe_ratio": round(self.get_sharpe_ratio(), 2),
+            "profit_factor": float(self.get_profit_factor()),
+            "win_rate": round(100 * self.get_win_rate(), 2),
+            "number_of_trades": self.actions.get(TradeActions.OPEN, 0),
+            "number_of_stop_loss": self.actions.get(TradeActions.STOP_LOSS, 0),
+            "number_of_take_profit": self.actions.get(TradeActions.TAKE_PROFIT, 0),
+            "number_of_close": self.actions.get(TradeActions.CLOSE, 0),
+            "avg_return": round(self.trade_returns.mean, 2)
+            if self.trade_returns.count
+            else math.nan,
+            "stddev_return": round(self.trade_returns.std, 2),
+        }
+
+    def clone(self) -> "StreamingMetrics":
+        return replace(
+            self,
+            returns=replace(self.returns),
+            actions=self.actions.copy(),
+            trade_returns=replace(self.trade_returns),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "StreamingMetrics":
+        return cls(
+            **{
+                **data,
+                "returns": RunningMoments(**data["returns"]),
+                "trade_returns": RunningMoments(**data["trade_returns"]),
+            }
+        )
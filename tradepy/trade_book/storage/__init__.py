@@ -1,4 +1,7 @@
 import abc
+import pandas as pd
+from contextlib import contextmanager
+from typing import Iterator
 from tradepy.trade_book.types import TradeLog, CapitalsLog
 
 
@@ -28,10 +31,23 @@ class TradeBookStorage:
     def fetch_capital_logs(self) -> list[CapitalsLog]:
         raise NotImplementedError
 
+    def fetch_trade_logs_df(self) -> pd.DataFrame:
+        return pd.DataFrame(self.fetch_trade_logs())
+
+    def fetch_capital_logs_df(self) -> pd.DataFrame:
+        return pd.DataFrame(self.fetch_capital_logs())
+
     @abc.abstractmethod
     def get_opening(self, date: str) -> CapitalsLog | None:
         raise NotImplementedError
 
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        Write the logs made within together, if the storage can do so.
+        """
+        yield
+
     @abc.abstractmethod
     def clone(self):
         raise NotImplementedError
@@ -1,12 +1,212 @@
-from copy import deepcopy
+import numpy as np
+import pandas as pd
+from typing import Any, Mapping
+
 from tradepy.trade_book.types import TradeLog, CapitalsLog
 from tradepy.trade_book.storage import TradeBookStorage
 
 
+# Column name => numpy dtype, or "category" for the dictionary encoded strings
+TRADE_LOG_COLUMNS: dict[str, str] = {
+    "timestamp": "object",
+    "action": "category",
+    "id": "object",
+    "code": "category",
+    "vol": "int64",
+    "price": "float64",
+    "total_value": "float64",
+    "chg": "float64",
+    "pct_chg": "float64",
+    "total_return": "float64",
+}
+
+CAPITAL_LOG_COLUMNS: dict[str, str] = {
+    "timestamp": "object",
+    "market_value": "float64",
+    "free_cash_amount": "float64",
+    "frozen_cash_amount": "float64",
+}
+
+_INITIAL_CAPACITY = 256
+
+
+def _category_codes_dtype(n_categories: int) -> np.dtype:
+    # The same as pandas picks for categorical codes, so the views needn't a cast
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+class ColumnBuffer:
+    """
+    A growable typed array. The buffer is shared by the clones until either of them
+    appends (copy-on-write).
+    """
+
+    def __init__(self, dtype: str | np.dtype) -> None:
+        self.data = np.empty(_INITIAL_CAPACITY, dtype=dtype)
+        self.size = 0
+        self.shared = False
+
+    def _reserve(self, capacity: int):
+        if capacity > len(self.data):
+            capacity = max(capacity, 2 * len(self.data))
+        elif self.shared:
+            capacity = len(self.data)
+        else:
+            return
+
+        data = np.empty(capacity, dtype=self.data.dtype)
+        data[: self.size] = self.data[: self.size]
+        self.data, self.shared = data, False
+
+    def append(self, value):
+        self._reserve(self.size + 1)
+        self.data[self.size] = value
+        self.size += 1
+
+    def astype(self, dtype: np.dtype):
+        self.data, self.shared = self.data.astype(dtype), False
+
+    def view(self) -> np.ndarray:
+        view = self.data[: self.size]
+        view.flags.writeable = False
+        return view
+
+    @classmethod
+    def wrap(cls, arr: np.ndarray) -> "ColumnBuffer":
+        """
+        Use the array as the buffer, which gets copied before the first append.
+        """
+        instance = cls.__new__(cls)
+        instance.data, instance.size, instance.shared = arr, len(arr), True
+        return instance
+
+    def clone(self) -> "ColumnBuffer":
+        instance = ColumnBuffer.__new__(ColumnBuffer)
+        instance.data, instance.size = self.data, self.size
+        instance.shared = self.shared = True
+        return instance
+
+    def __getstate__(self):
+        return {"data": self.data[: self.size].copy(), "size": self.size}
+
+    def __setstate__(self, state):
+        self.data, self.size, self.shared = state["data"], state["size"], False
+
+
+class CategoryBuffer:
+    """
+    Dictionary encodes the strings as integer codes, for columns of few distinct
+    values like the stock codes and trade actions.
+    """
+
+    def __init__(self) -> None:
+        self.codes = ColumnBuffer(_category_codes_dtype(0))
+        self.categories: list[str] = []
+        self.lookup: dict[str, int] = {}
+
+    def append(self, value: str | None):
+        if value is None:
+            self.codes.append(-1)
+            return
+
+        if (code := self.lookup.get(value)) is None:
+            code = self.lookup[value] = len(self.categories)
+            self.categories.append(value)
+
+            dtype = _category_codes_dtype(len(self.categories))
+            if dtype != self.codes.data.dtype:
+                self.codes.astype(dtype)
+
+        self.codes.append(code)
+
+    def view(self) -> pd.Categorical:
+        return pd.Categorical.from_codes(self.codes.view(), categories=self.categories)
+
+    @classmethod
+    def wrap(cls, values: pd.Categorical) -> "CategoryBuffer":
+        instance = cls.__new__(cls)
+        instance.categories = values.categories.tolist()
+        instance.lookup = {v: code for code, v in enumerate(instance.categories)}
+        codes_dtype = _category_codes_dtype(len(instance.categories))
+        instance.codes = ColumnBuffer.wrap(values.codes.astype(codes_dtype, copy=False))
+        return instance
+
+    def clone(self) -> "CategoryBuffer":
+        instance = CategoryBuffer.__new__(CategoryBuffer)
+        instance.codes = self.codes.clone()
+        instance.categories = self.categories.copy()
+        instance.lookup = self.lookup.copy()
+        return instance
+
+    @property
+    def size(self) -> int:
+        return self.codes.size
+
+
+class ColumnarLogs:
+    """
+    Log rows appended into typed column buffers, viewed as a DataFrame without
+    copying the columns.
+    """
+
+    def __init__(self, columns: dict[str, str]) -> None:
+        self.buffers: dict[str, ColumnBuffer | CategoryBuffer] = {
+            name: CategoryBuffer() if dtype == "category" else ColumnBuffer(dtype)
+            for name, dtype in columns.items()
+        }
+        self._nan_values = {
+            name: np.nan for name, dtype in columns.items() if dtype.startswith("float")
+        }
+
+    def append(self, row: Mapping[str, Any]):
+        for name, buffer in self.buffers.items():
+            value = row.get(name)
+            if value is None:
+                value = self._nan_values.get(name)
+            buffer.append(value)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, columns: dict[str, str]) -> "ColumnarLogs":
+        """
+        Wrap the frame's columns without copying them, until the first append.
+        """
+        instance = cls(columns)
+        for name, dtype in columns.items():
+            if name not in df:
+                continue
+            if dtype == "category":
+                values = pd.Categorical(df[name])
+                instance.buffers[name] = CategoryBuffer.wrap(values)
+            else:
+                values = np.asarray(df[name], dtype=dtype)
+                instance.buffers[name] = ColumnBuffer.wrap(values)
+        return instance
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {name: buffer.view() for name, buffer in self.buffers.items()}, copy=False
+        )
+
+    def to_records(self) -> list[dict[str, Any]]:
+        return self.to_frame().astype(object).to_dict("records")
+
+    def clone(self) -> "ColumnarLogs":
+        instance = ColumnarLogs.__new__(ColumnarLogs)
+        instance.buffers = {name: buf.clone() for name, buf in self.buffers.items()}
+        instance._nan_values = self._nan_values
+        return instance
+
+    def __len__(self) -> int:
+        return next(iter(self.buffers.values())).size
+
+
 class InMemoryTradeBookStorage(TradeBookStorage):
     def __init__(self) -> None:
-        self.trade_logs: list[TradeLog] = list()
-        self.capital_logs: list[CapitalsLog] = list()
+        self.trade_logs = ColumnarLogs(TRADE_LOG_COLUMNS)
+        self.capital_logs = ColumnarLogs(CAPITAL_LOG_COLUMNS)
 
     def sell(self, log: TradeLog):
         self.trade_logs.append(log)
@@ -18,13 +218,40 @@ class InMemoryTradeBookStorage(TradeBookStorage):
         self.capital_logs.append(log)
 
     def fetch_trade_logs(self) -> list[TradeLog]:
-        return self.trade_logs
+        return self.trade_logs.to_records()  # type: ignore
 
     def fetch_capital_logs(self) -> list[CapitalsLog]:
-        return self.capital_logs
+        return self.capital_logs.to_records()  # type: ignore
+
+    def fetch_trade_logs_df(self) -> pd.DataFrame:
+        return self.trade_logs.to_frame()
+
+    def fetch_capital_logs_df(self) -> pd.DataFrame:
+        return self.capital_logs.to_frame()
+
+    @classmethod
+    def from_frames(
+        cls, trades_df: pd.DataFrame, caps_df: pd.DataFrame
+    ) -> "InMemoryTradeBookStorage":
+        instance = cls.__new__(cls)
+        instance.trade_logs = ColumnarLogs.from_frame(trades_df, TRADE_LOG_COLUMNS)
+        instance.capital_logs = ColumnarLogs.from_frame(caps_df, CAPITAL_LOG_COLUMNS)
+        return instance
+
+    def __setstate__(self, state: dict[str, Any]):
+        # Trade books pickled when the logs were lists of dicts
+        for key, columns in [
+            ("trade_logs", TRADE_LOG_COLUMNS),
+            ("capital_logs", CAPITAL_LOG_COLUMNS),
+        ]:
+            if isinstance(logs := state[key], list):
+                state[key] = ColumnarLogs(columns)
+                for log in logs:
+                    state[key].append(log)
+        self.__dict__.update(state)
 
     def clone(self) -> "InMemoryTradeBookStorage":
-        instance = InMemoryTradeBookStorage()
-        instance.trade_logs = deepcopy(self.trade_logs)
-        instance.capital_logs = deepcopy(self.capital_logs)
+        instance = InMemoryTradeBookStorage.__new__(InMemoryTradeBookStorage)
+        instance.trade_logs = self.trade_logs.clone()
+        instance.capital_logs = self.capital_logs.clone()
         return instance
@@ -1,5 +1,8 @@
 import sqlite3
+import threading
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Iterator
 from loguru import logger
 
 from tradepy.trade_book.types import TradeLog, CapitalsLog
@@ -7,27 +10,85 @@ from tradepy.trade_book.storage import TradeBookStorage
 from tradepy.trade_book.storage.sqlite_orm import Table
 
 
+# The connections are kept per thread (sqlite3 connections can't be shared between
+# threads) and per database, and reused by all the trade books
+_local = threading.local()
+
+
+def get_connection(db_path: str | Path) -> sqlite3.Connection:
+    connections: dict[str, sqlite3.Connection] = _local.__dict__.setdefault(
+        "connections", dict()
+    )
+    key = str(db_path)
+    if (conn := connections.get(key)) is None:
+        conn = connections[key] = sqlite3.connect(db_path)
+        # Readers (the API views) don't block the writer (the assets syncer) in WAL
+        conn.execute("pragma journal_mode = wal")
+        conn.execute("pragma synchronous = normal")
+    return conn
+
+
+def close_connections():
+    _local.__dict__.pop("initialized", None)
+    connections: dict[str, sqlite3.Connection] = _local.__dict__.pop("connections", {})
+    for conn in connections.values():
+        conn.close()
+
+
 class SQLiteTradeBookStorage(TradeBookStorage):
+    trade_logs_tbl: Table[TradeLog] = Table.from_typed_dict(TradeLog)
+    capital_logs_tbl: Table[CapitalsLog] = Table.from_typed_dict(CapitalsLog)
+
     def __init__(self, db_path: str | Path | None = None) -> None:
         if not db_path:
             db_path = Path.home() / ".tradepy/trade_book.db"
 
-        self.conn = sqlite3.connect(db_path)
-
-        self.trade_logs_tbl: Table[TradeLog] = Table.from_typed_dict(TradeLog)
-        self.capital_logs_tbl: Table[CapitalsLog] = Table.from_typed_dict(CapitalsLog)
+        self.conn = get_connection(db_path)
+        self._pending_trade_logs: list[TradeLog] | None = None
+
+        initialized: set[str] = _local.__dict__.setdefault("initialized", set())
+        if str(db_path) not in initialized:
+            self.create_tables()
+            initialized.add(str(db_path))
+
+    def create_tables(self):
+        with self.conn:
+            self.trade_logs_tbl.create_table(self.conn)
+            self.trade_logs_tbl.create_index(self.conn, "timestamp")
+            self.trade_logs_tbl.create_index(self.conn, "code")
+            self.capital_logs_tbl.create_table(self.conn)
+            self.capital_logs_tbl.create_index(self.conn, "timestamp")
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        Collect the trade logs, and write them in one transaction on exit.
+        The logs collected so far are written even if the block raises, as each
+        of them has been logged (and counted in the metrics) already.
+        """
+        if self._pending_trade_logs is not None:
+            yield
+            return
 
-        self.trade_logs_tbl.create_table(self.conn)
-        self.capital_logs_tbl.create_table(self.conn)
+        self._pending_trade_logs = []
+        try:
+            yield
+        finally:
+            pending, self._pending_trade_logs = self._pending_trade_logs, None
+            if pending:
+                self.trade_logs_tbl.insert_many(self.conn, pending)
 
-    def __del__(self):
-        self.conn.close()
+    def _log_trade(self, log: TradeLog):
+        if self._pending_trade_logs is not None:
+            self._pending_trade_logs.append(log)
+        else:
+            self.trade_logs_tbl.insert(self.conn, log)
 
     def buy(self, log: TradeLog):
-        self.trade_logs_tbl.insert(self.conn, log)
+        self._log_trade(log)
 
     def sell(self, log: TradeLog):
-        self.trade_logs_tbl.insert(self.conn, log)
+        self._log_trade(log)
 
     def log_opening_capitals(self, log: CapitalsLog):
         date = log["timestamp"]
@@ -1,6 +1,16 @@
 import sqlite3
 from types import UnionType, NoneType
-from typing import Any, Type, TypedDict, TypeVar, Generic, cast, get_args, get_origin
+from typing import (
+    Any,
+    Generic,
+    Iterable,
+    Type,
+    TypedDict,
+    TypeVar,
+    cast,
+    get_args,
+    get_origin,
+)
 from typing_extensions import NotRequired
 
 
@@ -67,17 +77,15 @@ RowDataType = TypeVar("RowDataType", bound=TypedDict)
 
 
 class Table(Generic[RowDataType]):
+    """
+    All statements are parameterized, so that sqlite3 reuses the compiled statements
+    from its cache instead of parsing SQL with the values inlined.
+    """
+
     def __init__(self, table_name: str, fields: list[Field]) -> None:
         self.table_name: str = table_name
         self.fields: list[Field] = fields
 
-    def __serialize(self, v) -> str:
-        if isinstance(v, str):
-            return f"'{v}'"
-        if v is None:
-            return "null"
-        return str(v)
-
     def __deserialize(self, row: list[Any]) -> RowDataType:
         return cast(RowDataType, {f.name: row[i] for i, f in enumerate(self.fields)})
 
@@ -93,6 +101,16 @@ create table if not exists {self.schema()};
     def create_table(self, conn: sqlite3.Connection) -> sqlite3.Cursor:
         return conn.execute(self.build_create_table_sql())
 
+    def build_create_index_sql(self, *columns: str) -> str:
+        index_name = f"idx_{self.table_name}_{'_'.join(columns)}"
+        return (
+            f"create index if not exists {index_name} "
+            f"on {self.table_name} ({', '.join(columns)})"
+        )
+
+    def create_index(self, conn: sqlite3.Connection, *columns: str) -> sqlite3.Cursor:
+        return conn.execute(self.build_create_index_sql(*columns))
+
     # DROP -------
     def build_drop_table_sql(self) -> str:
         return f"drop table if exists {self.table_name}"
@@ -103,67 +121,82 @@ create table if not exists {self.schema()};
         return cursor
 
     # INSERT -------
-    def build_insert_sql(self, row: RowDataType) -> str:
-        columns, values = [], []
-        for col, val in row.items():
-            columns.append(col)
-            values.append(val)
+    def build_insert_sql(self, columns: Iterable[str]) -> str:
+        columns = list(columns)
+        return (
+            f"insert into {self.table_name} ({', '.join(columns)}) "
+            f"values ({', '.join('?' * len(columns))})"
+        )
 
-        return f"""
-insert into {self.table_name} ({", ".join(columns)})
-values ({", ".join(map(self.__serialize, values))})
+    def insert(self, conn: sqlite3.Connection, row: RowDataType) -> sqlite3.Cursor:
+        sql = self.build_insert_sql(row.keys())
+        with conn:
+            return conn.execute(sql, tuple(row.values()))
+
+    def insert_many(self, conn: sqlite3.Connection, rows: Iterable[RowDataType]) -> int:
         """
+        Insert the rows in one transaction, with the rows of the same columns
+        inserted by one `executemany`.
+        """
+        groups: dict[tuple[str, ...], list[tuple]] = dict()
+        for row in rows:
+            groups.setdefault(tuple(row.keys()), []).append(tuple(row.values()))
 
-    def insert(self, conn: sqlite3.Connection, row: RowDataType) -> sqlite3.Cursor:
-        cursor = conn.execute(self.build_insert_sql(row).strip())
-        conn.commit()
-        return cursor
+        count = 0
+        with conn:
+            for columns, values in groups.items():
+                sql = self.build_insert_sql(columns)
+                count += conn.executemany(sql, values).rowcount
+        return count
 
     # SELECT -------
-    def build_select_sql(self, **query) -> str:
+    def build_select_sql(self, *columns: str) -> str:
         select_clause = f"select * from {self.table_name}"
-        if not query:
+        if not columns:
             return select_clause
 
-        return select_clause + self.build_where_sql(**query)
+        return select_clause + self.build_where_sql(*columns)
 
-    def build_where_sql(self, **query) -> str:
-        return f"""
-where {" AND ".join(
-    f"{col} = {self.__serialize(val)}" for col, val in query.items()
-)}
-        """
+    def build_where_sql(self, *columns: str) -> str:
+        # "is" also matches the nulls, unlike "="
+        return " where " + " and ".join(f"{col} is ?" for col in columns)
 
     def select(self, conn: sqlite3.Connection, **query) -> list[RowDataType]:
-        cursor = conn.execute(self.build_select_sql(**query))
+        cursor = conn.execute(
+            self.build_select_sql(*query.keys()), tuple(query.values())
+        )
         rows = cursor.fetchall()
         return [self.__deserialize(row) for row in rows]
 
     # DELETE ------
-    def build_delete_sql(self, **query) -> str:
+    def build_delete_sql(self, *columns: str) -> str:
         delete_clause = f"delete from {self.table_name}"
-        if not query:
+        if not columns:
             return delete_clause
-        return delete_clause + self.build_where_sql(**query)
+        return delete_clause + self.build_where_sql(*columns)
 
     def delete(self, conn: sqlite3.Connection, **query) -> int:
-        cursor = conn.execute(self.build_delete_sql(**query))
+        with conn:
+            cursor = conn.execute(
+                self.build_delete_sql(*query.keys()), tuple(query.values())
+            )
         return cursor.rowcount
 
     # UPDATE ------
-    def build_update_sql(self, where: dict[str, Any], update: dict[str, Any]) -> str:
-        set_clause = ", ".join(
-            f"{col} = {self.__serialize(val)}" for col, val in update.items()
-        )
+    def build_update_sql(self, where: Iterable[str], update: Iterable[str]) -> str:
+        set_clause = ", ".join(f"{col} = ?" for col in update)
         update_clause = f"update {self.table_name} set {set_clause}"
-        where_clause = self.build_where_sql(**where)
+        where_clause = self.build_where_sql(*where)
         return update_clause + where_clause
 
     def update(
         self, conn: sqlite3.Connection, where: dict[str, Any], update: dict[str, Any]
     ) -> int:
-        cursor = conn.execute(self.build_update_sql(where, update))
-        conn.commit()
+        with conn:
+            cursor = conn.execute(
+                self.build_update_sql(where.keys(), update.keys()),
+                (*update.values(), *where.values()),
+            )
         return cursor.rowcount
 
     @classmethod
@@ -1,33 +1,43 @@
+import json
 import numpy as np
 import pandas as pd
 from loguru import logger
 from functools import cached_property
+from pathlib import Path
 
 from tradepy.core.account import Account
-from tradepy.core.models import Position
+from tradepy.core.position import PositionBase
 from tradepy.types import TradeActions, TradeActionType
+from tradepy.trade_book.metrics import StreamingMetrics
 from tradepy.trade_book.types import CapitalsLog, TradeLog, AnyAccount
 from tradepy.trade_book.storage import (
     TradeBookStorage,
     SQLiteTradeBookStorage,
     InMemoryTradeBookStorage,
 )
+from tradepy.columnar import load_columnar_dataset, save_columnar_dataset
+
+
+_TRADES_FOLDER = "trades"
+_CAPITALS_FOLDER = "capitals"
+_METRICS_FILE = "metrics.json"
 
 
 class TradeBook:
     def __init__(self, storage: TradeBookStorage) -> None:
         self.storage = storage
+        self.metrics = StreamingMetrics()
 
     @cached_property
     def trade_logs_df(self) -> pd.DataFrame:
-        df = pd.DataFrame(self.storage.fetch_trade_logs())
+        df = self.storage.fetch_trade_logs_df()
         df.set_index("timestamp", inplace=True)
         df.sort_index(inplace=True)
         return df
 
     @cached_property
     def cap_logs_df(self) -> pd.DataFrame:
-        cap_df = pd.DataFrame(self.storage.fetch_capital_logs())
+        cap_df = self.storage.fetch_capital_logs_df()
         cap_df["timestamp"] = pd.to_datetime(cap_df["timestamp"])
         cap_df["capital"] = (
             cap_df["market_value"]
@@ -40,11 +50,79 @@ class TradeBook:
         cap_df.set_index("timestamp", inplace=True)
         return cap_df
 
+    def save(self, path: str | Path) -> Path:
+        """
+        Save the trade and capital logs as columnar datasets in the folder, with each
+        column in its own file, so that `load_capitals` only reads what it needs.
+        """
+        path = Path(path)
+        trades_df = self.storage.fetch_trade_logs_df()
+        caps_df = self.storage.fetch_capital_logs_df()
+        if not caps_df.empty:
+            caps_df = caps_df.assign(
+                timestamp=pd.to_datetime(caps_df["timestamp"]),
+                capital=caps_df["market_value"]
+                + caps_df["free_cash_amount"]
+                + caps_df["frozen_cash_amount"],
+            )
+
+        save_columnar_dataset(trades_df, path / _TRADES_FOLDER, stack=False)
+        save_columnar_dataset(caps_df, path / _CAPITALS_FOLDER, stack=False)
+        with (path / _METRICS_FILE).open("w") as f:
+            json.dump(self.metrics.to_dict(), f)
+        return path
+
+    @classmethod
+    def load(cls, path: str | Path) -> "TradeBook":
+        """
+        Load a trade book saved by `save` into memory.
+        """
+        path = Path(path)
+        trades_df = load_columnar_dataset(path / _TRADES_FOLDER, mmap_mode="c")
+        caps_df = load_columnar_dataset(path / _CAPITALS_FOLDER, mmap_mode="c")
+        if not caps_df.empty:
+            timestamps = caps_df["timestamp"].dt.strftime("%Y-%m-%d")
+            caps_df = caps_df.assign(timestamp=timestamps)
+
+        trade_book = cls(InMemoryTradeBookStorage.from_frames(trades_df, caps_df))
+        if (metrics_path := path / _METRICS_FILE).exists():
+            with metrics_path.open() as f:
+                trade_book.metrics = StreamingMetrics.from_dict(json.load(f))
+        else:
+            trade_book.metrics.replay(
+                trade_book.storage.fetch_trade_logs(),
+                caps_df.get("capital", pd.Series(dtype=float)).tolist(),
+            )
+        return trade_book
+
+    @staticmethod
+    def load_capitals(path: str | Path, columns=("capital",)) -> pd.DataFrame:
+        """
+        Read the daily capitals of a trade book saved by `save`, memory-mapped and
+        without loading the rest of it.
+
+        :return: the columns indexed by timestamp
+        """
+        caps_df = load_columnar_dataset(
+            Path(path) / _CAPITALS_FOLDER, columns=["timestamp", *columns]
+        )
+        return caps_df.set_index("timestamp")
+
+    @staticmethod
+    def load_trades(path: str | Path, columns=("action", "pct_chg")) -> pd.DataFrame:
+        """
+        Read the columns of the trade logs of a trade book saved by `save`,
+        memory-mapped and without loading the rest of it.
+        """
+        return load_columnar_dataset(Path(path) / _TRADES_FOLDER, columns=columns)
+
     def clone(self) -> "TradeBook":
         storage = self.storage.clone()
-        return TradeBook(storage)
+        trade_book = TradeBook(storage)
+        trade_book.metrics = self.metrics.clone()
+        return trade_book
 
-    def make_open_position_log(self, timestamp: str, pos: Position) -> TradeLog:
+    def make_open_position_log(self, timestamp: str, pos: PositionBase) -> TradeLog:
         chg = pos.chg_at(pos.latest_price)
         pct_chg = pos.pct_chg_at(pos.latest_price)
 
@@ -62,7 +140,7 @@ class TradeBook:
         }
 
     def make_close_position_log(
-        self, timestamp: str, pos: Position, action: TradeActionType
+        self, timestamp: str, pos: PositionBase, action: TradeActionType
     ) -> TradeLog:
         chg = pos.chg_at(pos.latest_price)
         pct_chg = pos.pct_chg_at(pos.latest_price)
@@ -89,21 +167,26 @@ class TradeBook:
             "free_cash_amount": account.free_cash_amount,
         }
 
-    def buy(self, timestamp: str, pos: Position):
+    def batch(self):
+        return self.storage.batch()
+
+    def buy(self, timestamp: str, pos: PositionBase):
         log = self.make_open_position_log(timestamp, pos)
         try:
             self.storage.buy(log)
         except Exception as exc:
             logger.error(f"导出开仓日志错误, {log}")
             raise exc
+        self.metrics.log_trade(log)
 
-    def sell(self, timestamp: str, pos: Position, action: TradeActionType):
+    def sell(self, timestamp: str, pos: PositionBase, action: TradeActionType):
         log = self.make_close_position_log(timestamp, pos, action)
         try:
             self.storage.sell(log)
         except Exception as exc:
             logger.error(f"导出开仓日志错误, {log}")
             raise exc
+        self.metrics.log_trade(log)
 
     def close(self, *args, **kwargs):
         kwargs["action"] = TradeActions.CLOSE
@@ -124,6 +207,9 @@ class TradeBook:
     def log_closing_capitals(self, date: str, account: Account):
         log = self.make_capital_log(date, account)
         self.storage.log_closing_capitals(log)
+        self.metrics.log_capital(
+            log["market_value"] + log["free_cash_amount"] + log["frozen_cash_amount"]
+        )
 
     def get_opening(self, date: str) -> CapitalsLog | None:
         return self.storage.get_opening(date)
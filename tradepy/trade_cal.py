@@ -1,23 +1,10 @@
-import pandas as pd
+import numpy as np
+from bisect import bisect_left, bisect_right
 from datetime import date
+from typing import Iterable, Iterator
 
 # Trade date list starting from 2000-01-01 to 2023-12-31 in reverse order.
-# This list is updated yearly.
-
-
-def get_nearby_trade_date(date: str) -> str:
-    """
-    Get the nearby trade date of the given date.
-    """
-    if date in trade_cal:
-        return date
-    else:
-        _date = pd.to_datetime(date)
-        while True:
-            _date -= pd.Timedelta(days=1)
-            date = str(_date.date())
-            if date in trade_cal:
-                return date
+# This list is updated yearly. Use `trade_calendar` below for the lookups.
 
 
 trade_cal = [
@@ -6082,5 +6069,151 @@ trade_cal = [
 ]
 
 
-if str(date.today()) > trade_cal[0]:
+class TradingCalendar:
+    """
+    The trading days, kept as a sorted datetime64 array. Membership and ordinal lookups
+    are hashed, while next / prev / offset / range are binary searches.
+
+    The dates can be passed as ISO strings, `date`s, `datetime`s or timestamps, and
+    the trading days are returned as ISO strings, like the bars' timestamps.
+    """
+
+    def __init__(self, dates: Iterable[str]) -> None:
+        self.days: np.ndarray = np.unique(np.asarray(list(dates), dtype="datetime64[D]"))
+        self._dates: list[str] = self.days.astype(str).tolist()
+        self._date_strings = np.array(self._dates)
+        self._ordinals: dict[str, int] = {d: i for i, d in enumerate(self._dates)}
+
+    @staticmethod
+    def _key(date) -> str:
+        return str(date)[:10]
+
+    def __len__(self) -> int:
+        return len(self._dates)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._dates)
+
+    def __contains__(self, date) -> bool:
+        return self._key(date) in self._ordinals
+
+    def __getitem__(self, ordinal: int) -> str:
+        return self._dates[ordinal]
+
+    @property
+    def first(self) -> str:
+        return self._dates[0]
+
+    @property
+    def last(self) -> str:
+        return self._dates[-1]
+
+    def ordinal(self, date) -> int:
+        """
+        Index of a trading day in the calendar, raises KeyError for non-trading days
+        """
+        return self._ordinals[self._key(date)]
+
+    def next(self, date, inclusive=False) -> str:
+        """
+        The first trading day after the date, or the date itself if `inclusive` and
+        it's a trading day
+        """
+        key = self._key(date)
+        idx = (bisect_left if inclusive else bisect_right)(self._dates, key)
+        if idx >= len(self._dates):
+            raise IndexError(f"交易日历中没有{key}之后的交易日")
+        return self._dates[idx]
+
+    def prev(self, date, inclusive=False) -> str:
+        """
+        The last trading day before the date, or the date itself if `inclusive` and
+        it's a trading day
+        """
+        key = self._key(date)
+        idx = (bisect_right if inclusive else bisect_left)(self._dates, key) - 1
+        if idx < 0:
+            raise IndexError(f"交易日历中没有{key}之前的交易日")
+        return self._dates[idx]
+
+    def offset(self, date, n: int, clip=False) -> str:
+        """
+        The trading day `n` trading days after the date, or before it if `n` is negative.
+        A non-trading date counts as its previous trading day.
+
+        :param clip: stop at the calendar's ends instead of raising IndexError
+        """
+        idx = bisect_right(self._dates, self._key(date)) - 1 + n
+        if clip:
+            idx = min(max(idx, 0), len(self._dates) - 1)
+        elif not 0 <= idx < len(self._dates):
+            raise IndexError(f"{date}偏移{n}个交易日超出了交易日历的范围")
+        return self._dates[idx]
+
+    def range(self, since_date=None, until_date=None) -> list[str]:
+        """
+        The trading days within [since_date, until_date], both ends are optional
+        """
+        start, end = 0, len(self._dates)
+        if since_date is not None:
+            start = bisect_left(self._dates, self._key(since_date))
+        if until_date is not None:
+            end = bisect_right(self._dates, self._key(until_date))
+        return self._dates[start:end]
+
+    def latest(self, today=None) -> str:
+        """
+        The latest trading day up to today
+        """
+        return self.prev(today or date.today(), inclusive=True)
+
+    def to_ordinals(self, dates) -> np.ndarray:
+        """
+        Encode dates as trading-day ordinals, i.e., int32 indexes into the calendar.
+        A non-trading date is mapped to the next trading day's ordinal, so comparing it
+        with any trading day's ordinal gives the same result as comparing the dates.
+        """
+        dates = np.asarray(dates)
+        if dates.dtype.kind == "M":
+            ordinals = np.searchsorted(self.days, dates.astype("datetime64[D]"))
+        else:
+            ordinals = np.searchsorted(self._date_strings, dates.astype("U10"))
+        return ordinals.astype(np.int32)
+
+    def from_ordinals(self, ordinals) -> np.ndarray:
+        """
+        Decode trading-day ordinals back to date strings.
+        """
+        return self._date_strings[ordinals]
+
+    def is_trade_day(self, dates) -> np.ndarray:
+        """
+        Vectorized membership test of a whole date column
+        """
+        ordinals = self.to_ordinals(dates)
+        found = ordinals < len(self._dates)
+        days = self.days[np.where(found, ordinals, 0)]
+        return found & (days == np.asarray(dates, dtype="datetime64[D]"))
+
+
+def to_day_numbers(dates) -> np.ndarray:
+    """
+    Encode dates as int32 days since 1970-01-01. Unlike the trading-day ordinals,
+    this is exact for non-trading dates as well, e.g., the 1900 / 3000 paddings of
+    the adjust factors.
+    """
+    return np.asarray(dates, dtype="datetime64[D]").astype(np.int32)
+
+
+trade_calendar = TradingCalendar(trade_cal)
+
+
+def get_nearby_trade_date(date: str) -> str:
+    """
+    Get the nearby trade date of the given date.
+    """
+    return trade_calendar.prev(date, inclusive=True)
+
+
+if str(date.today()) > trade_calendar.last:
     raise Exception("交易日历已过期! 请升级您的TradePy版本")
@@ -53,16 +53,8 @@ def between(
 
 
 def get_latest_trade_date() -> date:
-    today = date.today()
-    today_str = str(today)
-
-    for idx, trade_date in enumerate(tradepy.trade_cal.trade_cal):
-        if trade_date == today_str:
-            return today
-        elif trade_date < today_str:
-            return date_parser.parse(tradepy.trade_cal.trade_cal[idx]).date()
-
-    raise Exception("Unexpectedly unable to find the latest trade date?!")
+    latest = tradepy.trade_cal.trade_calendar.latest(date.today())
+    return date_parser.parse(latest).date()
 
 
 def chunks(lst, batch_size: int):
@@ -124,12 +116,9 @@ def optimize_dtype_memory(df: pd.DataFrame):
                     else:
                         df[col] = df[col].astype(np.int64)
                 else:
+                    # float16 only keeps ~3 significant digits, thus prices would be
+                    # corrupted. float32 is the narrowest type we use for real values.
                     if (
-                        min_val >= np.finfo(np.float16).min
-                        and max_val <= np.finfo(np.float16).max
-                    ):
-                        df[col] = df[col].astype(np.float16)
-                    elif (
                         min_val >= np.finfo(np.float32).min
                         and max_val <= np.finfo(np.float32).max
                     ):